@@ -0,0 +1 @@
+"""Benchmarks; run the modules with `python -m bench.<name>` from the repo root."""
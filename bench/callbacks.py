@@ -0,0 +1,152 @@
+"""
+Microbenchmark for the per-frame audio paths: the capture callback (float32 and int16),
+the wake word frame preparation, and the recorder's block read + RMS. Each case is run
+under tracemalloc and reports CPU time per call and bytes allocated per call; the old
+allocating wake word conversion and RMS are included for comparison.
+
+A case passes when nothing is retained across calls and no transient allocation is
+as large as the frame itself (i.e. no sample buffer is allocated). Python bookkeeping
+such as slice views and the condition variable's waiter list still creates a few
+hundred bytes of short-lived objects per call, which is reported as "transient".
+
+Run:
+    python -m bench.callbacks [--frames 20000]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+# Ensure repo root is on path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.audio.bus import CaptureBus, to_pcm16
+from src.audio.capture import _rms
+
+BLOCK = 512
+SAMPLE_RATE = 16000
+
+
+def measure(fn: Callable[[], None], frames: int) -> dict:
+    for _ in range(100):  # warm caches (ufunc dispatch, first-touch pages)
+        fn()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        cpu0 = time.process_time()
+        for _ in range(frames):
+            fn()
+        cpu = time.process_time() - cpu0
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Timing without tracemalloc's per-allocation overhead
+    t0 = time.perf_counter()
+    cpu0 = time.process_time()
+    for _ in range(frames):
+        fn()
+    return {
+        "us": (time.perf_counter() - t0) / frames * 1e6,
+        "cpu_us": (time.process_time() - cpu0) / frames * 1e6,
+        "traced_cpu_us": cpu / frames * 1e6,
+        "retained": max(0, current - base),
+        "transient": max(0, peak - base),
+    }
+
+
+def cases() -> dict[str, tuple[Callable[[], None], int]]:
+    """name -> (callable, bytes of the sample buffer it handles)"""
+    rng = np.random.default_rng(0)
+    speech = rng.uniform(-1.2, 1.2, (BLOCK, 1)).astype(np.float32)
+    speech16 = (speech * 30000).astype(np.int16)
+
+    bus = CaptureBus(sample_rate=SAMPLE_RATE, block_size=BLOCK, capacity_s=2)
+    bus16 = CaptureBus(sample_rate=SAMPLE_RATE, block_size=BLOCK, capacity_s=2, dtype="int16")
+
+    def capture_float32() -> None:
+        bus._callback(speech, BLOCK, None, None)
+
+    def capture_int16() -> None:
+        bus16._callback_pcm16(speech16, BLOCK, None, None)
+
+    cursor = bus.cursor()
+    frame = np.empty(BLOCK, dtype=np.float32)
+    pcm = np.empty(BLOCK, dtype=np.int16)
+    scratch = np.empty(BLOCK, dtype=np.float32)
+
+    def wakeword_float32() -> None:
+        bus._callback(speech, BLOCK, None, None)
+        cursor.read(frame, timeout=0)
+        to_pcm16(frame, pcm, scratch)
+
+    cursor16 = bus16.cursor()
+
+    def wakeword_int16() -> None:
+        bus16._callback_pcm16(speech16, BLOCK, None, None)
+        cursor16.read(pcm, timeout=0)
+
+    def wakeword_before() -> None:
+        bus._callback(speech, BLOCK, None, None)
+        cursor.read(frame, timeout=0)
+        (np.clip(frame, -1.0, 1.0) * 32767).astype(np.int16)
+
+    block = SAMPLE_RATE // 10
+    recording = np.zeros(10 * block, dtype=np.float32)
+    rec_cursor = bus.cursor()
+    filled = [0]
+
+    def recorder_block() -> None:
+        while rec_cursor.available() < block:
+            bus._callback(speech, BLOCK, None, None)
+        chunk = recording[filled[0]:filled[0] + block]
+        rec_cursor.read(chunk, timeout=0)
+        filled[0] = (filled[0] + block) % len(recording)
+        _rms(chunk)
+
+    def recorder_rms_before() -> None:
+        chunk = recording[:block]
+        float(np.sqrt(np.mean(chunk.astype(np.float64) ** 2)))
+
+    def recorder_rms() -> None:
+        _rms(recording[:block])
+
+    return {
+        "capture callback, float32": (capture_float32, BLOCK * 4),
+        "capture callback, int16": (capture_int16, BLOCK * 2),
+        "wake word frame, float32 bus": (wakeword_float32, BLOCK * 2),
+        "wake word frame, int16 bus": (wakeword_int16, BLOCK * 2),
+        "wake word frame, before": (wakeword_before, BLOCK * 2),
+        "recorder 100 ms block": (recorder_block, block * 4),
+        "recorder RMS": (recorder_rms, block * 4),
+        "recorder RMS, before": (recorder_rms_before, block * 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-frame CPU time and allocations of the audio callbacks.")
+    parser.add_argument("--frames", type=int, default=20000, help="Calls per case.")
+    args = parser.parse_args()
+
+    print(f"{'case':<32} {'wall us':>8} {'cpu us':>8} {'retained':>9} {'transient':>10}  result")
+    failed = False
+    for name, (fn, buffer_bytes) in cases().items():
+        r = measure(fn, args.frames)
+        ok = r["retained"] < 256 and r["transient"] < buffer_bytes
+        if not ok and not name.endswith("before"):
+            failed = True
+        verdict = "no buffer allocs" if ok else "ALLOCATES"
+        print(
+            f"{name:<32} {r['us']:>8.2f} {r['cpu_us']:>8.2f} "
+            f"{r['retained']:>8}B {r['transient']:>9}B  {verdict}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+End-to-end latency benchmark: replays a corpus of WAV utterances through the real
+`Orchestrator` turn (recording + VAD endpointing, STT, fast path, LLM, TTS, playback
+stage) with the microphone replaced by a replayed capture bus, the speaker by a null
+sink, and Ollama by a local fake with a fixed token rate (see bench/fake_ollama.py).
+
+Reports p50/p95/p99 per stage and for time-to-first-audio (TTFA, from the end of the
+utterance to the first synthesized audio reaching the output). `--save` writes the
+run as JSON; `--compare` checks it against an earlier run and exits non-zero when a
+metric's p95 regressed by more than `--threshold`.
+
+Corpus: 16 kHz mono 16-bit WAVs, one utterance each (no wake word). Trailing silence
+is trimmed; the bench feeds its own room noise after the speech.
+
+Run:
+    python -m bench.e2e corpus/ --save bench/results/base.json
+    python -m bench.e2e corpus/ --compare bench/results/base.json
+"""
+
+import argparse
+import copy
+import json
+import platform
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+# Ensure repo root is on path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench.fake_ollama import FakeOllama
+from src.audio import CaptureBus
+from src.client import read_wav
+from src.config import load_config
+from src.orchestrator import Orchestrator
+from src.pipeline import TurnTrace
+
+SAMPLE_RATE = 16000
+BLOCK = 512
+LEAD_S = 2.0  # background before each utterance (VAD noise floor calibration)
+NOISE_LEVEL = 0.001  # about -60 dBFS room noise
+TURN_TIMEOUT_S = 60.0
+# Report order; a stage missing from a turn (e.g. llm on a fast-path answer) is skipped
+METRICS = ["ttfa", "endpoint", "stt", "fast", "llm", "tts", "playback", "total"]
+
+
+class ReplayBus(CaptureBus):
+    """A `CaptureBus` fed from arrays instead of a microphone."""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._active = False
+        self._rng = np.random.default_rng(0)
+
+    @property
+    def running(self) -> bool:
+        return self._active
+
+    def start(self) -> None:
+        self._active = True
+
+    def stop(self) -> None:
+        self._active = False
+        with self._cond:
+            self._cond.notify_all()
+
+    def feed(self, audio: np.ndarray, speed: float = 1.0) -> None:
+        """Write `audio` block by block, paced at `speed` x real time (0 = as fast as possible)."""
+        due = time.perf_counter()
+        for i in range(0, len(audio) - BLOCK + 1, BLOCK):
+            if speed > 0:
+                time.sleep(max(0.0, due - time.perf_counter()))
+                due += BLOCK / SAMPLE_RATE / speed
+            self._callback(audio[i:i + BLOCK, None], BLOCK, None, None)
+
+    def noise(self, seconds: float) -> np.ndarray:
+        n = int(seconds * SAMPLE_RATE) // BLOCK * BLOCK
+        return (self._rng.standard_normal(n) * NOISE_LEVEL).astype(np.float32)
+
+
+class NullOutput:
+    """Stands in for `AudioOutput`: discards audio, noting when the first samples arrive."""
+
+    def __init__(self) -> None:
+        self.sample_rate: int | None = None
+        self.first_write: float | None = None
+        self.samples = 0
+
+    def reset(self) -> None:
+        self.first_write = None
+        self.samples = 0
+
+    def write(self, pcm: np.ndarray, sample_rate: int) -> None:
+        if self.first_write is None and len(pcm):
+            self.first_write = time.perf_counter()
+        self.sample_rate = sample_rate
+        self.samples += len(pcm)
+
+    def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def trim_trailing_silence(audio: np.ndarray, below_peak_db: float = 35.0) -> np.ndarray:
+    """Cut the recording after its last voiced 20 ms frame, so TTFA counts from the end of speech."""
+    frame = SAMPLE_RATE // 50
+    n = len(audio) // frame
+    if n == 0:
+        return audio
+    energy = np.mean(audio[: n * frame].reshape(n, frame) ** 2, axis=1) + 1e-12
+    voiced = np.flatnonzero(10 * np.log10(energy / energy.max()) > -below_peak_db)
+    return audio[: (voiced[-1] + 1) * frame]
+
+
+def load_corpus(paths: list[Path]) -> list[tuple[str, np.ndarray]]:
+    files: list[Path] = []
+    for path in paths:
+        files += sorted(path.glob("*.wav")) if path.is_dir() else [path]
+    if not files:
+        raise FileNotFoundError(f"No WAV files in {', '.join(map(str, paths))}")
+    corpus = []
+    for f in files:
+        pcm = np.frombuffer(read_wav(f), dtype="<i2")
+        corpus.append((f.name, trim_trailing_silence(pcm.astype(np.float32) / 32768)))
+    return corpus
+
+
+def bench_config(args: argparse.Namespace, ollama_url: str) -> dict[str, Any]:
+    """The normal config with the things that would skew a latency run turned off."""
+    config = copy.deepcopy(load_config(args.config))
+    config.setdefault("ollama", {})["base_url"] = ollama_url
+    ux = config.setdefault("ux", {})
+    ux["play_listening_sound"] = False
+    ux["play_thinking_sound"] = False
+    # Repeated corpus turns would otherwise be answered from caches
+    if not args.tts_cache:
+        config.setdefault("tts", {}).setdefault("cache", {})["enabled"] = False
+    if not args.fast_path:
+        config.setdefault("fast_path", {})["enabled"] = False
+    return config
+
+
+def run_turn(orch: Orchestrator, bus: ReplayBus, output: NullOutput, audio: np.ndarray, speed: float) -> dict[str, float]:
+    """One turn; returns stage timings in milliseconds."""
+    output.reset()
+    if orch._conversation is not None:
+        orch._conversation.reset()  # every utterance is a fresh question
+    bus.feed(bus.noise(LEAD_S), speed=0)
+
+    trace = TurnTrace(turn_id=orch._turn_id + 1)
+    turn = threading.Thread(target=orch._run_pipeline, args=(bus.position, trace), daemon=True)
+    turn.start()
+    bus.feed(audio, speed)
+    speech_end = time.perf_counter()
+    # Room noise until the turn is over (endpointing and the false-cut audit need it)
+    deadline = speech_end + TURN_TIMEOUT_S
+    while turn.is_alive() and time.perf_counter() < deadline:
+        bus.feed(bus.noise(0.1), speed)
+    turn.join(timeout=1.0)
+    done = time.perf_counter()
+    if turn.is_alive():
+        raise TimeoutError(f"turn did not finish within {TURN_TIMEOUT_S:.0f}s")
+
+    ms: dict[str, float] = {"total": (done - speech_end) * 1000}
+    if "record" in trace.stages:
+        record_end = trace.started + trace.stage("record").compute_s
+        ms["endpoint"] = (record_end - speech_end) * 1000
+    for name in ("stt", "fast", "llm", "tts", "playback"):
+        if name in trace.stages:
+            ms[name] = trace.stage(name).compute_s * 1000
+    if output.first_write is not None:
+        ms["ttfa"] = (output.first_write - speech_end) * 1000
+    return ms
+
+
+def summarize(turns: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    summary = {}
+    for metric in METRICS:
+        values = [t["ms"][metric] for t in turns if metric in t["ms"]]
+        if not values:
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        summary[metric] = {
+            "n": len(values),
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "mean": float(np.mean(values)),
+        }
+    return summary
+
+
+def print_summary(summary: dict[str, dict[str, float]]) -> None:
+    print(f"{'metric':<10} {'n':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'mean':>8}  (ms)")
+    for metric, s in summary.items():
+        print(f"{metric:<10} {s['n']:>4} {s['p50']:>8.0f} {s['p95']:>8.0f} {s['p99']:>8.0f} {s['mean']:>8.0f}")
+
+
+def compare(summary: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float) -> bool:
+    """Print p50/p95 against `baseline`; True if any p95 got worse by more than `threshold`."""
+    regressed = False
+    print(f"{'metric':<10} {'p50 base':>9} {'p50 now':>8} {'p95 base':>9} {'p95 now':>8} {'p95 delta':>10}")
+    for metric, now in summary.items():
+        base = baseline.get(metric)
+        if base is None:
+            continue
+        delta = (now["p95"] - base["p95"]) / max(base["p95"], 1e-9)
+        # Ignore a few ms of jitter on stages that are nearly free
+        worse = delta > threshold and now["p95"] - base["p95"] > 5
+        regressed |= worse
+        print(
+            f"{metric:<10} {base['p50']:>9.0f} {now['p50']:>8.0f} {base['p95']:>9.0f} {now['p95']:>8.0f} "
+            f"{delta * 100:>+9.1f}%{'  REGRESSION' if worse else ''}"
+        )
+    return regressed
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay WAV utterances through the pipeline and report latency percentiles.")
+    parser.add_argument("corpus", type=Path, nargs="+", help="WAV files or directories of them.")
+    parser.add_argument("--config", type=Path, default=None, help="Config file (default: config.yaml).")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus.")
+    parser.add_argument("--warmup", type=int, default=1, help="Unreported turns before measuring.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed (1 = real time, as a microphone delivers it).")
+    parser.add_argument("--tokens-per-s", type=float, default=40.0, help="Fake Ollama generation rate.")
+    parser.add_argument("--first-token-ms", type=float, default=150.0, help="Fake Ollama time to first token.")
+    parser.add_argument("--ollama-url", default=None, help="Use this Ollama instead of the fake one.")
+    parser.add_argument("--tts-cache", action="store_true", help="Keep the on-disk speech cache enabled.")
+    parser.add_argument("--fast-path", action="store_true", help="Keep local intents and the response cache enabled.")
+    parser.add_argument("--save", type=Path, default=None, help="Write this run (turns + summary) as JSON.")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier --save output to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed p95 regression (fraction).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    corpus = load_corpus(args.corpus)
+    fake = None
+    if args.ollama_url is None:
+        fake = FakeOllama(tokens_per_s=args.tokens_per_s, first_token_ms=args.first_token_ms).start()
+    ollama_url = args.ollama_url or fake.url
+
+    orch = Orchestrator(config=bench_config(args, ollama_url))
+    bus = ReplayBus(sample_rate=SAMPLE_RATE, block_size=BLOCK, capacity_s=orch._bus.capacity / SAMPLE_RATE)
+    output = NullOutput()
+    orch._bus = bus
+    orch._output = output
+    bus.start()
+
+    turns: list[dict[str, Any]] = []
+    try:
+        orch._warm_up().wait_all()
+        schedule = [(name, audio, True) for name, audio in corpus[: args.warmup]]
+        schedule += [(name, audio, False) for _ in range(args.repeat) for name, audio in corpus]
+        for i, (name, audio, warmup) in enumerate(schedule, 1):
+            ms = run_turn(orch, bus, output, audio, args.speed)
+            tag = "warmup" if warmup else f"{i - args.warmup}/{len(schedule) - args.warmup}"
+            print(f"[bench] {tag} {name}: " + ", ".join(f"{k} {v:.0f}ms" for k, v in ms.items()), flush=True)
+            if not warmup:
+                turns.append({"utterance": name, "ms": ms})
+    finally:
+        bus.stop()
+        orch._llm.close()
+        if orch._workers is not None:
+            orch._workers.close()
+        if fake is not None:
+            fake.stop()
+
+    summary = summarize(turns)
+    print()
+    print_summary(summary)
+
+    if args.save is not None:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        run = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            "settings": {
+                "corpus": [name for name, _ in corpus],
+                "repeat": args.repeat,
+                "speed": args.speed,
+                "tokens_per_s": None if args.ollama_url else args.tokens_per_s,
+                "first_token_ms": None if args.ollama_url else args.first_token_ms,
+                "stt": orch.config.get("stt", {}),
+                "tts": orch.config.get("tts", {}),
+                "ollama_model": orch.config.get("ollama", {}).get("model"),
+            },
+            "summary": summary,
+            "turns": turns,
+        }
+        args.save.write_text(json.dumps(run, indent=2), encoding="utf-8")
+        print(f"[bench] Saved {args.save}")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["summary"]
+        print()
+        if compare(summary, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Local stand-in for the Ollama HTTP API, for benchmarks: answers /api/generate and
+/api/chat with a canned reply streamed at a fixed token rate after a fixed
+time-to-first-token, so LLM latency is repeatable and no model is needed.
+
+Run standalone:
+    python -m bench.fake_ollama [--port 11435] [--tokens-per-s 40] [--first-token-ms 150]
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+DEFAULT_REPLY = (
+    "Sure. The weather today looks mild with a light breeze. "
+    "You might want a jacket this evening, since it cools down quickly after sunset. "
+    "Let me know if you want the forecast for tomorrow as well."
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Rough word-piece tokens (a word with its trailing space), close enough for pacing."""
+    return re.findall(r"\S+\s*", text)
+
+
+class FakeOllama:
+    """
+    Threaded HTTP server on `host:port` (port 0 picks a free one; see `url`). Every
+    request gets `reply`, cut to the request's `num_predict`, one token every
+    1 / `tokens_per_s` seconds after `first_token_ms` of simulated prefill. The
+    attributes can be changed while serving; `down = True` answers everything with 503,
+    for exercising failover.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tokens_per_s: float = 40.0,
+        first_token_ms: float = 150.0,
+        reply: str = DEFAULT_REPLY,
+    ):
+        self.tokens_per_s = tokens_per_s
+        self.first_token_ms = first_token_ms
+        self.tokens = tokenize(reply)
+        self.requests = 0
+        self.down = False
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like Ollama; streams use chunked encoding
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if fake.down:
+                    self._json(503, {"error": "unavailable"})
+                elif self.path == "/api/version":
+                    self._json(200, {"version": "0.0.0-fake"})
+                elif self.path == "/api/tags":
+                    self._json(200, {"models": []})
+                else:
+                    self._json(404, {"error": f"unknown path {self.path}"})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if fake.down:
+                    self._json(503, {"error": "unavailable"})
+                    return
+                if self.path not in ("/api/generate", "/api/chat"):
+                    self._json(404, {"error": f"unknown path {self.path}"})
+                    return
+                fake.requests += 1
+                chat = self.path == "/api/chat"
+                if not body.get("prompt") and not body.get("messages"):
+                    # Preload request: load the model and return
+                    self._json(200, {"model": body.get("model", ""), "done": True})
+                    return
+                limit = (body.get("options") or {}).get("num_predict") or len(fake.tokens)
+                tokens = fake.tokens[: max(1, int(limit))]
+                prompt_chars = len(json.dumps(body.get("messages") or body.get("prompt")))
+                final = {
+                    "done": True,
+                    "prompt_eval_count": prompt_chars // 4,
+                    "prompt_eval_duration": int(fake.first_token_ms * 1e6),
+                    "eval_count": len(tokens),
+                    "eval_duration": int(len(tokens) / fake.tokens_per_s * 1e9),
+                }
+                if body.get("stream", True):
+                    self._stream(tokens, chat, final)
+                else:
+                    time.sleep((fake.first_token_ms / 1000) + len(tokens) / fake.tokens_per_s)
+                    text = "".join(tokens)
+                    final.update({"message": {"role": "assistant", "content": text}} if chat else {"response": text})
+                    self._json(200, final)
+
+            def _json(self, status: int, obj: dict[str, Any]) -> None:
+                data = json.dumps(obj).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, tokens: list[str], chat: bool, final: dict[str, Any]) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                interval = 1 / fake.tokens_per_s
+                due = time.perf_counter() + fake.first_token_ms / 1000
+                try:
+                    for token in tokens:
+                        time.sleep(max(0.0, due - time.perf_counter()))
+                        due += interval
+                        piece = {"message": {"role": "assistant", "content": token}} if chat else {"response": token}
+                        self._chunk({**piece, "done": False})
+                    self._chunk({**({"message": {"role": "assistant", "content": ""}} if chat else {"response": ""}), **final})
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # client cancelled the stream
+
+            def _chunk(self, obj: dict[str, Any]) -> None:
+                data = json.dumps(obj).encode("utf-8") + b"\n"
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a fake Ollama API with a fixed token rate.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--tokens-per-s", type=float, default=40.0)
+    parser.add_argument("--first-token-ms", type=float, default=150.0)
+    parser.add_argument("--reply", default=DEFAULT_REPLY, help="Text every request is answered with.")
+    args = parser.parse_args()
+    fake = FakeOllama(
+        host=args.host,
+        port=args.port,
+        tokens_per_s=args.tokens_per_s,
+        first_token_ms=args.first_token_ms,
+        reply=args.reply,
+    ).start()
+    print(f"[fake-ollama] Serving on {fake.url} ({args.tokens_per_s:g} tok/s, first token {args.first_token_ms:g}ms)", flush=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
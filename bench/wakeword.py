@@ -0,0 +1,270 @@
+"""
+Wake word accuracy and CPU benchmark: runs the live detector's decision logic
+(`WakeWordEngine`: Porcupine + debounce + cooldown on the sample clock) over labelled
+long-form recordings, faster than real time, and reports per parameter set:
+
+- false accepts per hour of audio
+- miss rate over labelled keywords
+- detection latency from the end of the keyword to the trigger (p50/p95)
+- Porcupine CPU cost in µs per 512-sample frame, and the real-time factor
+
+Corpus: 16 kHz mono 16-bit WAVs. A WAV may have a label file next to it with the same
+stem and `.txt` suffix (Audacity label track export: `start<TAB>end<TAB>label` per
+keyword, seconds; a line with a single number is taken as the keyword end). WAVs
+without labels are negatives: every trigger in them is a false accept.
+
+Grids: `--sensitivity`, `--debounce` and `--cooldown-ms` take comma-separated values.
+Porcupine runs once per sensitivity and file (in parallel across processes); debounce
+and cooldown are then replayed over the recorded per-frame hits, also in parallel.
+
+Run:
+    python -m bench.wakeword corpus/ --sensitivity 0.3,0.5,0.7 --debounce 1,2,3 [--save out.json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+# Ensure repo root is on path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.client import read_wav
+from src.config import load_config
+from src.wakeword.engine import FRAME_LENGTH, WakeWordEngine, create_porcupine
+
+SAMPLE_RATE = 16000
+
+
+class _Replay:
+    """Stands in for Porcupine: returns hits recorded by an earlier pass, frame by frame."""
+
+    def __init__(self, hits: np.ndarray):
+        self._hits = hits.tolist()
+        self._i = -1
+
+    def process(self, pcm: Any) -> int:
+        self._i += 1
+        return self._hits[self._i]
+
+
+def read_labels(wav: Path) -> list[float]:
+    """Keyword end times (seconds) from the WAV's label file; none if it has no labels."""
+    path = wav.with_suffix(".txt")
+    if not path.exists():
+        return []
+    ends = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        fields = line.split("\t") if "\t" in line else line.split()
+        if not fields or line.lstrip().startswith("#"):
+            continue
+        ends.append(float(fields[1] if len(fields) > 1 else fields[0]))
+    return sorted(ends)
+
+
+def find_wavs(paths: list[Path]) -> list[Path]:
+    wavs: list[Path] = []
+    for p in paths:
+        wavs += sorted(p.rglob("*.wav")) if p.is_dir() else [p]
+    return wavs
+
+
+def spot(task: tuple[Path, float, dict[str, Any]]) -> dict[str, Any]:
+    """Run Porcupine over one file at one sensitivity; returns per-frame hits and CPU time."""
+    path, sensitivity, porcupine_kwargs = task
+    pcm = np.frombuffer(read_wav(path), dtype=np.int16)
+    frames = len(pcm) // FRAME_LENGTH
+    hits = np.empty(frames, dtype=np.int8)
+    porcupine = create_porcupine(sensitivity=sensitivity, **porcupine_kwargs)
+    try:
+        process = porcupine.process
+        t0 = time.process_time()
+        for i in range(frames):
+            hits[i] = process(pcm[i * FRAME_LENGTH : (i + 1) * FRAME_LENGTH])
+        cpu_s = time.process_time() - t0
+    finally:
+        porcupine.delete()
+    return {"path": path, "sensitivity": sensitivity, "hits": hits, "frames": frames, "cpu_s": cpu_s}
+
+
+def triggers(hits: np.ndarray, debounce: int, cooldown_ms: float) -> list[int]:
+    """Sample positions where the detector would have fired, via the live `WakeWordEngine`."""
+    engine = WakeWordEngine(
+        _Replay(hits), debounce=debounce, cooldown_samples=int(cooldown_ms / 1000 * SAMPLE_RATE)
+    )
+    fired = []
+    for i in range(len(hits)):
+        end = (i + 1) * FRAME_LENGTH
+        if engine.process(None, end) is not None:
+            fired.append(end)  # on_wake runs at the end of this frame
+    return fired
+
+
+def score(task: tuple[float, int, float, list[dict[str, Any]], float, float]) -> dict[str, Any]:
+    """Match triggers to labels for one parameter set over every file."""
+    sensitivity, debounce, cooldown_ms, files, tolerance_s, max_latency_s = task
+    false_accepts = 0
+    keywords = 0
+    latencies: list[float] = []
+    audio_s = 0.0
+    for f in files:
+        labels = f["labels"]
+        keywords += len(labels)
+        audio_s += f["frames"] * FRAME_LENGTH / SAMPLE_RATE
+        matched = [False] * len(labels)
+        for end in triggers(f["hits"], debounce, cooldown_ms):
+            t = end / SAMPLE_RATE
+            # The earliest unmatched keyword this trigger can belong to
+            k = next(
+                (
+                    j
+                    for j, label in enumerate(labels)
+                    if not matched[j] and label - tolerance_s <= t <= label + max_latency_s
+                ),
+                None,
+            )
+            if k is None:
+                false_accepts += 1
+            else:
+                matched[k] = True
+                latencies.append(max(0.0, t - labels[k]))
+    p50, p95 = np.percentile(latencies, [50, 95]) if latencies else (float("nan"), float("nan"))
+    return {
+        "sensitivity": sensitivity,
+        "debounce": debounce,
+        "cooldown_ms": cooldown_ms,
+        "false_accepts": false_accepts,
+        "fa_per_hour": false_accepts / (audio_s / 3600) if audio_s else 0.0,
+        "keywords": keywords,
+        "misses": keywords - len(latencies),
+        "miss_rate": (keywords - len(latencies)) / keywords if keywords else 0.0,
+        "latency_p50_ms": float(p50) * 1000,
+        "latency_p95_ms": float(p95) * 1000,
+    }
+
+
+def floats(text: str) -> list[float]:
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure wake word accuracy and CPU cost over labelled recordings.")
+    parser.add_argument("corpus", type=Path, nargs="+", help="WAV files or directories of them.")
+    parser.add_argument("--config", type=Path, default=None, help="Config file (default: config.yaml).")
+    parser.add_argument("--access-key", default=None, help="Picovoice AccessKey (default: wake_word.access_key).")
+    parser.add_argument("--model", type=Path, default=None, help="Keyword .ppn (default: wake_word.model_path).")
+    parser.add_argument("--keyword", default=None, help="Built-in keyword instead of a .ppn (default: wake_word.builtin_keyword).")
+    parser.add_argument("--sensitivity", type=floats, default=None, help="Comma-separated values (default: wake_word.sensitivity).")
+    parser.add_argument("--debounce", type=floats, default=None, help="Comma-separated values (default: wake_word.debounce).")
+    parser.add_argument("--cooldown-ms", type=floats, default=None, help="Comma-separated values (default: wake_word.cooldown_ms).")
+    parser.add_argument("--tolerance-ms", type=float, default=250.0, help="How early before a label's end a trigger still counts.")
+    parser.add_argument("--max-latency-ms", type=float, default=1500.0, help="How late after a label's end a trigger still counts.")
+    parser.add_argument("--max-fa-per-hour", type=float, default=1.0, help="False accept budget when picking the best set.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    parser.add_argument("--save", type=Path, default=None, help="Write all results as JSON.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    wake_cfg = load_config(args.config).get("wake_word", {})
+    keyword = args.keyword or (None if args.model else wake_cfg.get("builtin_keyword"))
+    porcupine_kwargs = {
+        "access_key": args.access_key or wake_cfg.get("access_key"),
+        "model_path": args.model or wake_cfg.get("model_path", "models/ok_dann.ppn"),
+        "builtin_keyword": keyword,
+    }
+    if not porcupine_kwargs["access_key"]:
+        raise ValueError("Porcupine access_key required (--access-key or wake_word.access_key)")
+    sensitivities = args.sensitivity or [wake_cfg.get("sensitivity", 0.5)]
+    debounces = [int(v) for v in args.debounce or [wake_cfg.get("debounce", 2)]]
+    cooldowns = args.cooldown_ms or [wake_cfg.get("cooldown_ms", 2000)]
+
+    wavs = find_wavs(args.corpus)
+    labels = {path: read_labels(path) for path in wavs}
+    print(
+        f"[bench] {len(wavs)} files, {sum(len(v) for v in labels.values())} labelled keywords, "
+        f"{len(sensitivities)}x{len(debounces)}x{len(cooldowns)} parameter sets, {args.jobs} processes",
+        flush=True,
+    )
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        spotted = list(pool.map(spot, [(path, s, porcupine_kwargs) for s in sensitivities for path in wavs]))
+        frames = sum(r["frames"] for r in spotted)
+        cpu_s = sum(r["cpu_s"] for r in spotted)
+        audio_s = frames * FRAME_LENGTH / SAMPLE_RATE
+        print(
+            f"[bench] Porcupine: {frames} frames in {cpu_s:.1f}s CPU, {cpu_s / max(frames, 1) * 1e6:.1f} µs/frame, "
+            f"{audio_s / max(cpu_s, 1e-9):.0f}x real time per process",
+            flush=True,
+        )
+        by_sensitivity: dict[float, list[dict[str, Any]]] = {}
+        for r in spotted:
+            by_sensitivity.setdefault(r["sensitivity"], []).append(
+                {"hits": r["hits"], "frames": r["frames"], "labels": labels[r["path"]]}
+            )
+        tasks = [
+            (s, d, c, by_sensitivity[s], args.tolerance_ms / 1000, args.max_latency_ms / 1000)
+            for s, d, c in itertools.product(sensitivities, debounces, cooldowns)
+        ]
+        results = list(pool.map(score, tasks))
+    elapsed = time.perf_counter() - t0
+
+    us_per_frame = {
+        s: sum(r["cpu_s"] for r in spotted if r["sensitivity"] == s)
+        / max(1, sum(r["frames"] for r in spotted if r["sensitivity"] == s))
+        * 1e6
+        for s in sensitivities
+    }
+    for r in results:
+        r["us_per_frame"] = us_per_frame[r["sensitivity"]]
+
+    print()
+    print(f"{'sens':>5} {'deb':>4} {'cool ms':>8} {'FA/h':>7} {'miss':>7} {'lat p50':>8} {'lat p95':>8} {'µs/frame':>9}")
+    for r in results:
+        print(
+            f"{r['sensitivity']:>5.2f} {r['debounce']:>4} {r['cooldown_ms']:>8.0f} {r['fa_per_hour']:>7.2f} "
+            f"{r['miss_rate'] * 100:>6.1f}% {r['latency_p50_ms']:>8.0f} {r['latency_p95_ms']:>8.0f} "
+            f"{r['us_per_frame']:>9.1f}"
+        )
+    print(f"\n[bench] {len(results)} parameter sets over {audio_s / 3600:.2f}h of audio in {elapsed:.1f}s")
+    within = [r for r in results if r["fa_per_hour"] <= args.max_fa_per_hour]
+    if within:
+        best = min(within, key=lambda r: (r["miss_rate"], r["latency_p50_ms"]))
+        print(
+            f"[bench] Best within {args.max_fa_per_hour:g} FA/h: sensitivity {best['sensitivity']:g}, "
+            f"debounce {best['debounce']}, cooldown_ms {best['cooldown_ms']:g} "
+            f"({best['miss_rate'] * 100:.1f}% missed, {best['fa_per_hour']:.2f} FA/h)"
+        )
+    else:
+        print(f"[bench] No parameter set stays within {args.max_fa_per_hour:g} FA/h")
+
+    if args.save is not None:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        run = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            "settings": {
+                "corpus": [str(p) for p in wavs],
+                "keyword": keyword or str(porcupine_kwargs["model_path"]),
+                "audio_hours": audio_s / 3600,
+                "tolerance_ms": args.tolerance_ms,
+                "max_latency_ms": args.max_latency_ms,
+            },
+            "results": results,
+        }
+        args.save.write_text(json.dumps(run, indent=2), encoding="utf-8")
+        print(f"[bench] Saved {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,20 @@
 """Audio capture, VAD, and playback."""
 
+from .bus import CaptureBus, Cursor
 from .capture import record_until_silence
-from .playback import play_wav
+from .echo import EchoGate
+from .playback import AudioOutput, play_wav
+from .vad import EndpointStats, Endpointer, EnergyVad, SileroVad
 
-__all__ = ["record_until_silence", "play_wav"]
+__all__ = [
+    "record_until_silence",
+    "play_wav",
+    "AudioOutput",
+    "EchoGate",
+    "CaptureBus",
+    "Cursor",
+    "EnergyVad",
+    "SileroVad",
+    "Endpointer",
+    "EndpointStats",
+]
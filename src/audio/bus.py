@@ -0,0 +1,214 @@
+"""Always-on microphone capture shared by several consumers through a ring buffer."""
+
+import threading
+
+import numpy as np
+import sounddevice as sd
+
+
+_PCM16_MAX = np.float32(32767)
+_PCM16_SCALE = np.float32(1 / 32768)
+_ONE = np.float32(1.0)
+
+
+def to_pcm16(samples: np.ndarray, out: np.ndarray, scratch: np.ndarray) -> np.ndarray:
+    """
+    Clip float samples to [-1, 1] and convert them into the int16 array `out`, using
+    `scratch` (float32, same length) for the intermediate. Allocates nothing, so it is
+    safe to call once per frame from real-time code.
+    """
+    np.minimum(samples, _ONE, out=scratch)
+    np.maximum(scratch, -_ONE, out=scratch)
+    np.multiply(scratch, _PCM16_MAX, out=scratch)
+    out[...] = scratch  # truncating cast, same as astype(np.int16)
+    return out
+
+
+class CaptureBus:
+    """
+    Keeps one input stream open and writes mono float32 audio into a preallocated ring
+    buffer. Consumers (wake word, recorder, VAD) each read through their own `Cursor`.
+    The audio callback never takes a consumer lock: it copies the block and then
+    publishes the new write position; readers detect if they were lapped mid-copy.
+
+    With `dtype="int16"` the device is opened for 16-bit capture (falling back to
+    float32 if it refuses) and the raw PCM is kept in a second ring, so int16 consumers
+    such as Porcupine read it without converting. Nothing in the callback allocates.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        block_size: int = 512,
+        capacity_s: float = 30.0,
+        device: int | None = None,
+        dtype: str = "float32",
+    ):
+        if dtype not in ("float32", "int16"):
+            raise ValueError(f"Unsupported capture dtype: {dtype}")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_size = block_size
+        self.device = device
+        self.capacity = max(4 * block_size, int(capacity_s * sample_rate))
+        self.dtype = dtype
+        self._ring = np.zeros(self.capacity, dtype=np.float32)
+        self._ring16 = np.zeros(self.capacity, dtype=np.int16) if dtype == "int16" else None
+        self._written = 0
+        self._cond = threading.Condition()
+        self._stream: sd.InputStream | None = None
+
+    @property
+    def position(self) -> int:
+        """Total samples written since start (absolute stream position)."""
+        return self._written
+
+    @property
+    def oldest(self) -> int:
+        """Oldest absolute position safe to read (the block being written may overlap older ones)."""
+        return max(0, self._written + self.block_size - self.capacity)
+
+    @property
+    def pcm16(self) -> bool:
+        """True when int16 samples can be read (`Cursor.read` into an int16 array)."""
+        return self._ring16 is not None
+
+    def start(self) -> None:
+        """Open the input stream. Safe to call twice."""
+        if self._stream is not None:
+            return
+        try:
+            self._stream = self._open(self.dtype)
+        except sd.PortAudioError as e:
+            if self.dtype == "float32":
+                raise
+            print(f"[audio] int16 capture not supported ({e}); using float32", flush=True)
+            self.dtype = "float32"
+            self._ring16 = None
+            self._stream = self._open(self.dtype)
+        self._stream.start()
+
+    def _open(self, dtype: str) -> sd.InputStream:
+        return sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            blocksize=self.block_size,
+            dtype=dtype,
+            device=self.device,
+            callback=self._callback if dtype == "float32" else self._callback_pcm16,
+        )
+
+    def stop(self) -> None:
+        """Close the input stream and wake any blocked readers."""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        with self._cond:
+            self._cond.notify_all()
+
+    @property
+    def running(self) -> bool:
+        return self._stream is not None
+
+    def _callback(self, indata: np.ndarray, frames: int, time_info: object, status: object) -> None:
+        if status:
+            print(f"[audio] {status}", flush=True)
+        start = self._written % self.capacity
+        first = min(frames, self.capacity - start)
+        # Channel 0 only
+        self._ring[start:start + first] = indata[:first, 0]
+        self._ring[: frames - first] = indata[first:, 0]
+        self._publish(frames)
+
+    def _callback_pcm16(self, indata: np.ndarray, frames: int, time_info: object, status: object) -> None:
+        if status:
+            print(f"[audio] {status}", flush=True)
+        start = self._written % self.capacity
+        first = min(frames, self.capacity - start)
+        self._store_pcm16(indata[:first, 0], start, start + first)
+        self._store_pcm16(indata[first:, 0], 0, frames - first)
+        self._publish(frames)
+
+    def _store_pcm16(self, pcm: np.ndarray, lo: int, hi: int) -> None:
+        # Keep the raw PCM, then convert it in place into the float ring
+        self._ring16[lo:hi] = pcm
+        out = self._ring[lo:hi]
+        out[...] = pcm
+        np.multiply(out, _PCM16_SCALE, out=out)
+
+    def _publish(self, frames: int) -> None:
+        self._written += frames
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait_for(self, position: int, timeout: float | None = None) -> bool:
+        """Block until `position` samples have been written. False on timeout/stop."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._written >= position or not self.running,
+                timeout=timeout,
+            ) and self._written >= position
+
+    def copy(self, start: int, out: np.ndarray) -> bool:
+        """
+        Copy samples [start, start + len(out)) into `out` (float32, or int16 when
+        `pcm16`). Returns False if any of them were overwritten by the writer (reader
+        fell more than `capacity` behind).
+        """
+        n = len(out)
+        if start < self.oldest:
+            return False
+        ring = self._ring
+        if out.dtype == np.int16:
+            if self._ring16 is None:
+                raise ValueError("int16 reads need a CaptureBus opened with dtype='int16'")
+            ring = self._ring16
+        i = start % self.capacity
+        first = min(n, self.capacity - i)
+        out[:first] = ring[i:i + first]
+        out[first:] = ring[: n - first]
+        # Writer may have lapped us during the copy
+        return start >= self.oldest
+
+    def cursor(self, start: int | None = None) -> "Cursor":
+        """New reader positioned at `start` (default: live position)."""
+        return Cursor(self, self.position if start is None else start)
+
+
+class Cursor:
+    """Independent read position on a `CaptureBus`. Can rewind within the ring."""
+
+    def __init__(self, bus: CaptureBus, position: int):
+        self.bus = bus
+        self.position = max(position, bus.oldest)
+        self.overruns = 0
+
+    def available(self) -> int:
+        return self.bus.position - self.position
+
+    def seek(self, position: int) -> None:
+        """Move to an absolute position, clamped to what the ring still holds."""
+        self.position = min(max(position, self.bus.oldest), self.bus.position)
+
+    def rewind(self, samples: int) -> None:
+        self.seek(self.position - samples)
+
+    def read(self, out: np.ndarray, timeout: float | None = None) -> bool:
+        """
+        Fill `out` with the next len(out) samples, blocking until they are captured.
+        Returns False on timeout or when the bus stops. If the reader was overrun it
+        skips to the oldest retained audio and counts an overrun.
+        """
+        end = self.position + len(out)
+        if not self.bus.wait_for(end, timeout):
+            return False
+        while not self.bus.copy(self.position, out):
+            self.overruns += 1
+            self.position = self.bus.oldest
+            if not self.bus.wait_for(self.position + len(out), timeout):
+                return False
+        self.position += len(out)
+        return True
@@ -1,10 +1,13 @@
 """Record audio from microphone until silence or timeout."""
 
-import time
+import math
 from pathlib import Path
+from typing import Callable
 
 import numpy as np
-import sounddevice as sd
+
+from .bus import CaptureBus, Cursor
+from .vad import Endpointer
 
 
 def record_until_silence(
@@ -15,63 +18,138 @@ def record_until_silence(
     max_record_ms: int = 15000,
     silence_threshold: float = 0.01,
     device: int | None = None,
-) -> bytes:
+    bus: CaptureBus | None = None,
+    start: int | None = None,
+    endpointer: Endpointer | None = None,
+    holdoff_ms: float = 0,
+    background_end: int | None = None,
+    on_audio: Callable[[np.ndarray], None] | None = None,
+) -> np.ndarray:
     """
     Record from mic until `silence_timeout_ms` of silence or `max_record_ms` reached.
-    Returns raw PCM bytes (int16, mono).
+    Reads from the shared `bus` starting at absolute position `start` (default: now);
+    without a bus a temporary input stream is opened for this call.
+    With an `endpointer`, recording ends once its VAD hangover expires after speech
+    (`silence_timeout_ms` then only limits waiting for speech to begin) instead of the
+    fixed RMS threshold; speech in the first `holdoff_ms` is not counted. Its noise
+    floor is calibrated on the 2 s before `background_end` (default: the recording
+    start), which should exclude the wake word; when that audio is gone, the floor
+    kept from earlier turns is used.
+    `on_audio` is called with the recording so far (a view, not a copy) after each
+    block, e.g. to transcribe while the user is still speaking.
+    Returns a contiguous mono float32 array in [-1, 1].
     """
+    def record(bus: CaptureBus) -> np.ndarray:
+        cursor = bus.cursor(start)
+        if endpointer is not None:
+            end = cursor.position if background_end is None else min(background_end, cursor.position)
+            return _record_vad(
+                bus, cursor, endpointer, silence_timeout_ms, max_record_ms, holdoff_ms, end, on_audio
+            )
+        return _record(bus, cursor, silence_timeout_ms, max_record_ms, silence_threshold, on_audio)
+
+    if bus is None:
+        bus = CaptureBus(sample_rate=sample_rate, channels=channels, device=device)
+        bus.start()
+        try:
+            return record(bus)
+        finally:
+            bus.stop()
+    return record(bus)
+
+
+def _record(
+    bus: CaptureBus,
+    cursor: Cursor,
+    silence_timeout_ms: int,
+    max_record_ms: int,
+    silence_threshold: float,
+    on_audio: Callable[[np.ndarray], None] | None = None,
+) -> np.ndarray:
     block_ms = 100
-    block_samples = int(sample_rate * block_ms / 1000)
+    block_samples = int(bus.sample_rate * block_ms / 1000)
     silence_blocks = int(silence_timeout_ms / block_ms)
     max_blocks = int(max_record_ms / block_ms)
 
-    chunks: list[np.ndarray] = []
+    # Preallocate the whole recording so blocks land contiguously, no concatenate
+    buffer = np.zeros(max_blocks * block_samples, dtype=np.float32)
+    filled = 0
     silent_count = 0
-    block_count = 0
-
-    def rms(arr: np.ndarray) -> float:
-        return float(np.sqrt(np.mean(arr.astype(np.float64) ** 2)))
-
-    def callback(indata: np.ndarray, frames: int, time_info: object, status: object) -> None:
-        nonlocal silent_count
-        if status:
-            print(f"[audio] {status}", flush=True)
-        chunk = indata.copy()
-        chunks.append(chunk)
-        if rms(chunk) < silence_threshold:
+
+    for _ in range(max_blocks):
+        chunk = buffer[filled:filled + block_samples]
+        if not cursor.read(chunk, timeout=1.0):
+            print("[audio] Capture stopped while recording", flush=True)
+            break
+        filled += block_samples
+        if on_audio is not None:
+            on_audio(buffer[:filled])
+        if _rms(chunk) < silence_threshold:
             silent_count += 1
+            if silent_count >= silence_blocks:
+                break
         else:
             silent_count = 0
 
-    stream = sd.InputStream(
-        samplerate=sample_rate,
-        channels=channels,
-        blocksize=block_samples,
-        dtype="float32",
-        device=device,
-        callback=callback,
-    )
+    return buffer[:filled]
 
-    with stream:
-        while block_count < max_blocks and silent_count < silence_blocks:
-            time.sleep(block_ms / 1000)
-            block_count += 1
 
-    if not chunks:
-        return b""
+def _rms(arr: np.ndarray) -> float:
+    # float32 dot: no squared temporary, no float64 upcast of the whole block
+    return math.sqrt(float(np.dot(arr, arr)) / max(1, len(arr)))
 
-    audio = np.concatenate(chunks, axis=0)
-    # Convert float32 [-1,1] to int16
-    audio_int16 = (audio * 32767).astype(np.int16)
-    return audio_int16.tobytes()
 
+def _record_vad(
+    bus: CaptureBus,
+    cursor: Cursor,
+    endpointer: Endpointer,
+    no_speech_timeout_ms: int,
+    max_record_ms: int,
+    holdoff_ms: float,
+    background_end: int,
+    on_audio: Callable[[np.ndarray], None] | None = None,
+) -> np.ndarray:
+    frame_samples = endpointer.frame_samples
+    max_frames = int(bus.sample_rate * max_record_ms / 1000) // frame_samples
+    no_speech_frames = int(bus.sample_rate * no_speech_timeout_ms / 1000) // frame_samples
 
-def save_wav(pcm_bytes: bytes, path: Path, sample_rate: int = 16000) -> None:
-    """Save raw PCM (int16 mono) to WAV file."""
+    # Noise floor from the background before the wake word (20th percentile); with too
+    # little of it left in the ring, keep the running floor from earlier turns
+    history = min(2 * bus.sample_rate, background_end - bus.oldest)
+    if history >= bus.sample_rate // 2:
+        background = np.empty(history, dtype=np.float32)
+        if bus.copy(background_end - history, background):
+            endpointer.vad.calibrate(background)
+
+    endpointer.reset(holdoff_ms)
+    buffer = np.zeros(max_frames * frame_samples, dtype=np.float32)
+    filled = 0
+    for i in range(max_frames):
+        frame = buffer[filled:filled + frame_samples]
+        if not cursor.read(frame, timeout=1.0):
+            print("[audio] Capture stopped while recording", flush=True)
+            break
+        filled += frame_samples
+        if on_audio is not None:
+            on_audio(buffer[:filled])
+        if endpointer.update(frame):
+            endpointer.record_endpoint(cursor)
+            break
+        if not endpointer.speech_started and i + 1 >= no_speech_frames:
+            break
+
+    return buffer[:filled]
+
+
+def save_wav(audio: bytes | np.ndarray, path: Path, sample_rate: int = 16000) -> None:
+    """Save mono audio (int16 PCM bytes or float32 array) to WAV file. Debug/offline use only."""
     import wave
 
+    if isinstance(audio, np.ndarray):
+        audio = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
     with wave.open(str(path), "wb") as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)
         wf.setframerate(sample_rate)
-        wf.writeframes(pcm_bytes)
+        wf.writeframes(audio)
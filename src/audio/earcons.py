@@ -0,0 +1,28 @@
+"""Short UI tones (earcons) generated once and kept in memory."""
+
+import numpy as np
+
+
+def tone(
+    freqs: list[float],
+    *,
+    sample_rate: int = 22050,
+    note_ms: int = 70,
+    volume: float = 0.25,
+) -> np.ndarray:
+    """Consecutive sine notes with short fades, as mono int16."""
+    n = int(sample_rate * note_ms / 1000)
+    t = np.arange(n) / sample_rate
+    fade = np.minimum(1.0, np.minimum(np.arange(n), np.arange(n)[::-1]) / (0.01 * sample_rate))
+    notes = [np.sin(2 * np.pi * f * t) * fade for f in freqs]
+    return (np.concatenate(notes) * volume * 32767).astype(np.int16)
+
+
+def listening(sample_rate: int = 22050) -> np.ndarray:
+    """Rising two-note chime: recording has started."""
+    return tone([660.0, 880.0], sample_rate=sample_rate)
+
+
+def thinking(sample_rate: int = 22050) -> np.ndarray:
+    """Single soft note: question understood, waiting for the answer."""
+    return tone([520.0], sample_rate=sample_rate, note_ms=90, volume=0.15)
@@ -0,0 +1,110 @@
+"""Energy-based echo gating: tell the assistant's own voice in the mic from a user talking over it."""
+
+import math
+
+import numpy as np
+
+from .playback import AudioOutput
+
+# Largest jump above the tracked coupling that still counts as echo when adapting
+_MAX_STEP_DB = 3.0
+
+
+class EchoGate:
+    """
+    Per-frame double-talk detector for a mic that hears the speaker. While `output` is
+    playing, the mic level is compared with the far-end (output) level: echo arrives
+    attenuated by a roughly constant coupling. A frame is echo unless it is `margin_db`
+    louder than the far end plus that coupling. The coupling is the upper envelope of
+    the echo frames' mic-to-far ratio (quickly up, slowly down), so gaps between words,
+    where the far-end window is still loud but the mic only hears the room, can't drag
+    it down; frames within `floor_margin_db` of the mic noise floor don't adapt it at
+    all. It starts high (echo as loud as the output) and is set from the average of
+    the first `learn_frames` echo frames. Cheaper and more robust to device buffering
+    than sample-level cancellation; the cost is that barge-in needs the user to be
+    clearly louder than the echo.
+    """
+
+    def __init__(
+        self,
+        output: AudioOutput,
+        *,
+        margin_db: float = 10.0,
+        window_s: float = 0.3,
+        silent_db: float = -60.0,
+        initial_coupling_db: float = 0.0,
+        floor_margin_db: float = 10.0,
+        floor_rise_db_s: float = 0.5,
+        learn_frames: int = 10,
+        sample_rate: int = 16000,
+    ):
+        self.output = output
+        self.margin_db = margin_db
+        self.window_s = window_s
+        self.silent_db = silent_db
+        self.coupling_db = initial_coupling_db
+        self.floor_margin_db = floor_margin_db
+        self.floor_rise_db_s = floor_rise_db_s
+        self.learn_frames = learn_frames
+        self.sample_rate = sample_rate
+        self.floor_db: float | None = None
+        self.frames = 0
+        self.gated = 0
+        self._learned = 0
+        self._scratch = np.zeros(0, dtype=np.float32)
+
+    def _level_db(self, frame: np.ndarray) -> float:
+        if frame.dtype != np.float32:
+            if len(self._scratch) != len(frame):
+                self._scratch = np.zeros(len(frame), dtype=np.float32)
+            self._scratch[...] = frame
+            frame = self._scratch
+            scale = 32768.0 * 32768.0
+        else:
+            scale = 1.0
+        energy = float(np.dot(frame, frame)) / max(1, len(frame)) / scale
+        return 10.0 * math.log10(energy + 1e-10)
+
+    def _track_floor(self, level: float, samples: int) -> None:
+        """Mic noise floor: follows quiet frames down quickly, creeps up slowly."""
+        if self.floor_db is None:
+            self.floor_db = level
+        elif level < self.floor_db:
+            self.floor_db += 0.2 * (level - self.floor_db)
+        else:
+            self.floor_db = min(level, self.floor_db + self.floor_rise_db_s * samples / self.sample_rate)
+
+    def _adapt(self, excess: float) -> None:
+        if excess > self.coupling_db + _MAX_STEP_DB:
+            # Too far above the envelope to be echo: likely quiet double-talk, don't learn it
+            return
+        if self._learned < self.learn_frames:
+            self._learned += 1
+            if self._learned == 1:
+                self.coupling_db = excess
+            else:
+                self.coupling_db += (excess - self.coupling_db) / self._learned
+        else:
+            self.coupling_db += (excess - self.coupling_db) * (0.3 if excess > self.coupling_db else 0.005)
+
+    def is_echo(self, frame: np.ndarray) -> bool:
+        """True if the mic frame (float32, or int16 PCM) is only the output playing back."""
+        mic_db = self._level_db(frame)
+        self._track_floor(mic_db, len(frame))
+        far_db = self.output.far_level_db(self.window_s)
+        if far_db <= self.silent_db:
+            return False
+        self.frames += 1
+        excess = mic_db - far_db
+        if excess < self.coupling_db + self.margin_db:
+            if mic_db > self.floor_db + self.floor_margin_db:
+                self._adapt(excess)
+            self.gated += 1
+            return True
+        return False
+
+    def summary(self) -> str:
+        return (
+            f"echo coupling {self.coupling_db:.0f} dB, "
+            f"{self.gated}/{self.frames} frames gated during playback"
+        )
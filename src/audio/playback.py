@@ -1,13 +1,188 @@
-"""Play WAV audio through default output device."""
+"""Play audio through the output device: one-shot WAV files or a persistent stream."""
 
+import math
+import threading
+import time
 from pathlib import Path
 
+import numpy as np
 import sounddevice as sd
-import soundfile as sf
 
 
 def play_wav(path: Path | str, device: int | None = None) -> None:
     """Play a WAV file and block until finished."""
+    import soundfile as sf
+
     data, samplerate = sf.read(str(path), dtype="float32")
     sd.play(data, samplerate, device=device)
     sd.wait()
+
+
+class AudioOutput:
+    """
+    Long-lived mono int16 output stream fed through a bounded ring buffer.
+    `write` returns as soon as samples are queued (blocking only while the ring is
+    full), so playback starts with the first synthesized chunk. The stream is opened
+    lazily and reopened if the sample rate changes.
+    The callback keeps the level of recent output blocks (`far_level_db`), so capture
+    can tell its own echo from a user talking over it; `flush` drops queued audio.
+    """
+
+    def __init__(
+        self,
+        *,
+        device: int | None = None,
+        capacity_s: float = 2.0,
+        blocksize: int = 1024,
+    ):
+        self.device = device
+        self.capacity_s = capacity_s
+        self.blocksize = blocksize
+        self.sample_rate: int | None = None
+
+        self._stream: sd.OutputStream | None = None
+        self._ring = np.zeros(0, dtype=np.int16)
+        # Monotonic sample counters; ring index = counter % len(ring).
+        # Single writer advances _written, only the audio callback advances _read.
+        self._written = 0
+        self._read = 0
+        self._space = threading.Event()
+        self._lock = threading.Lock()
+        # flush(): the callback skips ahead to _skip_to; writers abort when _flushes changes.
+        # _publish guards "check _flushes, then advance _written" against a flush in between.
+        self._publish = threading.Lock()
+        self._skip_to = 0
+        self._flushes = 0
+        # Levels (dBFS) and monotonic times of the last output blocks
+        self._levels = np.full(32, -100.0)
+        self._level_times = np.zeros(32)
+        self._level_i = 0
+        self._scratch = np.zeros(max(blocksize, 4096), dtype=np.float32)
+        # Monotonic time of the latest `write` (what the mic may have heard since)
+        self.last_write = 0.0
+
+    def _open(self, sample_rate: int) -> None:
+        self.close()
+        self.sample_rate = sample_rate
+        self._ring = np.zeros(int(sample_rate * self.capacity_s), dtype=np.int16)
+        self._written = 0
+        self._read = 0
+        self._skip_to = 0
+        self._stream = sd.OutputStream(
+            samplerate=sample_rate,
+            channels=1,
+            dtype="int16",
+            blocksize=self.blocksize,
+            device=self.device,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def _callback(self, outdata: np.ndarray, frames: int, time_info: object, status: object) -> None:
+        if status:
+            print(f"[playback] {status}", flush=True)
+        out = outdata[:, 0]
+        cap = len(self._ring)
+        if self._skip_to > self._read:
+            self._read = self._skip_to
+        n = min(frames, self._written - self._read)
+        start = self._read % cap
+        first = min(n, cap - start)
+        out[:first] = self._ring[start:start + first]
+        out[first:n] = self._ring[: n - first]
+        out[n:] = 0
+        self._read += n
+        self._space.set()
+        self._note_level(out)
+
+    def _note_level(self, out: np.ndarray) -> None:
+        x = self._scratch[: min(len(out), len(self._scratch))]
+        x[...] = out[: len(x)]
+        energy = float(np.dot(x, x)) / max(1, len(x)) / (32768.0 * 32768.0)
+        i = self._level_i % len(self._levels)
+        self._levels[i] = 10.0 * math.log10(energy + 1e-10)
+        self._level_times[i] = time.monotonic()
+        self._level_i += 1
+
+    def far_level_db(self, window_s: float = 0.3) -> float:
+        """Loudest output block of the last `window_s` seconds, in dBFS (-100 if silent)."""
+        recent = self._level_times >= time.monotonic() - window_s
+        return float(self._levels[recent].max()) if recent.any() else -100.0
+
+    @property
+    def playing(self) -> bool:
+        return self._stream is not None and self._read < self._written
+
+    def write(self, pcm: np.ndarray, sample_rate: int) -> None:
+        """
+        Queue mono int16 samples for playback, blocking while the ring is full. Returns
+        early, dropping the rest, if `flush` is called meanwhile.
+        """
+        flushes = self._flushes
+        self.last_write = time.monotonic()
+        with self._lock:
+            if self._stream is None or not self._stream.active or sample_rate != self.sample_rate:
+                self.drain()
+                self._open(sample_rate)
+
+            cap = len(self._ring)
+            pos = 0
+            while pos < len(pcm):
+                if self._flushes != flushes:
+                    return
+                free = cap - (self._written - self._read)
+                if free <= 0:
+                    if not self._stream.active:
+                        print("[playback] Output stream stopped; dropping the rest", flush=True)
+                        return
+                    self._space.clear()
+                    self._space.wait(timeout=0.05)
+                    continue
+                n = min(free, len(pcm) - pos)
+                start = self._written % cap
+                first = min(n, cap - start)
+                self._ring[start:start + first] = pcm[pos:pos + first]
+                self._ring[: n - first] = pcm[pos + first:pos + n]
+                with self._publish:
+                    if self._flushes != flushes:
+                        return  # flushed while copying: never make this chunk playable
+                    self._written += n
+                pos += n
+
+    def drain(self) -> None:
+        """
+        Block until everything queued has been played. Gives up, dropping the rest, if
+        the stream stops (device gone, closed from another thread) or playback takes a
+        second longer than the queued audio.
+        """
+        stream = self._stream
+        if stream is None:
+            return
+        deadline = time.monotonic() + (self._written - self._read) / (self.sample_rate or 1) + 1.0
+        while self._read < self._written:
+            if self._stream is not stream or not stream.active or time.monotonic() > deadline:
+                print("[playback] Output stream stalled; dropping queued audio", flush=True)
+                with self._publish:
+                    self._skip_to = self._written
+                return
+            self._space.clear()
+            self._space.wait(timeout=0.05)
+        # Last block still in the device buffer
+        time.sleep(stream.latency)
+
+    def flush(self) -> None:
+        """
+        Drop everything queued; playback goes silent within one device block. Does not
+        wait or take the writer lock, so it can interrupt a blocked `write` or `drain`.
+        """
+        with self._publish:
+            self._flushes += 1
+            self._skip_to = self._written
+        self._space.set()
+
+    def close(self) -> None:
+        """Stop and release the output stream."""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
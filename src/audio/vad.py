@@ -0,0 +1,243 @@
+"""Frame-level voice activity detection and end-of-speech endpointing."""
+
+import copy
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from .bus import Cursor
+
+
+class EnergyVad:
+    """
+    Energy VAD with an adaptive noise floor. A frame is speech when its level is
+    `margin_db` above the tracked floor (and above `min_level_db`). The floor follows
+    quiet frames quickly and creeps up slowly, so it adapts to a noisy room (unless
+    `adapt` is off).
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        margin_db: float = 9.0,
+        min_level_db: float = -55.0,
+        floor_rise_db_s: float = 0.5,
+        adapt: bool = True,
+    ):
+        if not 10 <= frame_ms <= 30:
+            raise ValueError("VAD frame_ms must be between 10 and 30")
+        self.sample_rate = sample_rate
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.min_level_db = min_level_db
+        self._rise_per_frame = floor_rise_db_s * frame_ms / 1000
+        self.adapt = adapt
+        self.floor_db = min_level_db
+
+    @staticmethod
+    def level_db(frame: np.ndarray) -> float:
+        energy = float(np.dot(frame, frame)) / max(1, len(frame))
+        return 10.0 * math.log10(energy + 1e-10)
+
+    def calibrate(self, audio: np.ndarray) -> None:
+        """Set the noise floor from recent background audio (20th percentile frame level)."""
+        n = len(audio) // self.frame_samples
+        if n == 0:
+            return
+        frames = audio[: n * self.frame_samples].reshape(n, self.frame_samples)
+        levels = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        self.floor_db = float(np.percentile(levels, 20))
+
+    def fork(self) -> "EnergyVad":
+        """Independent copy with the current floor, frozen (for checks that must not move it)."""
+        vad = copy.copy(self)
+        vad.adapt = False
+        return vad
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        level = self.level_db(frame)
+        if self.adapt:
+            if level < self.floor_db:
+                self.floor_db += 0.2 * (level - self.floor_db)
+            else:
+                self.floor_db = min(level, self.floor_db + self._rise_per_frame)
+        return level > max(self.floor_db + self.margin_db, self.min_level_db)
+
+
+class SileroVad:
+    """
+    Silero VAD (v5 ONNX export) on CPU through onnxruntime. Needs 512-sample frames
+    at 16 kHz (32 ms). Install onnxruntime and download silero_vad.onnx to use it.
+    """
+
+    def __init__(
+        self,
+        model_path: Path | str,
+        *,
+        sample_rate: int = 16000,
+        threshold: float = 0.5,
+    ):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError("Silero VAD needs onnxruntime. Install with: pip install onnxruntime") from e
+        if sample_rate != 16000:
+            raise ValueError("Silero VAD supports 16 kHz here")
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        self._session = onnxruntime.InferenceSession(
+            str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.sample_rate = sample_rate
+        self.frame_samples = 512
+        self.threshold = threshold
+        self._sr = np.array(sample_rate, dtype=np.int64)
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._context = np.zeros(64, dtype=np.float32)
+        self._input = np.zeros((1, 64 + 512), dtype=np.float32)
+
+    def fork(self) -> "SileroVad":
+        """Independent detector sharing the loaded model, with fresh recurrent state."""
+        vad = copy.copy(self)
+        vad._state = np.zeros_like(self._state)
+        vad._context = np.zeros_like(self._context)
+        vad._input = np.zeros_like(self._input)
+        return vad
+
+    def calibrate(self, audio: np.ndarray) -> None:
+        """Model is noise-robust; just reset recurrent state."""
+        self._state[:] = 0
+        self._context[:] = 0
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        # v5 expects the previous 64 samples prepended to each frame
+        self._input[0, :64] = self._context
+        self._input[0, 64:] = frame
+        self._context[:] = frame[-64:]
+        prob, self._state = self._session.run(
+            None, {"input": self._input, "state": self._state, "sr": self._sr}
+        )
+        return float(prob[0][0]) >= self.threshold
+
+
+@dataclass
+class EndpointStats:
+    """Running endpointing quality numbers across turns."""
+
+    endpoints: int = 0
+    trailing_ms: float = 0.0
+    lag_ms: float = 0.0
+    audited: int = 0
+    false_cuts: int = 0
+
+    def summary(self) -> str:
+        n = max(1, self.endpoints)
+        rate = self.false_cuts / self.audited if self.audited else 0.0
+        return (
+            f"endpoint {self.trailing_ms / n:.0f}ms after speech + {self.lag_ms / n:.0f}ms lag (avg), "
+            f"false cuts {self.false_cuts}/{self.audited} ({rate:.0%})"
+        )
+
+
+class Endpointer:
+    """
+    Hangover endpointing on top of a frame VAD: speech starts after `onset_ms` of
+    consecutive speech frames and ends after `hangover_ms` without speech.
+    """
+
+    def __init__(
+        self,
+        vad: EnergyVad | SileroVad,
+        *,
+        hangover_ms: int = 300,
+        onset_ms: int = 60,
+        false_cut_window_ms: int = 700,
+    ):
+        self.vad = vad
+        self.frame_samples = vad.frame_samples
+        self.frame_ms = 1000 * vad.frame_samples / vad.sample_rate
+        self.hangover_frames = max(1, math.ceil(hangover_ms / self.frame_ms))
+        self.onset_frames = max(1, math.ceil(onset_ms / self.frame_ms))
+        self.false_cut_window_ms = false_cut_window_ms
+        self.stats = EndpointStats()
+        self.reset()
+
+    def reset(self, holdoff_ms: float = 0) -> None:
+        """Start a new utterance. Speech in the first `holdoff_ms` (e.g. our own earcon) is ignored."""
+        self._holdoff = math.ceil(holdoff_ms / self.frame_ms)
+        self.speech_started = False
+        self.frames = 0
+        self._run = 0
+        self._silent = 0
+        self.cut_position: int | None = None
+        self.cut_time = 0.0
+
+    @property
+    def trailing_silence_ms(self) -> float:
+        return self._silent * self.frame_ms
+
+    def update(self, frame: np.ndarray) -> bool:
+        """Feed one frame; True once the utterance has ended."""
+        self.frames += 1
+        speech = self.vad.is_speech(frame)
+        if self._holdoff > 0:
+            self._holdoff -= 1
+            return False
+        if speech:
+            self._run += 1
+            self._silent = 0
+            if self._run >= self.onset_frames:
+                self.speech_started = True
+        else:
+            self._run = 0
+            if self.speech_started:
+                self._silent += 1
+        return self.speech_started and self._silent >= self.hangover_frames
+
+    def record_endpoint(self, cursor: Cursor) -> None:
+        """Note an endpoint at the cursor and how far behind live capture it was decided."""
+        self.cut_position = cursor.position
+        self.cut_time = time.monotonic()
+        self.stats.endpoints += 1
+        self.stats.trailing_ms += self.trailing_silence_ms
+        lag = cursor.available()
+        self.stats.lag_ms += 1000 * lag / self.vad.sample_rate
+
+    def audit(
+        self,
+        cursor: Cursor,
+        vad: EnergyVad | SileroVad,
+        interrupted: Callable[[], bool] | None = None,
+    ) -> bool | None:
+        """
+        Check whether speech resumed within `false_cut_window_ms` after a cut, reading
+        from `cursor` (placed at the cut) as the audio is captured, with `vad` (a `fork`
+        of the endpointer's, so the live noise floor is not touched). Returns None, and
+        counts nothing, if the window was overwritten or `interrupted()` says our own
+        output (earcon, answer) may be in it.
+        """
+        window = int(vad.sample_rate * self.false_cut_window_ms / 1000)
+        frame = np.empty(vad.frame_samples, dtype=np.float32)
+        overruns = cursor.overruns
+        run = 0
+        resumed = False
+        for _ in range(window // vad.frame_samples):
+            if not cursor.read(frame, timeout=1.0) or cursor.overruns != overruns:
+                return None
+            run = run + 1 if vad.is_speech(frame) else 0
+            if run >= self.onset_frames:
+                resumed = True
+                break
+        if interrupted is not None and interrupted():
+            return None
+        self.stats.audited += 1
+        self.stats.false_cuts += int(resumed)
+        return resumed
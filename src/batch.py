@@ -0,0 +1,246 @@
+"""
+Offline batch mode: run a directory of recorded questions through STT -> LLM -> TTS
+without a microphone, at full throughput (QA, regression runs, prompt tuning).
+
+Each recording is one question, answered on its own (no conversation history).
+Results go to OUTPUT_DIR: `manifest.jsonl` (one record per recording: transcript,
+answer, audio path, per-stage seconds, status) and `audio/` (spoken answers as WAV).
+Recordings already in the manifest with status ok or empty are skipped, so an
+interrupted run picks up where it stopped; failed ones are retried.
+
+Run:
+    python -m src.batch recordings/ out/ [--stt-workers 1] [--llm-workers 4] [--tts-workers 2] [--no-tts]
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+# Ensure repo root is on path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import load_config
+from src.llm import client_from_config
+from src.stt import configure_registry, transcribe_audio
+from src.tts import configure_voice_cache, synthesize_speech
+
+Item = dict[str, Any]
+
+DONE_STATUSES = ("ok", "empty")
+
+
+def stage(name: str, fn: Callable[[Item], None], items: Iterable[Item], workers: int) -> Iterator[Item]:
+    """
+    Apply `fn` to items on `workers` threads, yielding items as they finish (not in
+    order). At most 2 x `workers` items are in flight, so a slow stage holds back the
+    ones before it instead of piling up work. Items that already failed pass through;
+    an exception in `fn` marks the item failed instead of stopping the batch.
+    """
+
+    def run(item: Item) -> Item:
+        if item["status"] != "pending":
+            return item
+        t0 = time.perf_counter()
+        try:
+            fn(item)
+        except Exception as e:
+            item["status"] = "error"
+            item["error"] = f"{name}: {e.__class__.__name__}: {e}"
+        item[f"{name}_s"] = round(time.perf_counter() - t0, 3)
+        return item
+
+    pool = ThreadPoolExecutor(max(1, workers), thread_name_prefix=f"batch-{name}")
+    pending: set[Future] = set()
+    try:
+        for item in items:
+            pending.add(pool.submit(run, item))
+            if len(pending) >= 2 * max(1, workers):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (f.result() for f in done)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from (f.result() for f in done)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def read_manifest(path: Path) -> dict[str, Item]:
+    """Records by id; the last record of an id wins. A line cut short by a crash is ignored."""
+    records: dict[str, Item] = {}
+    if not path.exists():
+        return records
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["id"]] = record
+    return records
+
+
+class BatchRunner:
+    """STT, LLM and TTS stages over the models and settings of the live assistant's config."""
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        output_dir: Path,
+        *,
+        stt_workers: int = 1,
+        llm_workers: int = 4,
+        tts_workers: int = 2,
+        tts: bool = True,
+    ):
+        self.stt_cfg = config.get("stt", {})
+        self.ollama_cfg = config.get("ollama", {})
+        self.tts_cfg = config.get("tts", {})
+        self.output_dir = output_dir
+        self.stt_workers = stt_workers
+        self.llm_workers = llm_workers
+        self.tts_workers = tts_workers
+        self.tts = tts
+        configure_registry(max_models=self.stt_cfg.get("max_resident_models", 2))
+        configure_voice_cache(
+            max_voices=self.tts_cfg.get("max_cached_voices", 2),
+            intra_op_threads=self.tts_cfg.get("intra_op_threads", 0),
+            inter_op_threads=self.tts_cfg.get("inter_op_threads", 0),
+        )
+        self.llm = client_from_config(self.ollama_cfg, pool_size=llm_workers)
+
+    def transcribe(self, item: Item) -> None:
+        item["transcript"] = transcribe_audio(
+            item["path"],
+            model_size=self.stt_cfg.get("model_size", "base"),
+            language=self.stt_cfg.get("language", "en"),
+            device=self.stt_cfg.get("device", "cpu"),
+            compute_type=self.stt_cfg.get("compute_type", "int8"),
+        )
+        if not item["transcript"]:
+            item["status"] = "empty"
+
+    def answer(self, item: Item) -> None:
+        item["answer"] = self.llm.generate(
+            item["transcript"],
+            system_prompt=self.ollama_cfg.get("system_prompt", ""),
+            temperature=self.ollama_cfg.get("temperature", 0.7),
+            max_tokens=self.ollama_cfg.get("max_tokens", 150),
+        )
+
+    def speak(self, item: Item) -> None:
+        if not item["answer"]:
+            return
+        out = self.output_dir / "audio" / Path(item["id"]).with_suffix(".wav")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        synthesize_speech(
+            item["answer"],
+            voice_model=self.tts_cfg.get("voice_model", "models/piper/en_US-lessac-medium"),
+            speed=self.tts_cfg.get("speed", 1.0),
+            use_cuda=self.tts_cfg.get("use_cuda", False),
+            output_path=out,
+        )
+        item["audio"] = out.relative_to(self.output_dir).as_posix()
+
+    def process(self, items: Iterable[Item]) -> Iterator[Item]:
+        """The pipeline as chained generators; finished items come out in completion order."""
+        results = stage("stt", self.transcribe, items, self.stt_workers)
+        results = stage("llm", self.answer, results, self.llm_workers)
+        if self.tts:
+            results = stage("tts", self.speak, results, self.tts_workers)
+        for item in results:
+            if item["status"] == "pending":
+                item["status"] = "ok"
+            yield item
+
+    def close(self) -> None:
+        self.llm.close()
+
+
+def find_recordings(input_dir: Path, pattern: str) -> list[Path]:
+    return sorted(p for p in input_dir.rglob(pattern) if p.is_file())
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a directory of recorded questions through STT, LLM and TTS.")
+    parser.add_argument("input_dir", type=Path, help="Directory of recordings (searched recursively).")
+    parser.add_argument("output_dir", type=Path, help="Where manifest.jsonl and audio/ are written.")
+    parser.add_argument("--config", type=Path, default=None, help="Config file (default: config.yaml).")
+    parser.add_argument("--pattern", default="*.wav", help="Recording file glob (default: *.wav).")
+    parser.add_argument("--stt-workers", type=int, default=None, help="Concurrent transcriptions (default: batch.stt_workers).")
+    parser.add_argument("--llm-workers", type=int, default=None, help="Concurrent LLM requests (default: batch.llm_workers).")
+    parser.add_argument("--tts-workers", type=int, default=None, help="Concurrent syntheses (default: batch.tts_workers).")
+    parser.add_argument("--no-tts", action="store_true", help="Only transcribe and answer; write no audio.")
+    parser.add_argument("--limit", type=int, default=0, help="Process at most this many recordings.")
+    parser.add_argument("--restart", action="store_true", help="Ignore the existing manifest and redo everything.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config(args.config)
+    batch_cfg = config.get("batch", {})
+
+    recordings = find_recordings(args.input_dir, args.pattern)
+    manifest_path = args.output_dir / "manifest.jsonl"
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    if args.restart and manifest_path.exists():
+        manifest_path.unlink()
+    finished = {
+        rid for rid, record in read_manifest(manifest_path).items() if record.get("status") in DONE_STATUSES
+    }
+    todo = [p for p in recordings if p.relative_to(args.input_dir).as_posix() not in finished]
+    done = len(recordings) - len(todo)
+    if args.limit > 0:
+        todo = todo[: args.limit]
+    print(f"[batch] {len(recordings)} recordings, {done} already done, {len(todo)} to process", flush=True)
+    if not todo:
+        return
+
+    runner = BatchRunner(
+        config,
+        args.output_dir,
+        stt_workers=args.stt_workers or batch_cfg.get("stt_workers", 1),
+        llm_workers=args.llm_workers or batch_cfg.get("llm_workers", 4),
+        tts_workers=args.tts_workers or batch_cfg.get("tts_workers", 2),
+        tts=not args.no_tts and batch_cfg.get("tts", True),
+    )
+    items = (
+        {"id": p.relative_to(args.input_dir).as_posix(), "path": str(p), "status": "pending"} for p in todo
+    )
+    counts: dict[str, int] = {}
+    busy: dict[str, float] = {}
+    t0 = time.perf_counter()
+    n = 0
+    try:
+        with open(manifest_path, "a", encoding="utf-8") as manifest:
+            for item in runner.process(items):
+                n += 1
+                counts[item["status"]] = counts.get(item["status"], 0) + 1
+                for name in ("stt", "llm", "tts"):
+                    busy[name] = busy.get(name, 0.0) + item.get(f"{name}_s", 0.0)
+                manifest.write(json.dumps({k: v for k, v in item.items() if k != "path"}) + "\n")
+                manifest.flush()  # a crash loses at most the item in progress
+                if item["status"] == "error":
+                    print(f"[batch] {item['id']}: {item['error']}", flush=True)
+                if n % 10 == 0 or n == len(todo):
+                    elapsed = time.perf_counter() - t0
+                    print(f"[batch] {n}/{len(todo)} done, {n / elapsed:.2f} items/s", flush=True)
+    except KeyboardInterrupt:
+        print("\n[batch] Stopping; run again to resume", flush=True)
+    finally:
+        runner.close()
+
+    elapsed = time.perf_counter() - t0
+    rate = n / elapsed if elapsed > 0 else 0.0
+    # Stage busy time / wall time = average concurrency the stage reached
+    stages = " | ".join(f"{name} {s / elapsed:.1f}x busy" for name, s in busy.items() if s > 0)
+    outcome = ", ".join(f"{v} {k}" for k, v in sorted(counts.items()))
+    print(f"[batch] {n} items in {elapsed:.1f}s ({rate:.2f} items/s): {outcome} | {stages}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
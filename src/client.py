@@ -0,0 +1,133 @@
+"""
+Test client for the voice server: streams a 16 kHz mono WAV as one utterance and
+prints the transcript, the response, and latencies. Several sessions can run at once
+to exercise batching and backpressure.
+
+Run:
+    python -m src.server &
+    python -m src.client question.wav [--sessions 4] [--realtime] [--out replies/]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import wave
+from pathlib import Path
+
+# Ensure repo root is on path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import protocol
+
+CHUNK_MS = 20
+
+
+def read_wav(path: Path) -> bytes:
+    with wave.open(str(path), "rb") as wf:
+        if wf.getframerate() != 16000 or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: need 16 kHz mono 16-bit PCM")
+        return wf.readframes(wf.getnframes())
+
+
+async def run_session(
+    index: int,
+    pcm: bytes,
+    *,
+    host: str,
+    port: int,
+    realtime: bool,
+    out_dir: Path | None,
+) -> dict:
+    reader, writer = await asyncio.open_connection(host, port)
+    frame = await protocol.read_frame(reader)
+    if frame is None or frame[0] != protocol.READY:
+        raise ConnectionError(f"session {index}: server refused: {frame[1].decode() if frame else 'closed'}")
+
+    writer.write(protocol.json_frame(protocol.HELLO, {"sample_rate": 16000}))
+    chunk = 16000 * CHUNK_MS // 1000 * 2
+    for i in range(0, len(pcm), chunk):
+        writer.write(protocol.frame(protocol.AUDIO, pcm[i : i + chunk]))
+        await writer.drain()
+        if realtime:
+            await asyncio.sleep(CHUNK_MS / 1000)
+    writer.write(protocol.frame(protocol.END))
+    await writer.drain()
+    sent = time.perf_counter()
+    writer.write_eof()
+
+    # The server may split the audio into several utterances (VAD); it hangs up after the last
+    result = {"session": index, "transcript": [], "response": [], "first_audio_ms": None, "turns": []}
+    speech = bytearray()
+    sample_rate = 0
+    while True:
+        frame = await protocol.read_frame(reader)
+        if frame is None:
+            break
+        kind, payload = frame
+        if kind == protocol.TRANSCRIPT:
+            result["transcript"].append(json.loads(payload)["text"])
+            result.setdefault("transcript_ms", round((time.perf_counter() - sent) * 1000))
+        elif kind == protocol.TEXT:
+            result["response"].append(payload.decode("utf-8"))
+        elif kind == protocol.SPEECH:
+            if result["first_audio_ms"] is None:
+                result["first_audio_ms"] = round((time.perf_counter() - sent) * 1000)
+            sample_rate, audio = protocol.parse_speech(payload)
+            speech += audio
+        elif kind == protocol.DONE:
+            result["turns"].append(json.loads(payload))
+        elif kind == protocol.ERROR:
+            result["error"] = json.loads(payload)["error"]
+    result["total_ms"] = round((time.perf_counter() - sent) * 1000)
+    writer.close()
+
+    if out_dir is not None and speech:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        with wave.open(str(out_dir / f"reply_{index}.wav"), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes(bytes(speech))
+    return result
+
+
+async def run(args: argparse.Namespace) -> None:
+    pcm = read_wav(args.wav)
+    results = await asyncio.gather(
+        *(
+            run_session(i, pcm, host=args.host, port=args.port, realtime=args.realtime, out_dir=args.out)
+            for i in range(args.sessions)
+        ),
+        return_exceptions=True,
+    )
+    for r in results:
+        if isinstance(r, Exception):
+            print(f"[client] {r}")
+            continue
+        print(
+            f"[client] session {r['session']}: transcript {r.get('transcript_ms', '-')}ms, "
+            f"first audio {r['first_audio_ms'] or '-'}ms, done {r['total_ms']}ms"
+        )
+        print(f"  you:  {' '.join(r['transcript'])}")
+        print(f"  dann: {' '.join(r['response']) or r.get('error', '')}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Send a WAV utterance to the voice server.")
+    parser.add_argument("wav", type=Path, help="16 kHz mono 16-bit WAV file.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=1, help="Concurrent sessions sending the same WAV.")
+    parser.add_argument("--realtime", action="store_true", help="Pace audio like a live microphone.")
+    parser.add_argument("--out", type=Path, default=None, help="Write reply audio here.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Pre-LLM fast path: local intents and a cache of recent answers."""
+
+import datetime
+import difflib
+import re
+import string
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+_PUNCT = str.maketrans("", "", string.punctuation)
+_FILLERS = {"um", "uh", "er"}
+_NUMBER = re.compile(r"\d")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and disfluencies, collapse whitespace."""
+    words = text.lower().translate(_PUNCT).split()
+    kept = [w for w in words if w not in _FILLERS]
+    return " ".join(kept or words)
+
+
+class ResponseCache:
+    """
+    Recent LLM answers keyed by normalized question. By default only the exact
+    normalized question hits. With `similarity` below 1.0, a near-duplicate also hits
+    when it has the same words and numbers (only order or repetition differs) and
+    difflib similarity is at least `similarity`; a single changed word ("on"/"off",
+    "13"/"14") always means a different question.
+    """
+
+    def __init__(self, *, ttl_s: float = 3600.0, max_entries: int = 256, similarity: float = 1.0):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            for k in [k for k, (_, t) in self._entries.items() if now - t > self.ttl_s]:
+                del self._entries[k]
+            hit = self._entries.get(key)
+            if hit is None and self.similarity < 1.0:
+                words = key.split()
+                tokens, numbers = set(words), [w for w in words if _NUMBER.search(w)]
+                matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+                for k in self._entries:
+                    other = k.split()
+                    if set(other) != tokens or [w for w in other if _NUMBER.search(w)] != numbers:
+                        continue
+                    matcher.set_seq1(k)
+                    if matcher.ratio() >= self.similarity:
+                        hit, key = self._entries[k], k
+                        break
+            if hit is None:
+                return None
+            self._entries.move_to_end(key)
+            return hit[0]
+
+    def put(self, key: str, answer: str) -> None:
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@dataclass
+class Intent:
+    """Deterministic local intent: regex over the normalized transcript -> answer."""
+
+    name: str
+    pattern: re.Pattern[str]
+    handler: Callable[[re.Match[str], "FastPath"], str]
+
+
+@dataclass
+class FastAnswer:
+    text: str
+    source: str  # "intent:<name>" or "cache"
+
+
+@dataclass
+class FastPathStats:
+    lookups: int = 0
+    intent_hits: int = 0
+    cache_hits: int = 0
+    saved_s: float = 0.0
+
+    def summary(self) -> str:
+        hits = self.intent_hits + self.cache_hits
+        rate = hits / self.lookups if self.lookups else 0.0
+        return (
+            f"fast path {hits}/{self.lookups} ({rate:.0%}: {self.intent_hits} intent, "
+            f"{self.cache_hits} cache), ~{self.saved_s:.1f}s LLM time saved"
+        )
+
+
+def _time(match: re.Match[str], fast: "FastPath") -> str:
+    now = datetime.datetime.now()
+    return f"It's {now.hour % 12 or 12}:{now:%M %p}."
+
+
+def _date(match: re.Match[str], fast: "FastPath") -> str:
+    now = datetime.datetime.now()
+    return f"Today is {now:%A}, {now:%B} {now.day}."
+
+
+def _repeat(match: re.Match[str], fast: "FastPath") -> str:
+    return fast.last_answer or "I haven't said anything yet."
+
+
+def _stop(match: re.Match[str], fast: "FastPath") -> str:
+    return ""
+
+
+DEFAULT_INTENTS = [
+    Intent("time", re.compile(r"^(what time (is it|it is)|(whats|what is) the time)( now)?$"), _time),
+    Intent("date", re.compile(r"^(whats|what is) (the date|todays date)( today)?$|^what day (is it|is today|it is)$"), _date),
+    Intent("repeat", re.compile(r"^(repeat( that)?|say (that|it) again|what did you say|come again)$"), _repeat),
+    Intent("stop", re.compile(r"^(stop|cancel|never ?mind|nothing|be quiet|shut up)$"), _stop),
+]
+
+
+class FastPath:
+    """
+    Runs before the LLM: local intents first, then the answer cache. `route` returns
+    None when the question has to go to the LLM; `remember` stores the LLM answer.
+    An empty answer (e.g. "stop") means: end the turn silently.
+    """
+
+    def __init__(
+        self,
+        *,
+        intents: list[Intent] | None = None,
+        cache: ResponseCache | None = None,
+    ):
+        self.intents = list(DEFAULT_INTENTS if intents is None else intents)
+        self.cache = cache
+        self.stats = FastPathStats()
+        self.last_answer = ""
+        self._llm_s: float | None = None
+
+    def register(self, intent: Intent) -> None:
+        self.intents.append(intent)
+
+    def peek(self, text: str, *, use_cache: bool = True) -> bool:
+        """Whether `route` would answer locally (no side effects, no stats)."""
+        key = normalize(text)
+        if any(intent.pattern.search(key) for intent in self.intents):
+            return True
+        return use_cache and self.cache is not None and self.cache.get(key) is not None
+
+    def route(self, text: str, *, use_cache: bool = True) -> FastAnswer | None:
+        t0 = time.perf_counter()
+        self.stats.lookups += 1
+        key = normalize(text)
+        answer: FastAnswer | None = None
+        for intent in self.intents:
+            m = intent.pattern.search(key)
+            if m:
+                answer = FastAnswer(intent.handler(m, self), f"intent:{intent.name}")
+                self.stats.intent_hits += 1
+                break
+        if answer is None and use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                answer = FastAnswer(cached, "cache")
+                self.stats.cache_hits += 1
+        if answer is None:
+            return None
+        if self._llm_s is not None:
+            self.stats.saved_s += max(0.0, self._llm_s - (time.perf_counter() - t0))
+        if answer.text and answer.source != "intent:repeat":
+            self.last_answer = answer.text
+        return answer
+
+    def remember(self, text: str, answer: str, llm_s: float, *, cacheable: bool = True) -> None:
+        """Record an LLM answer and how long the LLM took to produce it."""
+        self.last_answer = answer
+        self._llm_s = llm_s if self._llm_s is None else 0.8 * self._llm_s + 0.2 * llm_s
+        if cacheable and self.cache is not None and answer:
+            self.cache.put(normalize(text), answer)
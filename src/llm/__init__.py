@@ -1,5 +1,35 @@
-"""LLM integration (Ollama)."""
+"""LLM integration (Ollama). Submodules load on first use of a name (see src/lazy.py)."""
 
-from .ollama import generate_response
+from typing import TYPE_CHECKING
 
-__all__ = ["generate_response"]
+from src.lazy import lazy_exports
+
+_EXPORTS = {
+    "generate_response": ".ollama",
+    "stream_response": ".ollama",
+    "OllamaClient": ".ollama",
+    "Conversation": ".conversation",
+    "ConversationStats": ".conversation",
+    "StreamMetrics": ".ollama",
+    "SentenceChunker": ".ollama",
+    "StreamHandle": ".ollama",
+    "StreamClosed": ".ollama",
+    "OllamaRouter": ".router",
+    "client_from_config": ".router",
+}
+
+if TYPE_CHECKING:
+    from .conversation import Conversation, ConversationStats
+    from .ollama import (
+        OllamaClient,
+        SentenceChunker,
+        StreamClosed,
+        StreamHandle,
+        StreamMetrics,
+        generate_response,
+        stream_response,
+    )
+    from .router import OllamaRouter, client_from_config
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,203 @@
+"""Multi-turn conversation sessions over Ollama /api/chat with KV-cache reuse."""
+
+import time
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any, Iterator
+
+from .ollama import OllamaClient, SentenceChunker, StreamHandle, StreamMetrics
+
+if TYPE_CHECKING:
+    from .router import OllamaRouter
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars/token) for messages the server has not counted yet."""
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class ConversationStats:
+    """Prompt-eval work per session: what the server evaluated vs. what it reused."""
+
+    turns: int = 0
+    prompt_tokens: int = 0
+    evaluated_tokens: int = 0
+    prompt_eval_s: float = 0.0
+    saved_s: float = 0.0
+    evictions: int = 0
+
+    def summary(self) -> str:
+        reused = self.prompt_tokens - self.evaluated_tokens
+        return (
+            f"{self.turns} turns, prompt {self.prompt_tokens} tokens "
+            f"({reused} reused from cache), prefill {self.prompt_eval_s:.2f}s, "
+            f"~{self.saved_s:.2f}s saved, {self.evictions} evictions"
+        )
+
+
+class Conversation:
+    """
+    Chat history sent to /api/chat. Messages are only ever appended, and the system
+    prompt stays first, so each request shares its prefix with the previous one and
+    Ollama can reuse its KV cache instead of re-prefilling the whole history. History
+    is bounded by `token_budget`; when exceeded, oldest exchanges are dropped down to
+    `evict_to` of the budget at once (each eviction costs one full prefill).
+    """
+
+    def __init__(
+        self,
+        client: "OllamaClient | OllamaRouter",
+        *,
+        system_prompt: str = "",
+        token_budget: int = 1536,
+        evict_to: float = 0.6,
+        idle_reset_s: float = 300.0,
+    ):
+        self.client = client
+        self.system_prompt = system_prompt
+        self.token_budget = token_budget
+        self.evict_to = evict_to
+        self.idle_reset_s = idle_reset_s
+        self.stats = ConversationStats()
+        # (message, tokens) pairs after the system prompt
+        self._history: list[tuple[dict[str, str], int]] = []
+        self._system_tokens = _estimate_tokens(system_prompt) if system_prompt else 0
+        self._last_turn = 0.0
+        self._prefill_s_per_token: float | None = None
+
+    def reset(self) -> None:
+        """Forget the conversation."""
+        self._history.clear()
+
+    def _idle(self) -> bool:
+        return self.idle_reset_s > 0 and time.monotonic() - self._last_turn > self.idle_reset_s
+
+    @property
+    def has_history(self) -> bool:
+        """True when the next question would be sent with earlier exchanges as context."""
+        return bool(self._history) and not self._idle()
+
+    def record(self, user_text: str, answer: str) -> None:
+        """Append an exchange answered without the LLM (e.g. a local intent) to the history."""
+        if self._history and self._idle():
+            self.reset()
+        self._last_turn = time.monotonic()
+        if not answer:
+            return
+        self._history.append(({"role": "user", "content": user_text}, _estimate_tokens(user_text)))
+        self._history.append(({"role": "assistant", "content": answer}, _estimate_tokens(answer)))
+        self._evict()
+
+    def fork(self) -> "Conversation":
+        """
+        A copy of this session that can run a turn without touching it (e.g. a speculative
+        answer); `adopt` makes its history this session's once the answer is kept.
+        """
+        child = Conversation(
+            self.client,
+            system_prompt=self.system_prompt,
+            token_budget=self.token_budget,
+            evict_to=self.evict_to,
+            idle_reset_s=self.idle_reset_s,
+        )
+        child._history = list(self._history)
+        child._last_turn = self._last_turn
+        child._prefill_s_per_token = self._prefill_s_per_token
+        return child
+
+    def adopt(self, child: "Conversation") -> None:
+        """Take over the history (and add the stats) of a `fork` whose answer was kept."""
+        self._history = list(child._history)
+        self._last_turn = child._last_turn
+        self._prefill_s_per_token = child._prefill_s_per_token
+        for f in fields(ConversationStats):
+            setattr(self.stats, f.name, getattr(self.stats, f.name) + getattr(child.stats, f.name))
+
+    def _messages(self, user_text: str) -> list[dict[str, str]]:
+        if self._history and self._idle():
+            self.reset()
+        messages = [{"role": "system", "content": self.system_prompt}] if self.system_prompt else []
+        messages += [m for m, _ in self._history]
+        messages.append({"role": "user", "content": user_text})
+        return messages
+
+    def _history_tokens(self) -> int:
+        return self._system_tokens + sum(t for _, t in self._history)
+
+    def stream(
+        self,
+        user_text: str,
+        *,
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+        metrics: StreamMetrics | None = None,
+        chunker: SentenceChunker | None = None,
+        handle: StreamHandle | None = None,
+    ) -> Iterator[str]:
+        """Stream the answer as speakable chunks; the exchange is kept only if it completes."""
+        messages = self._messages(user_text)
+        prompt_estimate = self._history_tokens() + _estimate_tokens(user_text)
+        final: dict[str, Any] = {}
+        for chunk in self.client.chat_stream(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            metrics=metrics,
+            chunker=chunker,
+            final=final,
+            handle=handle,
+        ):
+            yield chunk
+        # Keep the answer exactly as generated, so the next request's prefix matches the server's cache
+        self._commit(user_text, final.get("text", ""), final, prompt_estimate)
+
+    def generate(self, user_text: str, *, temperature: float = 0.7, max_tokens: int = 150) -> str:
+        """Whole answer at once."""
+        messages = self._messages(user_text)
+        prompt_estimate = self._history_tokens() + _estimate_tokens(user_text)
+        answer, final = self.client.chat(messages, temperature=temperature, max_tokens=max_tokens)
+        self._commit(user_text, answer, final, prompt_estimate)
+        return answer
+
+    def _commit(self, user_text: str, answer: str, final: dict[str, Any], prompt_estimate: int) -> None:
+        self._last_turn = time.monotonic()
+        if not answer:
+            return
+
+        evaluated = int(final.get("prompt_eval_count") or 0)
+        eval_s = (final.get("prompt_eval_duration") or 0) / 1e9
+        answer_tokens = int(final.get("eval_count") or 0) or _estimate_tokens(answer)
+        # Cached prefix tokens are not evaluated (nor counted) by the server
+        prompt_tokens = max(prompt_estimate, evaluated)
+        reused = prompt_tokens - evaluated
+        if evaluated and eval_s and (self._prefill_s_per_token is None or reused == 0):
+            # Learn the prefill cost per token from (mostly) uncached prompts
+            self._prefill_s_per_token = eval_s / evaluated
+
+        s = self.stats
+        s.turns += 1
+        s.prompt_tokens += prompt_tokens
+        s.evaluated_tokens += evaluated
+        s.prompt_eval_s += eval_s
+        turn_saved = reused * (self._prefill_s_per_token or 0.0)
+        s.saved_s += turn_saved
+        print(
+            f"[llm] prompt {prompt_tokens} tokens, evaluated {evaluated} in {eval_s * 1000:.0f}ms, "
+            f"~{turn_saved * 1000:.0f}ms saved by cache reuse",
+            flush=True,
+        )
+
+        user_tokens = max(1, prompt_tokens - self._history_tokens())
+        self._history.append(({"role": "user", "content": user_text}, user_tokens))
+        self._history.append(({"role": "assistant", "content": answer}, answer_tokens))
+        self._evict()
+
+    def _evict(self) -> None:
+        if self._history_tokens() <= self.token_budget:
+            return
+        target = self.token_budget * self.evict_to
+        while self._history and self._history_tokens() > target:
+            # Drop a whole user/assistant exchange
+            del self._history[:2]
+        self.stats.evictions += 1
+        print(f"[llm] Conversation over budget; trimmed to {self._history_tokens()} tokens", flush=True)
@@ -1,26 +1,31 @@
 """Ollama API client for local LLM inference."""
 
+import functools
 import json
-from typing import Any
+import re
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator
 
 import requests
+import requests.adapters
 
 
-def generate_response(
+def _payload(
     prompt: str,
     *,
-    base_url: str = "http://localhost:11434",
-    model: str = "llama3.2",
-    system_prompt: str = "You are a concise voice assistant. Keep responses brief.",
-    temperature: float = 0.7,
-    max_tokens: int = 150,
-) -> str:
-    """Send prompt to Ollama and return generated text."""
-    url = f"{base_url.rstrip('/')}/api/generate"
+    model: str,
+    system_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    stream: bool,
+) -> dict[str, Any]:
     payload: dict[str, Any] = {
         "model": model,
         "prompt": prompt,
-        "stream": False,
+        "stream": stream,
         "options": {
             "temperature": temperature,
             "num_predict": max_tokens,
@@ -28,8 +33,402 @@ def generate_response(
     }
     if system_prompt:
         payload["system"] = system_prompt
+    return payload
+
+
+def _chat_payload(
+    messages: list[dict[str, str]],
+    *,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    stream: bool,
+) -> dict[str, Any]:
+    return {
+        "model": model,
+        "messages": messages,
+        "stream": stream,
+        "options": {
+            "temperature": temperature,
+            "num_predict": max_tokens,
+        },
+    }
+
+
+@dataclass
+class StreamMetrics:
+    """Timings of one streamed generation, in seconds since the request was sent."""
+
+    first_token_s: float | None = None
+    first_chunk_s: float | None = None
+    total_s: float | None = None
+    tokens: int = 0
+    chunks: int = 0
+
+    def summary(self) -> str:
+        def ms(v: float | None) -> str:
+            return "-" if v is None else f"{v * 1000:.0f}ms"
+
+        return (
+            f"first token {ms(self.first_token_s)}, first chunk {ms(self.first_chunk_s)}, "
+            f"total {ms(self.total_s)}, {self.tokens} tokens / {self.chunks} chunks"
+        )
+
+
+class StreamClosed(RuntimeError):
+    """A streaming request was closed through its StreamHandle before it finished."""
+
+
+class StreamHandle:
+    """
+    Lets another thread abort a streaming request: `close()` closes the HTTP response,
+    which unblocks a reader waiting for the next token (closing the generator cannot).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resps: list[requests.Response | StreamHandle] = []
+        self.closed = False
+
+    def attach(self, resp: "requests.Response | StreamHandle") -> None:
+        """Close `resp` with this handle; another handle can be attached (e.g. hedged requests)."""
+        with self._lock:
+            self._resps.append(resp)
+            if self.closed:
+                resp.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            for resp in self._resps:
+                if isinstance(resp, requests.Response):
+                    _shutdown(resp)
+                resp.close()
+
+
+def _shutdown(resp: requests.Response) -> None:
+    """
+    Shut the response's socket down first: closing alone waits for a read in progress,
+    i.e. for the server's next token, which could be seconds away while it prefills.
+    """
+    sock = getattr(getattr(resp.raw, "connection", None), "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+# Sentence end: terminal punctuation (optionally closing quote/bracket) then whitespace
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s")
+# Clause break used once the pending text gets long
+_CLAUSE_END = re.compile(r"[,;:—–]\s")
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "etc.", "e.g.", "i.e.", "no."}
+
+
+class SentenceChunker:
+    """
+    Accumulates streamed tokens and yields speakable chunks as soon as they complete.
+    Splits on sentence ends; splits on clause punctuation once pending text exceeds
+    `clause_chars`; hard-splits on whitespace beyond `max_chars`.
+    """
+
+    def __init__(self, *, clause_chars: int = 80, max_chars: int = 200):
+        self.clause_chars = clause_chars
+        self.max_chars = max_chars
+        self._buf = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add streamed text; return chunks that are now complete."""
+        self._buf += text
+        chunks: list[str] = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            chunk, self._buf = self._buf[:cut].strip(), self._buf[cut:].lstrip()
+            if chunk:
+                chunks.append(chunk)
+        return chunks
+
+    def flush(self) -> str | None:
+        """Return any remaining text at end of stream."""
+        chunk, self._buf = self._buf.strip(), ""
+        return chunk or None
 
-    resp = requests.post(url, json=payload, timeout=60)
-    resp.raise_for_status()
-    data = resp.json()
-    return data.get("response", "").strip()
+    def _find_cut(self) -> int | None:
+        for m in _SENTENCE_END.finditer(self._buf):
+            words = self._buf[: m.start() + 1].split()
+            if words and words[-1].lower() in _ABBREVIATIONS:
+                continue
+            return m.end()
+        if len(self._buf) >= self.clause_chars:
+            m = _CLAUSE_END.search(self._buf)
+            if m:
+                return m.end()
+        if len(self._buf) >= self.max_chars:
+            space = self._buf.rfind(" ", 0, self.max_chars)
+            return space + 1 if space > 0 else self.max_chars
+        return None
+
+
+class OllamaClient:
+    """
+    Reusable Ollama client over a pooled keep-alive `requests.Session`.
+    Requests carry `keep_alive` so the server keeps the model loaded between turns;
+    `preload()` loads it ahead of the first question. Connection resets (e.g. a pooled
+    socket the server already closed) are retried before any output is produced.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        *,
+        model: str = "llama3.2",
+        keep_alive: str | int = "30m",
+        connect_timeout_s: float = 3.0,
+        read_timeout_s: float = 60.0,
+        retries: int = 2,
+        pool_size: int = 4,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.keep_alive = keep_alive
+        self.timeout = (connect_timeout_s, read_timeout_s)
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, path: str, payload: dict[str, Any], *, stream: bool = False) -> requests.Response:
+        payload["keep_alive"] = self.keep_alive
+        for attempt in range(self.retries + 1):
+            try:
+                resp = self.session.post(
+                    f"{self.base_url}{path}", json=payload, timeout=self.timeout, stream=stream
+                )
+                if not resp.ok:
+                    resp.close()
+                resp.raise_for_status()
+                return resp
+            except requests.ConnectionError as e:
+                if attempt == self.retries:
+                    raise
+                print(f"[llm] Connection error ({e.__class__.__name__}), retrying...", flush=True)
+                time.sleep(0.05 * (attempt + 1))
+        raise AssertionError("unreachable")
+
+    def preload(self) -> float:
+        """Load the model on the server and pin it for `keep_alive`. Returns seconds taken."""
+        t0 = time.perf_counter()
+        self._post("/api/generate", {"model": self.model}).close()
+        load_s = time.perf_counter() - t0
+        print(f"[llm] Model {self.model} loaded in {load_s:.2f}s (keep_alive {self.keep_alive})", flush=True)
+        return load_s
+
+    def generate(
+        self,
+        prompt: str,
+        *,
+        model: str | None = None,
+        system_prompt: str = "You are a concise voice assistant. Keep responses brief.",
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+    ) -> str:
+        """Send prompt and return the whole generated text."""
+        payload = _payload(
+            prompt,
+            model=model or self.model,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=False,
+        )
+        with self._post("/api/generate", payload) as resp:
+            data = resp.json()
+        return data.get("response", "").strip()
+
+    def stream(
+        self,
+        prompt: str,
+        *,
+        model: str | None = None,
+        system_prompt: str = "You are a concise voice assistant. Keep responses brief.",
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+        metrics: StreamMetrics | None = None,
+        chunker: SentenceChunker | None = None,
+        handle: StreamHandle | None = None,
+    ) -> Iterator[str]:
+        """
+        Stream a response, yielding speakable sentence/clause chunks as they complete.
+        Closing the generator (or `handle`, from any thread) closes the HTTP stream.
+        Fills `metrics` if given.
+        """
+        payload = _payload(
+            prompt,
+            model=model or self.model,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        yield from self._stream("/api/generate", payload, metrics=metrics, chunker=chunker, handle=handle)
+
+    def chat(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+    ) -> tuple[str, dict[str, Any]]:
+        """Send a chat history to /api/chat; returns (answer, final response stats)."""
+        payload = _chat_payload(
+            messages,
+            model=model or self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=False,
+        )
+        with self._post("/api/chat", payload) as resp:
+            data = resp.json()
+        return data.get("message", {}).get("content", "").strip(), data
+
+    def chat_stream(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+        metrics: StreamMetrics | None = None,
+        chunker: SentenceChunker | None = None,
+        final: dict[str, Any] | None = None,
+        handle: StreamHandle | None = None,
+    ) -> Iterator[str]:
+        """
+        Stream a chat answer as speakable chunks. The last NDJSON object (with
+        prompt_eval_count etc.) is copied into `final` if given, with the answer
+        exactly as generated (unsplit, whitespace intact) under "text".
+        """
+        payload = _chat_payload(
+            messages,
+            model=model or self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        yield from self._stream(
+            "/api/chat", payload, metrics=metrics, chunker=chunker, final=final, handle=handle
+        )
+
+    def _stream(
+        self,
+        path: str,
+        payload: dict[str, Any],
+        *,
+        metrics: StreamMetrics | None,
+        chunker: SentenceChunker | None,
+        final: dict[str, Any] | None = None,
+        handle: StreamHandle | None = None,
+    ) -> Iterator[str]:
+        metrics = metrics if metrics is not None else StreamMetrics()
+        chunker = chunker or SentenceChunker()
+
+        t0 = time.perf_counter()
+        raw: list[str] = []
+
+        def emit(chunks: list[str]) -> list[str]:
+            if chunks and metrics.first_chunk_s is None:
+                metrics.first_chunk_s = time.perf_counter() - t0
+            metrics.chunks += len(chunks)
+            return chunks
+
+        with self._post(path, payload, stream=True) as resp:
+            if handle is not None:
+                handle.attach(resp)
+            try:
+                for line in resp.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if "error" in data:
+                        raise RuntimeError(f"Ollama error: {data['error']}")
+                    # /api/generate streams "response", /api/chat streams "message.content"
+                    token = data["message"].get("content", "") if "message" in data else data.get("response", "")
+                    if token:
+                        if metrics.first_token_s is None:
+                            metrics.first_token_s = time.perf_counter() - t0
+                        metrics.tokens += 1
+                        if final is not None:
+                            raw.append(token)
+                        yield from emit(chunker.feed(token))
+                    if data.get("done"):
+                        if final is not None:
+                            final.update(data)
+                            final["text"] = "".join(raw)
+                        break
+            except Exception as e:
+                if handle is not None and handle.closed:
+                    raise StreamClosed("stream closed") from e
+                raise
+            if handle is not None and handle.closed:
+                # A closed socket can also look like a clean end of stream
+                raise StreamClosed("stream closed")
+
+        tail = chunker.flush()
+        if tail:
+            yield from emit([tail])
+        metrics.total_s = time.perf_counter() - t0
+
+    def close(self) -> None:
+        self.session.close()
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_client(base_url: str) -> OllamaClient:
+    return OllamaClient(base_url)
+
+
+def generate_response(
+    prompt: str,
+    *,
+    base_url: str = "http://localhost:11434",
+    model: str = "llama3.2",
+    system_prompt: str = "You are a concise voice assistant. Keep responses brief.",
+    temperature: float = 0.7,
+    max_tokens: int = 150,
+) -> str:
+    """Send prompt to Ollama and return generated text (shared pooled client per URL)."""
+    return _shared_client(base_url.rstrip("/")).generate(
+        prompt,
+        model=model,
+        system_prompt=system_prompt,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
+
+
+def stream_response(
+    prompt: str,
+    *,
+    base_url: str = "http://localhost:11434",
+    model: str = "llama3.2",
+    system_prompt: str = "You are a concise voice assistant. Keep responses brief.",
+    temperature: float = 0.7,
+    max_tokens: int = 150,
+    metrics: StreamMetrics | None = None,
+    chunker: SentenceChunker | None = None,
+) -> Iterator[str]:
+    """Stream speakable chunks from Ollama (shared pooled client per URL)."""
+    return _shared_client(base_url.rstrip("/")).stream(
+        prompt,
+        model=model,
+        system_prompt=system_prompt,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        metrics=metrics,
+        chunker=chunker,
+    )
@@ -0,0 +1,477 @@
+"""Route LLM requests across several Ollama servers: health probes, least-loaded dispatch, hedging, failover."""
+
+import contextlib
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from .ollama import OllamaClient, SentenceChunker, StreamClosed, StreamHandle, StreamMetrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+_DONE = object()  # end of an attempt's output
+
+
+class Backend:
+    """
+    One Ollama server and the model to run on it, with its load and circuit breaker.
+    After `failure_threshold` consecutive failures (requests or health probes; only a
+    successful request resets the count) the circuit opens and the backend gets no
+    traffic for `open_s`, or until a health probe passes; then one trial request
+    (half-open) decides whether it closes again.
+    Mutated under the router's lock.
+    """
+
+    def __init__(self, client: OllamaClient, *, failure_threshold: int = 3, open_s: float = 15.0):
+        self.client = client
+        self.name = f"{client.base_url} ({client.model})"
+        self.failure_threshold = failure_threshold
+        self.open_s = open_s
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.inflight = 0
+        self.rtt_s: float | None = None  # health probe round trip
+        self.ttft_s: float | None = None  # time to first token of real requests
+        self.requests = 0
+        self.wins = 0
+        self.errors = 0
+
+    def available(self, now: float) -> bool:
+        if self.state == OPEN and now - self.opened_at >= self.open_s:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            return self.inflight == 0  # one trial at a time
+        return self.state == CLOSED
+
+    def score(self) -> float:
+        """Expected wait: latency times queue depth (lower is better; unknown latency counts as 0)."""
+        latency = self.ttft_s if self.ttft_s is not None else self.rtt_s or 0.0
+        return (self.inflight + 1) * latency
+
+    def observe(self, ttft_s: float) -> None:
+        self.ttft_s = ttft_s if self.ttft_s is None else 0.7 * self.ttft_s + 0.3 * ttft_s
+
+    def succeeded(self, ttft_s: float | None = None) -> None:
+        if ttft_s is not None:
+            self.observe(ttft_s)
+        if self.state != CLOSED:
+            print(f"[llm] {self.name} is back; closing its circuit", flush=True)
+        self.state = CLOSED
+        self.failures = 0
+
+    def failed(self, error: BaseException) -> None:
+        self.errors += 1
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+            print(
+                f"[llm] {self.name} failed {self.failures}x ({error.__class__.__name__}); "
+                f"circuit open for {self.open_s:g}s",
+                flush=True,
+            )
+            self.state = OPEN
+            self.opened_at = time.perf_counter()
+        elif self.state == OPEN:
+            self.opened_at = time.perf_counter()  # still down: keep it out longer
+
+
+class _Attempt:
+    """One backend's try at a request; hedged requests have several."""
+
+    def __init__(self, backend: Backend):
+        self.backend = backend
+        self.started = time.perf_counter()
+        self.handle = StreamHandle()
+        self.metrics = StreamMetrics()
+        self.final: dict[str, Any] = {}
+
+
+class OllamaRouter:
+    """
+    Drop-in for `OllamaClient` over several backends (each its own pooled client and
+    model). Each request goes to the available backend with the lowest expected wait
+    (in-flight requests x observed time to first token); chat requests stay on the
+    backend that answered the previous one while it is idle, so its KV cache is reused.
+    If no token has arrived after `hedge_after_s`, the same request is also sent to the
+    next-best backend and whichever produces output first is used; the other is closed.
+    Only streaming requests are hedged: a non-streaming call has no first token to wait
+    for and can't be closed once sent, so hedging it would just double the load. Errors
+    before any output fail over to the next backend; errors and failed health probes
+    (every `probe_interval_s`) feed each backend's circuit breaker. A passing probe
+    only updates the round trip and lets an open circuit try one request; a backend
+    that answers probes but fails requests still trips its breaker.
+    """
+
+    def __init__(
+        self,
+        clients: list[OllamaClient],
+        *,
+        hedge_after_s: float = 1.5,
+        probe_interval_s: float = 5.0,
+        probe_timeout_s: float = 1.0,
+        failure_threshold: int = 3,
+        open_s: float = 15.0,
+    ):
+        if not clients:
+            raise ValueError("OllamaRouter needs at least one backend")
+        self.backends = [Backend(c, failure_threshold=failure_threshold, open_s=open_s) for c in clients]
+        self.hedge_after_s = hedge_after_s
+        self.probe_interval_s = probe_interval_s
+        self.probe_timeout_s = probe_timeout_s
+        self.hedges = 0
+        self.failovers = 0
+        self._lock = threading.Lock()
+        self._last_chat: Backend | None = None
+        self._stop = threading.Event()
+        self._prober: threading.Thread | None = None
+        if probe_interval_s > 0:
+            self._prober = threading.Thread(target=self._probe_loop, name="llm-probe", daemon=True)
+            self._prober.start()
+
+    @property
+    def model(self) -> str:
+        return self.backends[0].client.model
+
+    # --- health -------------------------------------------------------------
+
+    def _probe_loop(self) -> None:
+        while not self._stop.is_set():
+            for backend in self.backends:
+                self.probe(backend)
+            self._stop.wait(self.probe_interval_s)
+
+    def probe(self, backend: Backend) -> bool:
+        """Check that `backend` answers; updates its round trip or counts a failure."""
+        t0 = time.perf_counter()
+        try:
+            resp = backend.client.session.get(
+                f"{backend.client.base_url}/api/version", timeout=self.probe_timeout_s
+            )
+            resp.close()
+            resp.raise_for_status()
+        except Exception as e:
+            with self._lock:
+                backend.failed(e)
+            return False
+        rtt = time.perf_counter() - t0
+        with self._lock:
+            if backend.state == OPEN:
+                # Answering again: let one real request decide (failures only reset on success)
+                backend.state = HALF_OPEN
+            backend.rtt_s = rtt if backend.rtt_s is None else 0.7 * backend.rtt_s + 0.3 * rtt
+        return True
+
+    # --- dispatch -----------------------------------------------------------
+
+    def _pick(self, tried: list[Backend], prefer: Backend | None = None) -> Backend | None:
+        """Reserve the best untried backend (counted in flight), or None if all were tried."""
+        with self._lock:
+            now = time.perf_counter()
+            untried = [b for b in self.backends if b not in tried]
+            candidates = [b for b in untried if b.available(now)]
+            if not candidates:
+                if not untried:
+                    return None
+                # Every circuit is open: try the one open longest rather than fail outright
+                backend = min(untried, key=lambda b: b.opened_at)
+            elif prefer in candidates and prefer.inflight == 0:
+                backend = prefer
+            else:
+                backend = min(candidates, key=Backend.score)
+            backend.inflight += 1
+            backend.requests += 1
+            return backend
+
+    def _run(self, attempt: _Attempt, call: Callable[[_Attempt], Iterator[Any]], events: queue.Queue) -> None:
+        backend = attempt.backend
+        try:
+            for item in call(attempt):
+                events.put((attempt, item))
+        except BaseException as e:
+            with self._lock:
+                backend.inflight -= 1
+                if not attempt.handle.closed:  # closed by us: lost the race or cancelled
+                    backend.failed(e)
+            events.put((attempt, e))
+            return
+        with self._lock:
+            backend.inflight -= 1
+            backend.succeeded(attempt.metrics.first_token_s)
+        events.put((attempt, _DONE))
+
+    def _race(
+        self,
+        call: Callable[[_Attempt], Iterator[Any]],
+        *,
+        chat: bool = False,
+        hedge: bool = True,
+        metrics: StreamMetrics | None = None,
+        final: dict[str, Any] | None = None,
+        handle: StreamHandle | None = None,
+    ) -> Iterator[Any]:
+        """
+        Yield the output of `call` on the first backend to produce any, hedging and
+        failing over as needed. Output is never mixed: once a backend has produced
+        something, the others are closed and its errors are raised.
+        """
+        t0 = time.perf_counter()
+        events: queue.Queue = queue.Queue()
+        attempts: list[_Attempt] = []
+        tried: list[Backend] = []
+        running: set[_Attempt] = set()
+        winner: _Attempt | None = None
+        hedged = not hedge or len(self.backends) < 2 or self.hedge_after_s <= 0
+
+        def launch() -> bool:
+            backend = self._pick(tried, prefer=self._last_chat if chat else None)
+            if backend is None:
+                return False
+            tried.append(backend)
+            attempt = _Attempt(backend)
+            attempts.append(attempt)
+            running.add(attempt)
+            if handle is not None:
+                handle.attach(attempt.handle)
+            threading.Thread(
+                target=self._run, args=(attempt, call, events), name="llm-attempt", daemon=True
+            ).start()
+            return True
+
+        launch()
+        try:
+            while True:
+                timeout = None if hedged else max(0.0, t0 + self.hedge_after_s - time.perf_counter())
+                try:
+                    attempt, item = events.get(timeout=timeout)
+                except queue.Empty:
+                    hedged = True
+                    cancelled = handle is not None and handle.closed
+                    if not cancelled and all(a.metrics.first_token_s is None for a in attempts) and launch():
+                        self.hedges += 1
+                        print(
+                            f"[llm] No token from {attempts[0].backend.name} after "
+                            f"{self.hedge_after_s * 1000:.0f}ms; also asking {attempts[-1].backend.name}",
+                            flush=True,
+                        )
+                    continue
+                if item is _DONE or isinstance(item, BaseException):
+                    running.discard(attempt)
+                if winner is None:
+                    if isinstance(item, BaseException):
+                        if running:
+                            continue  # a hedged attempt is still going
+                        if (handle is not None and handle.closed) or isinstance(item, StreamClosed):
+                            raise item
+                        if not launch():
+                            raise item
+                        self.failovers += 1
+                        print(
+                            f"[llm] {attempt.backend.name} failed ({item.__class__.__name__}); "
+                            f"failing over to {attempts[-1].backend.name}",
+                            flush=True,
+                        )
+                        continue
+                    winner = attempt
+                    with self._lock:
+                        attempt.backend.wins += 1
+                        if chat:
+                            self._last_chat = attempt.backend
+                        for other in attempts:
+                            if other is not winner and other.metrics.first_token_s is None:
+                                # Lost without a token: it is at least this slow
+                                other.backend.observe(time.perf_counter() - other.started)
+                    for other in attempts:
+                        if other is not winner:
+                            other.handle.close()
+                if attempt is not winner:
+                    continue
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            for attempt in attempts:
+                attempt.handle.close()  # no-op for finished ones; stops the rest
+        if metrics is not None and winner is not None:
+            # Report timings from when this request started, not when the winning attempt did
+            offset = winner.started - t0
+            m = winner.metrics
+            metrics.first_token_s = None if m.first_token_s is None else m.first_token_s + offset
+            metrics.first_chunk_s = None if m.first_chunk_s is None else m.first_chunk_s + offset
+            metrics.total_s = None if m.total_s is None else m.total_s + offset
+            metrics.tokens = m.tokens
+            metrics.chunks = m.chunks
+        if final is not None and winner is not None:
+            final.update(winner.final)
+
+    def _first(self, results: Iterator[Any]) -> Any:
+        with contextlib.closing(results):
+            return next(results)
+
+    # --- OllamaClient API -------------------------------------------------------
+
+    def preload(self) -> float:
+        """Load each backend's model, in parallel. Returns seconds until all were done."""
+        t0 = time.perf_counter()
+        errors: list[BaseException] = []
+
+        def load(backend: Backend) -> None:
+            try:
+                backend.client.preload()
+            except Exception as e:
+                print(f"[llm] Preload on {backend.name} failed: {e}", flush=True)
+                errors.append(e)
+                with self._lock:
+                    backend.failed(e)
+
+        threads = [threading.Thread(target=load, args=(b,), name="llm-preload", daemon=True) for b in self.backends]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if len(errors) == len(self.backends):
+            raise errors[0]
+        return time.perf_counter() - t0
+
+    def generate(
+        self,
+        prompt: str,
+        *,
+        model: str | None = None,
+        system_prompt: str = "You are a concise voice assistant. Keep responses brief.",
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+    ) -> str:
+        def call(attempt: _Attempt) -> Iterator[str]:
+            yield attempt.backend.client.generate(
+                prompt, model=model, system_prompt=system_prompt, temperature=temperature, max_tokens=max_tokens
+            )
+
+        return self._first(self._race(call, hedge=False))
+
+    def stream(
+        self,
+        prompt: str,
+        *,
+        model: str | None = None,
+        system_prompt: str = "You are a concise voice assistant. Keep responses brief.",
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+        metrics: StreamMetrics | None = None,
+        chunker: SentenceChunker | None = None,
+        handle: StreamHandle | None = None,
+    ) -> Iterator[str]:
+        def call(attempt: _Attempt) -> Iterator[str]:
+            return attempt.backend.client.stream(
+                prompt,
+                model=model,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                metrics=attempt.metrics,
+                chunker=_fresh(chunker),
+                handle=attempt.handle,
+            )
+
+        yield from self._race(call, metrics=metrics, handle=handle)
+
+    def chat(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+    ) -> tuple[str, dict[str, Any]]:
+        def call(attempt: _Attempt) -> Iterator[tuple[str, dict[str, Any]]]:
+            yield attempt.backend.client.chat(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+
+        return self._first(self._race(call, chat=True, hedge=False))
+
+    def chat_stream(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+        metrics: StreamMetrics | None = None,
+        chunker: SentenceChunker | None = None,
+        final: dict[str, Any] | None = None,
+        handle: StreamHandle | None = None,
+    ) -> Iterator[str]:
+        def call(attempt: _Attempt) -> Iterator[str]:
+            return attempt.backend.client.chat_stream(
+                messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                metrics=attempt.metrics,
+                chunker=_fresh(chunker),
+                final=attempt.final,
+                handle=attempt.handle,
+            )
+
+        yield from self._race(call, chat=True, metrics=metrics, final=final, handle=handle)
+
+    def summary(self) -> str:
+        def ms(v: float | None) -> str:
+            return "-" if v is None else f"{v * 1000:.0f}ms"
+
+        with self._lock:
+            parts = [
+                f"{b.name} {b.state}: {b.wins}/{b.requests} won, {b.errors} errors, "
+                f"ttft {ms(b.ttft_s)}, probe {ms(b.rtt_s)}"
+                for b in self.backends
+            ]
+        return " | ".join(parts) + f" | {self.hedges} hedged, {self.failovers} failovers"
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._prober is not None:
+            self._prober.join(timeout=self.probe_timeout_s + 1)
+        for backend in self.backends:
+            backend.client.close()
+
+
+def _fresh(chunker: SentenceChunker | None) -> SentenceChunker | None:
+    """Each attempt splits its own stream; copy the caller's chunker settings, not its state."""
+    if chunker is None:
+        return None
+    return SentenceChunker(clause_chars=chunker.clause_chars, max_chars=chunker.max_chars)
+
+
+def client_from_config(cfg: dict, *, pool_size: int = 4) -> OllamaClient | OllamaRouter:
+    """
+    An `OllamaClient` for the `ollama` config section, or an `OllamaRouter` when it
+    lists `backends` (each a `url` with an optional `model`, defaulting to `model`).
+    """
+
+    def client(url: str, model: str) -> OllamaClient:
+        return OllamaClient(
+            url,
+            model=model,
+            keep_alive=cfg.get("keep_alive", "30m"),
+            connect_timeout_s=cfg.get("connect_timeout_s", 3.0),
+            read_timeout_s=cfg.get("read_timeout_s", 60.0),
+            retries=cfg.get("retries", 2),
+            pool_size=pool_size,
+        )
+
+    model = cfg.get("model", "llama3.2")
+    backends = cfg.get("backends") or []
+    if not backends:
+        return client(cfg.get("base_url", "http://localhost:11434"), model)
+    router_cfg = cfg.get("router", {})
+    return OllamaRouter(
+        [client(b["url"], b.get("model", model)) for b in backends],
+        hedge_after_s=router_cfg.get("hedge_after_ms", 1500) / 1000,
+        probe_interval_s=router_cfg.get("probe_interval_s", 5.0),
+        probe_timeout_s=router_cfg.get("probe_timeout_s", 1.0),
+        failure_threshold=router_cfg.get("failure_threshold", 3),
+        open_s=router_cfg.get("open_s", 15.0),
+    )
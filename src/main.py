@@ -22,17 +22,22 @@ Run:
 """
 
 import sys
+import time
 from pathlib import Path
 
 # Ensure repo root is on path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from src.orchestrator import Orchestrator
+_t0 = time.perf_counter()
+from src.orchestrator import Orchestrator  # noqa: E402
+
+_import_s = time.perf_counter() - _t0
 
 
 def main() -> None:
     config_path = Path(__file__).resolve().parent.parent / "config.yaml"
-    orch = Orchestrator(config_path)
+    orch = Orchestrator(config_path, boot_started=_t0)
+    orch.startup.record("imports", _import_s)
     orch.run()
 
 
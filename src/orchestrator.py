@@ -1,117 +1,709 @@
 """Orchestrates wake word -> record -> STT -> LLM -> TTS -> playback."""
 
-import tempfile
+import threading
+import time
 from pathlib import Path
+from typing import Callable, Iterator
 
-from src.audio import play_wav, record_until_silence
-from src.audio.capture import save_wav
+import numpy as np
+
+from src.audio import (
+    AudioOutput,
+    CaptureBus,
+    EchoGate,
+    Endpointer,
+    EnergyVad,
+    SileroVad,
+    earcons,
+    record_until_silence,
+)
 from src.config import load_config
-from src.llm import generate_response
-from src.stt import transcribe_audio
-from src.tts import synthesize_speech
+from src.intents import FastAnswer, FastPath, ResponseCache
+from src.llm import Conversation, OllamaRouter, StreamHandle, StreamMetrics, client_from_config
+from src.pipeline import Cancelled, Pipeline, TurnTrace
+from src.speculation import Speculation, SpeculationStats, Speculator
+from src.startup import Startup
+from src.stt import StreamingTranscriber, configure_registry, registry, transcribe_audio
+from src.stt import warm_up as warm_up_stt
+from src.tracing import NULL_TURN, Tracer, TurnSpans
+from src.tts import SpeechCache, configure_voice_cache, synthesize_stream
+from src.tts import warm_up as warm_up_tts
 from src.wakeword import WakeWordDetector
+from src.workers import WorkerPool
+
+NOT_UNDERSTOOD = "Could not understand. Please try again."
+NO_RESPONSE = "No response from Ollama."
+CANNED_PHRASES = [NOT_UNDERSTOOD, NO_RESPONSE]
+# Longest the wake phrase takes to say; audio before it is background
+_WAKE_PHRASE_S = 1.5
+
+
+def _gate_open(gate: threading.Event | None, pipeline: Pipeline) -> bool:
+    """Wait until `gate` (if any) opens; False if the pipeline is cancelled first."""
+    if gate is None:
+        return True
+    while not gate.wait(0.05):
+        if pipeline.cancelled:
+            return False
+    return True
 
 
 class Orchestrator:
     """State machine: idle -> listening -> transcribing -> thinking -> speaking -> idle."""
 
-    def __init__(self, config_path: Path | None = None):
-        self.config = load_config(config_path)
+    def __init__(
+        self,
+        config_path: Path | None = None,
+        *,
+        config: dict | None = None,
+        boot_started: float | None = None,
+    ):
+        t0 = time.perf_counter()
+        self.startup = Startup(started=boot_started)
+        self.config = config if config is not None else load_config(config_path)
         self._audio_cfg = self.config.get("audio", {})
         self._wake_cfg = self.config.get("wake_word", {})
         self._stt_cfg = self.config.get("stt", {})
         self._ollama_cfg = self.config.get("ollama", {})
         self._tts_cfg = self.config.get("tts", {})
         self._ux_cfg = self.config.get("ux", {})
+        self._pipeline_cfg = self.config.get("pipeline", {})
+        self._vad_cfg = self.config.get("vad", {})
+        self._fast_cfg = self.config.get("fast_path", {})
+        self._spec_cfg = self.config.get("speculation", {})
+        self._workers_cfg = self.config.get("workers", {})
+        self._trace_cfg = self.config.get("tracing", {})
+        self._barge_cfg = self.config.get("barge_in", {})
 
         self._detector: WakeWordDetector | None = None
+        sample_rate = self._audio_cfg.get("sample_rate", 16000)
+        pre_roll_ms = self._audio_cfg.get("pre_roll_ms", 0)
+        self._pre_roll_samples = int(sample_rate * pre_roll_ms / 1000)
+        # Ring must hold the pre-roll plus the longest recording
+        capacity_s = max(
+            self._audio_cfg.get("capture_buffer_s", 30),
+            (pre_roll_ms + self._audio_cfg.get("max_record_ms", 15000)) / 1000 + 1,
+        )
+        self._bus = CaptureBus(
+            sample_rate=sample_rate,
+            channels=self._audio_cfg.get("channels", 1),
+            block_size=512,
+            capacity_s=capacity_s,
+            device=self._audio_cfg.get("input_device"),
+            dtype=self._audio_cfg.get("capture_dtype", "float32"),
+        )
+        self._endpointer = self._make_endpointer(sample_rate)
+        self._llm = client_from_config(self._ollama_cfg)
+        # STT/TTS in worker processes, away from the audio callbacks' GIL
+        self._workers: WorkerPool | None = None
+        if self._workers_cfg.get("enabled", False):
+            self._workers = WorkerPool(
+                processes=self._workers_cfg.get("processes", 2),
+                stt_kwargs=self._stt_kwargs(),
+                voice_kwargs=self._voice_kwargs(),
+            )
+        cache_cfg = self._tts_cfg.get("cache", {})
+        self._speech_cache: SpeechCache | None = None
+        if cache_cfg.get("enabled", True):
+            self._speech_cache = SpeechCache(
+                Path(cache_cfg.get("dir") or Path.home() / ".cache" / "dann-of-thursday" / "tts").expanduser(),
+                max_mb=cache_cfg.get("max_mb", 256),
+                synthesizer=self._workers.synthesize if self._workers is not None else synthesize_stream,
+            )
+        self._earcons: dict[tuple[str, int], np.ndarray] = {}
+        conv_cfg = self._ollama_cfg.get("conversation", {})
+        self._conversation: Conversation | None = None
+        if conv_cfg.get("enabled", True):
+            self._conversation = Conversation(
+                self._llm,
+                system_prompt=self._ollama_cfg.get("system_prompt", ""),
+                token_budget=conv_cfg.get("token_budget", 1536),
+                idle_reset_s=conv_cfg.get("idle_reset_s", 300),
+            )
+        self._fast_path: FastPath | None = None
+        if self._fast_cfg.get("enabled", True):
+            self._fast_path = FastPath(
+                cache=ResponseCache(
+                    ttl_s=self._fast_cfg.get("cache_ttl_s", 3600),
+                    max_entries=self._fast_cfg.get("max_entries", 256),
+                    similarity=self._fast_cfg.get("similarity", 1.0),
+                )
+            )
+        self._output = AudioOutput(
+            device=self._audio_cfg.get("output_device"),
+            capacity_s=self._audio_cfg.get("playback_buffer_s", 2.0),
+        )
+        # Barge-in: wake word (and optionally VAD) stay live while speaking, minus our own echo
+        self._barge_in = self._barge_cfg.get("enabled", False)
+        self._echo_gate: EchoGate | None = None
+        if self._barge_in:
+            self._echo_gate = EchoGate(
+                self._output, margin_db=self._barge_cfg.get("echo_margin_db", 10.0), sample_rate=sample_rate
+            )
+        self._interruptible = False
         self._running = False
+        self._turn_id = 0
+        self._turn_lock = threading.Lock()
+        self._turn_thread: threading.Thread | None = None
+        self._pipeline: Pipeline | None = None
+        self._spec_stats = SpeculationStats()
+        self._tracer = Tracer(
+            enabled=self._trace_cfg.get("enabled", False),
+            jsonl=self._trace_cfg.get("jsonl"),
+            prometheus_file=self._trace_cfg.get("prometheus_file"),
+            prometheus_port=self._trace_cfg.get("prometheus_port"),
+            profile_every=self._trace_cfg.get("profile_every", 0),
+            profile_dir=self._trace_cfg.get("profile_dir", "logs/profiles"),
+        )
+        self._spans: TurnSpans = NULL_TURN
+
+        configure_registry(
+            max_models=self._stt_cfg.get("max_resident_models", 2),
+            idle_ttl_s=self._stt_cfg.get("idle_ttl_s", 0),
+        )
+        configure_voice_cache(
+            max_voices=self._tts_cfg.get("max_cached_voices", 2),
+            max_memory_mb=self._tts_cfg.get("voice_cache_mb", 0),
+            intra_op_threads=self._tts_cfg.get("intra_op_threads", 0),
+            inter_op_threads=self._tts_cfg.get("inter_op_threads", 0),
+        )
+        self.startup.record("init", time.perf_counter() - t0)
+
+    def _make_endpointer(self, sample_rate: int) -> Endpointer | None:
+        """VAD endpointer from the `vad` config section; None keeps the fixed RMS threshold."""
+        engine = self._vad_cfg.get("engine", "energy")
+        if engine == "rms":
+            return None
+        if engine == "silero":
+            vad = SileroVad(
+                self._vad_cfg.get("model_path", "models/silero_vad.onnx"),
+                sample_rate=sample_rate,
+                threshold=self._vad_cfg.get("threshold", 0.5),
+            )
+        elif engine == "energy":
+            vad = EnergyVad(
+                sample_rate=sample_rate,
+                frame_ms=self._vad_cfg.get("frame_ms", 20),
+                margin_db=self._vad_cfg.get("margin_db", 9.0),
+                min_level_db=self._vad_cfg.get("min_level_db", -55.0),
+            )
+        else:
+            raise ValueError(f"Unknown vad.engine: {engine} (use energy, silero, or rms)")
+        return Endpointer(
+            vad,
+            hangover_ms=self._vad_cfg.get("hangover_ms", 300),
+            onset_ms=self._vad_cfg.get("onset_ms", 60),
+            false_cut_window_ms=self._vad_cfg.get("false_cut_window_ms", 700),
+        )
+
+    def _warm_up(self) -> Startup:
+        """
+        Start loading models so the first turn is not cold: Whisper, Piper (+ canned
+        phrases), and the Ollama model load at the same time on background threads.
+        Returns `self.startup`; turns wait for the stages they need.
+        """
+        startup = self.startup
+        if self._workers is not None:
+            # Workers load their own models; nothing to load in this process
+            startup.add("workers", self._workers.start)
+        elif self._stt_cfg.get("preload", True):
+            startup.add("stt", lambda: warm_up_stt(**self._stt_kwargs()))
+        if self._tts_cfg.get("preload", True):
+            startup.add("tts", self._warm_up_tts)
+        if self._ollama_cfg.get("preload", True):
+            startup.add("llm", self._llm.preload)
+        startup.start()
+        return startup
+
+    def _warm_up_tts(self) -> None:
+        if self._workers is None:
+            use_cuda = self._tts_cfg.get("use_cuda", False)
+            voices = [self._tts_cfg.get("voice_model", "models/piper/en_US-lessac-medium")]
+            voices += self._tts_cfg.get("preload_voices") or []
+            for voice_model in voices:
+                warm_up_tts(voice_model, use_cuda=use_cuda)
+        else:
+            self.startup.wait("workers")  # the cache synthesizes through them
+        if self._speech_cache is not None:
+            phrases = CANNED_PHRASES + list(self._tts_cfg.get("cache", {}).get("precompute") or [])
+            n = self._speech_cache.precompute(phrases, **self._voice_kwargs())
+            print(f"[tts] {len(phrases)} canned phrases ready ({n} synthesized)", flush=True)
 
-    def _on_wake(self) -> None:
-        """Called when wake word detected. Run full pipeline in main thread."""
-        print("[dann] Wake word detected. Listening...", flush=True)
-        self._run_pipeline()
+    def _wait_until_warm(self) -> None:
+        """
+        A wake word can come before warm-up is done; the capture ring keeps the audio
+        meanwhile. A stage that failed at boot has been reported once; its models load
+        on first use instead (and without worker processes, STT/TTS run in-process).
+        """
+        stages = [name for name in ("workers", "stt", "tts") if not self.startup.ready(name)]
+        pending = [name for name in stages if not self.startup.failed(name)]
+        if pending:
+            print(f"[dann] Waiting for {', '.join(pending)} to load...", flush=True)
+        for name in stages:
+            self.startup.wait(name, check=False)
+        if self._workers is not None and self.startup.failed("workers"):
+            print("[workers] Worker processes failed to start; running STT/TTS in-process", flush=True)
+            workers, self._workers = self._workers, None
+            if self._speech_cache is not None:
+                self._speech_cache.synthesizer = synthesize_stream
+            workers.close()
 
-    def _run_pipeline(self) -> None:
-        """Record -> STT -> Ollama -> TTS -> playback."""
+    def _on_wake(self, wake_end: int, trigger: str = "Wake word") -> None:
+        """
+        Called from the wake word thread. Hand the turn to a worker and return at once.
+        While an answer is being spoken with barge-in enabled, interrupt it instead of
+        ignoring the wake word; the new turn starts once the old one has wound down.
+        """
+        t0 = time.perf_counter()
+        with self._turn_lock:
+            previous = self._turn_thread
+            if previous is not None and previous.is_alive():
+                if not self._interruptible:
+                    return
+                self._interrupt(trigger)
+            else:
+                previous = None
+            print(f"[dann] {trigger} detected. Listening...", flush=True)
+            if self._ux_cfg.get("play_listening_sound", True):
+                self._play_earcon("listening")
+            self._turn_thread = threading.Thread(
+                target=self._start_turn, args=(wake_end, previous), name="turn", daemon=True
+            )
+            self._turn_thread.start()
+        # Time the wake word thread is blocked here is audio Porcupine doesn't see
+        self._tracer.observe("wake_callback", time.perf_counter() - t0)
+
+    def _interrupt(self, trigger: str) -> None:
+        """Barge-in: cancel LLM, synthesis, and playback of the answer being spoken."""
+        t0 = time.perf_counter()
+        self._interruptible = False
+        pipeline = self._pipeline
+        if pipeline is not None:
+            pipeline.cancel()  # also closes the LLM stream
+        self._output.flush()  # silent within one output block
+        self._spans.mark("barge_in")
+        self._tracer.observe("barge_in", time.perf_counter() - t0)
+        print(f"[dann] Barge-in ({trigger.lower()}): answer cancelled", flush=True)
+
+    def _start_turn(self, wake_end: int, previous: threading.Thread | None) -> None:
+        if previous is not None:
+            t0 = time.perf_counter()
+            previous.join()
+            print(f"[dann] Interrupted turn wound down in {(time.perf_counter() - t0) * 1000:.0f}ms", flush=True)
+        self._run_pipeline(wake_end)
+
+    def _listen_while_speaking(self, stop: threading.Event) -> None:
+        """
+        From the end of STT until the turn is over: let the wake word detector run
+        (echo-gated), and with `barge_in.vad` also interrupt on sustained speech that is
+        louder than the echo.
+        """
+        self._interruptible = True
+        if self._detector:
+            self._detector.resume()
+        if self._barge_cfg.get("vad", False):
+            threading.Thread(target=self._watch_speech, args=(stop,), name="barge-in-vad", daemon=True).start()
+
+    def _watch_speech(self, stop: threading.Event) -> None:
+        gate = EchoGate(
+            self._output, margin_db=self._barge_cfg.get("echo_margin_db", 10.0), sample_rate=self._bus.sample_rate
+        )
+        vad = EnergyVad(
+            sample_rate=self._bus.sample_rate,
+            frame_ms=self._vad_cfg.get("frame_ms", 20),
+            margin_db=self._vad_cfg.get("margin_db", 9.0),
+            min_level_db=self._vad_cfg.get("min_level_db", -55.0),
+        )
+        onset_frames = max(1, self._barge_cfg.get("vad_onset_ms", 200) * vad.sample_rate // 1000 // vad.frame_samples)
+        cursor = self._bus.cursor()
+        frame = np.empty(vad.frame_samples, dtype=np.float32)
+        run = 0
+        while not stop.is_set():
+            if not cursor.read(frame, timeout=0.1):
+                continue
+            if gate.is_echo(frame):
+                run = 0
+                continue
+            run = run + 1 if vad.is_speech(frame) else 0
+            if run >= onset_frames and not stop.is_set():
+                # The new turn records from the start of that speech
+                self._on_wake(cursor.position - run * vad.frame_samples, trigger="Speech")
+                return
+
+    def _run_pipeline(self, wake_end: int | None = None, trace: TurnTrace | None = None) -> None:
+        """
+        Record -> STT, then LLM / TTS / playback as overlapping pipeline stages.
+        Recording starts at `wake_end` (bus position), so speech right after the wake
+        word is kept even though the turn thread starts a little later. Stage timings go
+        to `trace` (a new one per turn if not given).
+        """
         # Pause wake word during processing to avoid echo
         if self._detector:
             self._detector.pause()
 
+        self._turn_id += 1
+        trace = trace or TurnTrace(turn_id=self._turn_id)
+        spans = self._spans = self._tracer.turn(self._turn_id)
+        spans.profile()
+        outcome = "error"
+        streamer: StreamingTranscriber | None = None
+        speculator: Speculator | None = None
+        turn_over = threading.Event()
         try:
-            # 1. Record
-            pcm = record_until_silence(
-                sample_rate=self._audio_cfg.get("sample_rate", 16000),
-                channels=self._audio_cfg.get("channels", 1),
-                silence_timeout_ms=self._audio_cfg.get("silence_timeout_ms", 1500),
-                max_record_ms=self._audio_cfg.get("max_record_ms", 15000),
-                silence_threshold=self._audio_cfg.get("silence_threshold", 0.01),
-                device=self._audio_cfg.get("input_device"),
-            )
+            self._wait_until_warm()
 
-            if not pcm:
-                print("[dann] No audio captured.", flush=True)
-                return
+            # 1. Record, from the wake word end frame (minus optional pre-roll)
+            start = background_end = None
+            if wake_end is not None:
+                start = wake_end - self._pre_roll_samples
+                # The noise floor must not be measured on the wake phrase itself
+                background_end = wake_end - int(self._bus.sample_rate * _WAKE_PHRASE_S)
+                if start < self._bus.oldest:
+                    print("[audio] Wake word audio already overwritten; recording from oldest", flush=True)
+            # Don't let the listening earcon (heard by the mic) count as speech
+            holdoff_ms = 250 if self._ux_cfg.get("play_listening_sound", True) else 0
+            streamer = self._make_streamer()
+            speculator = self._make_speculator(streamer)
 
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-                wav_path = Path(f.name)
-            save_wav(pcm, wav_path, self._audio_cfg.get("sample_rate", 16000))
-
-            try:
-                # 2. STT
-                print("[dann] Transcribing...", flush=True)
-                text = transcribe_audio(
-                    wav_path,
-                    model_size=self._stt_cfg.get("model_size", "base"),
-                    language=self._stt_cfg.get("language", "en"),
-                    device=self._stt_cfg.get("device", "cpu"),
-                    compute_type=self._stt_cfg.get("compute_type", "int8"),
+            def on_audio(audio: np.ndarray) -> None:
+                if streamer is not None:
+                    streamer.update(audio)
+                if speculator is not None:
+                    speculator.update(audio)
+
+            with trace.timed("record"), spans.span("capture"):
+                pcm = record_until_silence(
+                    silence_timeout_ms=self._audio_cfg.get("silence_timeout_ms", 1500),
+                    max_record_ms=self._audio_cfg.get("max_record_ms", 15000),
+                    silence_threshold=self._audio_cfg.get("silence_threshold", 0.01),
+                    bus=self._bus,
+                    start=start,
+                    endpointer=self._endpointer,
+                    holdoff_ms=holdoff_ms,
+                    background_end=background_end,
+                    on_audio=on_audio if streamer is not None or speculator is not None else None,
                 )
 
-                if not text:
-                    print("[dann] Could not understand. Please try again.", flush=True)
-                    return
+            spans.mark("endpoint")
+            self._audit_endpoint()
+            if pcm.size == 0:
+                print("[dann] No audio captured.", flush=True)
+                outcome = "no_audio"
+                return
 
-                print(f"[dann] You said: {text}", flush=True)
-
-                # 3. LLM
-                print("[dann] Thinking...", flush=True)
-                response = generate_response(
-                    text,
-                    base_url=self._ollama_cfg.get("base_url", "http://localhost:11434"),
-                    model=self._ollama_cfg.get("model", "llama3.2"),
-                    system_prompt=self._ollama_cfg.get("system_prompt", ""),
-                    temperature=self._ollama_cfg.get("temperature", 0.7),
-                    max_tokens=self._ollama_cfg.get("max_tokens", 150),
-                )
+            # 2. STT (in-memory float32, no WAV round-trip)
+            print("[dann] Transcribing...", flush=True)
+            with trace.timed("stt"), spans.span("stt"):
+                if streamer is not None:
+                    # Most of the utterance is already committed; decode only the tail
+                    text = streamer.finish(pcm)
+                    print(f"[stt] {streamer.stats.summary()}", flush=True)
+                elif self._workers is not None:
+                    text = self._workers.transcribe(pcm)
+                else:
+                    text = transcribe_audio(pcm, **self._stt_kwargs())
 
-                if not response:
-                    print("[dann] No response from Ollama.", flush=True)
-                    return
+            if self._barge_in:
+                # Everything from here on is spoken, so it can be interrupted
+                self._listen_while_speaking(turn_over)
 
-                print(f"[dann] {response}", flush=True)
+            if not text:
+                print(f"[dann] {NOT_UNDERSTOOD}", flush=True)
+                outcome = "not_understood"
+                self._say(NOT_UNDERSTOOD)
+                return
 
-                # 4. TTS
-                print("[dann] Speaking...", flush=True)
-                tts_path = synthesize_speech(
-                    response,
-                    piper_path=self._tts_cfg.get("piper_path", "piper"),
-                    voice_model=self._tts_cfg.get("voice_model", "models/piper/en_US-lessac-medium"),
-                    speed=self._tts_cfg.get("speed", 1.0),
-                )
+            print(f"[dann] You said: {text}", flush=True)
+            if speculator is not None and speculator.resolve(text):
+                # Answer was already generated from the partial transcript, and is now played
+                outcome = "speculated"
+                return
 
-                # 5. Playback
-                play_wav(tts_path, device=self._audio_cfg.get("output_device"))
+            # 3. Local intents / answer cache, before bothering the LLM
+            answer = self._fast_route(text, trace)
+            if answer is not None:
+                outcome = f"fast:{answer.source}"
+                if answer.text:
+                    self._respond(text, trace, answer=answer)
+                return
 
-            finally:
-                wav_path.unlink(missing_ok=True)
+            if self._ux_cfg.get("play_thinking_sound", False):
+                self._play_earcon("thinking")
 
+            # 4. LLM -> 5. TTS -> 6. Playback, overlapping
+            print("[dann] Thinking...", flush=True)
+            self._respond(text, trace)
+            outcome = "llm"
         except Exception as e:
             print(f"[dann] Error: {e}", flush=True)
         finally:
+            self._interruptible = False
+            turn_over.set()
+            if speculator is not None:
+                speculator.cancel()
+                print(f"[spec] {self._spec_stats.summary()}", flush=True)
+            if streamer is not None:
+                streamer.close()
+            print(f"[trace] {trace.summary()}", flush=True)
+            if "barge_in" in spans.marks:
+                outcome = "interrupted"
+            spans.end(
+                outcome=outcome,
+                stages={n: {"compute_s": st.compute_s, "wait_s": st.wait_s} for n, st in trace.stages.items()},
+            )
+            self._spans = NULL_TURN
+            if self._echo_gate is not None and self._echo_gate.frames:
+                print(f"[barge-in] {self._echo_gate.summary()}", flush=True)
             if self._detector:
                 self._detector.resume()
 
+    def _audit_endpoint(self) -> None:
+        """
+        In the background, check whether speech continued right after the cut, on the
+        audio captured just after it. Skipped if anything was played meanwhile.
+        """
+        ep = self._endpointer
+        if ep is None or ep.cut_position is None or ep.cut_position < self._bus.oldest:
+            return
+        cursor, vad, cut_time = self._bus.cursor(ep.cut_position), ep.vad.fork(), ep.cut_time
+
+        def audit() -> None:
+            if ep.audit(cursor, vad, interrupted=lambda: self._output.last_write >= cut_time) is not None:
+                print(f"[vad] {ep.stats.summary()}", flush=True)
+
+        threading.Thread(target=audit, name="vad-audit", daemon=True).start()
+
+    def _stt_kwargs(self) -> dict:
+        return {
+            "model_size": self._stt_cfg.get("model_size", "base"),
+            "language": self._stt_cfg.get("language", "en"),
+            "device": self._stt_cfg.get("device", "cpu"),
+            "compute_type": self._stt_cfg.get("compute_type", "int8"),
+        }
+
+    def _make_streamer(self) -> StreamingTranscriber | None:
+        """Incremental transcriber for this turn when `stt.streaming` is enabled."""
+        cfg = self._stt_cfg.get("streaming", {})
+        if not cfg.get("enabled", False):
+            return None
+
+        def on_partial(committed: str, partial: str) -> None:
+            if partial:
+                print(f"[stt] ... {partial}", flush=True)
+
+        return StreamingTranscriber(
+            **self._stt_kwargs(),
+            sample_rate=self._audio_cfg.get("sample_rate", 16000),
+            step_ms=cfg.get("step_ms", 500),
+            max_window_s=cfg.get("max_window_s", 8.0),
+            on_partial=on_partial,
+            decode=self._workers.transcribe_words if self._workers is not None else None,
+        )
+
+    def _make_speculator(self, streamer: StreamingTranscriber | None) -> Speculator | None:
+        """Speculative responses for this turn when `speculation` is enabled (needs a VAD endpointer)."""
+        if not self._spec_cfg.get("enabled", False) or self._endpointer is None:
+            return None
+
+        def transcribe(audio: np.ndarray) -> str:
+            if streamer is not None:
+                return streamer.peek(audio)
+            if self._workers is not None:
+                return self._workers.transcribe(audio)
+            return transcribe_audio(audio, **self._stt_kwargs())
+
+        def respond(spec: Speculation) -> None:
+            # Local answers are instant anyway; don't spend an LLM call on them
+            if self._fast_path is not None and self._fast_path.peek(spec.text, use_cache=not self._has_context()):
+                return
+            print(f"[spec] Speculating on: {spec.text}", flush=True)
+            # Generate against a copy of the history; only a confirmed answer joins the real one
+            spec.state = self._conversation.fork() if self._conversation is not None else None
+            self._respond(spec.text, spec.trace, gate=spec.gate, on_pipeline=spec.attach, conversation=spec.state)
+
+        def commit(spec: Speculation) -> None:
+            if self._conversation is not None and spec.state is not None:
+                self._conversation.adopt(spec.state)
+
+        return Speculator(
+            self._endpointer,
+            transcribe,
+            respond,
+            self._spec_stats,
+            commit=commit,
+            after_ms=self._spec_cfg.get("after_ms", 150),
+        )
+
+    def _has_context(self) -> bool:
+        """Whether the LLM would see earlier exchanges (answers then depend on more than the question)."""
+        return self._conversation is not None and self._conversation.has_history
+
+    def _fast_route(self, text: str, trace: TurnTrace) -> FastAnswer | None:
+        """Answer from a local intent or the response cache; None means ask the LLM."""
+        if self._fast_path is None:
+            return None
+        with trace.timed("fast"), self._spans.span("fast"):
+            answer = self._fast_path.route(text, use_cache=not self._has_context())
+        if answer is not None:
+            print(f"[fast] Answered by {answer.source}", flush=True)
+            if self._conversation is not None:
+                self._conversation.record(text, answer.text)
+        print(f"[fast] {self._fast_path.stats.summary()}", flush=True)
+        return answer
+
+    def _llm_kwargs(self) -> dict:
+        return {
+            "system_prompt": self._ollama_cfg.get("system_prompt", ""),
+            "temperature": self._ollama_cfg.get("temperature", 0.7),
+            "max_tokens": self._ollama_cfg.get("max_tokens", 150),
+        }
+
+    def _llm_source(
+        self,
+        text: str,
+        metrics: StreamMetrics,
+        handle: StreamHandle,
+        conversation: Conversation | None = None,
+    ) -> Iterator[str]:
+        """Response text: sentence chunks when streaming, else the whole answer at once."""
+        stream = self._ollama_cfg.get("stream", True)
+        conversation = conversation or self._conversation
+        if conversation is not None:
+            options = {
+                "temperature": self._ollama_cfg.get("temperature", 0.7),
+                "max_tokens": self._ollama_cfg.get("max_tokens", 150),
+            }
+            if stream:
+                yield from conversation.stream(text, metrics=metrics, handle=handle, **options)
+                return
+            response = conversation.generate(text, **options)
+        elif stream:
+            yield from self._llm.stream(text, metrics=metrics, handle=handle, **self._llm_kwargs())
+            return
+        else:
+            response = self._llm.generate(text, **self._llm_kwargs())
+        if response:
+            yield response
+
+    def _respond(
+        self,
+        text: str,
+        trace: TurnTrace,
+        answer: FastAnswer | None = None,
+        gate: threading.Event | None = None,
+        on_pipeline: Callable[[Pipeline], None] | None = None,
+        conversation: Conversation | None = None,
+    ) -> None:
+        """
+        Run LLM generation (or speak a fast-path `answer`), per-sentence synthesis, and
+        playback concurrently. With a `gate` (speculative response), nothing is played
+        until the gate opens; `on_pipeline` receives the pipeline so it can be cancelled.
+        `conversation` overrides the session history the LLM sees and extends.
+        """
+        metrics = StreamMetrics()
+        handle = StreamHandle()
+        spans = self._spans
+        spoken = False
+        chunks: list[str] = []
+        cacheable = not self._has_context()
+        first_audio: float | None = None
+
+        def synthesize(chunk: str) -> Iterator[tuple[np.ndarray, int]]:
+            nonlocal spoken, first_audio
+            if not spoken:
+                print("[dann] Speaking...", flush=True)
+                spoken = True
+            print(f"[dann] {chunk}", flush=True)
+            chunks.append(chunk)
+            for audio in self._synthesize(chunk):
+                if first_audio is None:
+                    first_audio = time.perf_counter()
+                yield audio
+
+        def play(audio: tuple[np.ndarray, int]) -> None:
+            if not _gate_open(gate, pipeline):
+                raise Cancelled
+            spans.mark("playback_start")
+            self._output.write(*audio)
+
+        if answer is not None:
+            source, source_name = iter([answer.text]), "fast"
+        else:
+            source, source_name = self._llm_source(text, metrics, handle, conversation), "llm"
+        pipeline = Pipeline(
+            source,
+            [("tts", synthesize), ("playback", play)],
+            source_name=source_name,
+            queue_size=self._pipeline_cfg.get("queue_size", 4),
+            trace=trace,
+        )
+        # Cancelling closes the HTTP stream, even while it is blocked waiting for a token
+        pipeline.add_cancel_hook(handle.close)
+        if on_pipeline is not None:
+            on_pipeline(pipeline)
+        self._pipeline = pipeline
+        started = time.perf_counter()
+        try:
+            if pipeline.run():
+                self._output.drain()
+                spans.mark("playback_end")
+        finally:
+            self._pipeline = None
+
+        if not pipeline.cancelled:
+            if metrics.first_token_s is not None:
+                spans.mark("llm_first_token", at=started + metrics.first_token_s)
+            if metrics.total_s is not None:
+                spans.mark("llm_last_token", at=started + metrics.total_s)
+                spans.add_span("llm", started, started + metrics.total_s, tokens=metrics.tokens)
+            if first_audio is not None:
+                spans.mark("tts_first_chunk", at=first_audio)
+
+        if not spoken and not pipeline.cancelled and _gate_open(gate, pipeline):
+            print(f"[dann] {NO_RESPONSE}", flush=True)
+            self._say(NO_RESPONSE)
+        if answer is None and self._fast_path is not None and chunks and not pipeline.cancelled:
+            llm_s = metrics.total_s if metrics.total_s is not None else trace.stage("llm").compute_s
+            self._fast_path.remember(text, " ".join(chunks), llm_s, cacheable=cacheable)
+        if metrics.tokens:
+            print(f"[llm] {metrics.summary()}", flush=True)
+            if isinstance(self._llm, OllamaRouter):
+                print(f"[llm] {self._llm.summary()}", flush=True)
+
+    def _voice_kwargs(self) -> dict:
+        return {
+            "voice_model": self._tts_cfg.get("voice_model", "models/piper/en_US-lessac-medium"),
+            "speed": self._tts_cfg.get("speed", 1.0),
+            "use_cuda": self._tts_cfg.get("use_cuda", False),
+        }
+
+    def _synthesize(self, text: str) -> Iterator[tuple[np.ndarray, int]]:
+        """Speech audio chunks for text, from the on-disk cache when enabled."""
+        if self._speech_cache is not None:
+            return self._speech_cache.synthesize(text, **self._voice_kwargs())
+        if self._workers is not None:
+            return self._workers.synthesize(text, **self._voice_kwargs())
+        return synthesize_stream(text, **self._voice_kwargs())
+
+    def _say(self, text: str) -> None:
+        """Speak a short status message (canned phrases are precomputed at startup)."""
+        if not self._ux_cfg.get("speak_errors", True):
+            return
+        try:
+            for pcm, sample_rate in self._synthesize(text):
+                self._output.write(pcm, sample_rate)
+            self._output.drain()
+        except Exception as e:
+            print(f"[tts] {e}", flush=True)
+
+    def _play_earcon(self, name: str) -> None:
+        """Queue a UI tone at the current output rate (no stream reopen)."""
+        sample_rate = self._output.sample_rate or 22050
+        key = (name, sample_rate)
+        if key not in self._earcons:
+            self._earcons[key] = getattr(earcons, name)(sample_rate)
+        self._output.write(self._earcons[key], sample_rate)
+
     def run(self) -> None:
         """Start wake word listener and run until interrupted."""
         model_path = Path(self._wake_cfg.get("model_path", "models/ok_dann.ppn"))
@@ -131,18 +723,32 @@ class Orchestrator:
                 "Porcupine access_key required. Get one from https://console.picovoice.ai/"
             )
 
-        self._detector = WakeWordDetector(
-            model_path=model_path,
-            on_wake=self._on_wake,
-            access_key=access_key,
-            builtin_keyword=builtin_keyword,
-            sensitivity=self._wake_cfg.get("sensitivity", 0.5),
-            debounce=self._wake_cfg.get("debounce", 2),
-            cooldown_s=self._wake_cfg.get("cooldown_ms", 2000) / 1000,
-            sample_rate=self._audio_cfg.get("sample_rate", 16000),
-            block_size=512,
-            device=self._audio_cfg.get("input_device"),
-        )
+        def load_wake_word() -> None:
+            self._detector = WakeWordDetector(
+                model_path=model_path,
+                on_wake=self._on_wake,
+                access_key=access_key,
+                builtin_keyword=builtin_keyword,
+                sensitivity=self._wake_cfg.get("sensitivity", 0.5),
+                debounce=self._wake_cfg.get("debounce", 2),
+                cooldown_s=self._wake_cfg.get("cooldown_ms", 2000) / 1000,
+                sample_rate=self._audio_cfg.get("sample_rate", 16000),
+                block_size=512,
+                bus=self._bus,
+                echo_gate=self._echo_gate.is_echo if self._echo_gate is not None else None,
+            )
+
+        # Porcupine, Whisper, Piper and the Ollama model load in parallel while the mic comes up
+        self.startup.add("wake_word", load_wake_word)
+        self._warm_up()
+        t0 = time.perf_counter()
+        self._bus.start()
+        self.startup.record("microphone", time.perf_counter() - t0)
+        try:
+            self.startup.wait("wake_word")
+        except BaseException:
+            self._bus.stop()
+            raise
 
         self._running = True
         wake_phrase = builtin_keyword or "ok Dann"
@@ -150,10 +756,19 @@ class Orchestrator:
         self._detector.start()
 
         try:
-            import time
             while self._running:
                 time.sleep(1)
+                registry.evict_idle()
         except KeyboardInterrupt:
             print("\n[dann] Stopping...", flush=True)
         finally:
+            pipeline = self._pipeline
+            if pipeline is not None:
+                pipeline.cancel()
             self._detector.stop()
+            self._bus.stop()
+            self._output.close()
+            self._llm.close()
+            if self._workers is not None:
+                self._workers.close()
+            self._tracer.close()
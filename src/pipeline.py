@@ -0,0 +1,224 @@
+"""Concurrent staged pipeline: worker threads connected by bounded queues."""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+_END = object()
+_POLL_S = 0.05
+
+
+class Cancelled(Exception):
+    """Raised inside stage workers when the pipeline is cancelled."""
+
+
+@dataclass
+class StageStats:
+    """Time a stage spent blocked on its queues vs. doing work."""
+
+    wait_s: float = 0.0
+    compute_s: float = 0.0
+    items: int = 0
+
+
+@dataclass
+class TurnTrace:
+    """Per-turn timing of every stage."""
+
+    turn_id: int
+    started: float = field(default_factory=time.perf_counter)
+    stages: dict[str, StageStats] = field(default_factory=dict)
+
+    def stage(self, name: str) -> StageStats:
+        return self.stages.setdefault(name, StageStats())
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[StageStats]:
+        """Count the enclosed block as compute time of `name`."""
+        stats = self.stage(name)
+        t0 = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.compute_s += time.perf_counter() - t0
+            stats.items += 1
+
+    def summary(self) -> str:
+        parts = [
+            f"{name} {s.compute_s * 1000:.0f}ms work/{s.wait_s * 1000:.0f}ms wait ({s.items})"
+            for name, s in self.stages.items()
+        ]
+        total = time.perf_counter() - self.started
+        return f"turn {self.turn_id} {total:.2f}s: " + " | ".join(parts)
+
+
+Stage = tuple[str, Callable[[Any], Iterable[Any] | None]]
+
+
+class Pipeline:
+    """
+    Runs `source` and each stage on its own thread. Stage functions map one input item
+    to zero or more outputs (return an iterable, or None for a sink); outputs of the last
+    stage are discarded. Queues are bounded, so a slow stage backs up the ones before it.
+    `cancel()` or an error in any stage stops every stage and closes the source.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: Sequence[Stage],
+        *,
+        source_name: str = "source",
+        queue_size: int = 4,
+        trace: TurnTrace | None = None,
+    ):
+        self._source = source
+        self._source_name = source_name
+        self._stages = list(stages)
+        self._queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in self._stages]
+        self.trace = trace or TurnTrace(turn_id=0)
+        self._cancel = threading.Event()
+        self._on_cancel: list[Callable[[], None]] = []
+        self._error: BaseException | None = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def add_cancel_hook(self, hook: Callable[[], None]) -> None:
+        """Call `hook` on cancel, e.g. to close a blocking network stream."""
+        self._on_cancel.append(hook)
+
+    def cancel(self) -> None:
+        """Stop all stages as soon as they next touch a queue."""
+        if self._cancel.is_set():
+            return
+        self._cancel.set()
+        for hook in self._on_cancel:
+            try:
+                hook()
+            except Exception as e:
+                print(f"[pipeline] cancel hook error: {e}", flush=True)
+
+    def run(self) -> bool:
+        """Run to completion. Returns False if cancelled; re-raises the first stage error."""
+        # Thread names show up in py-spy / faulthandler dumps
+        prefix = f"turn{self.trace.turn_id}"
+        workers = [
+            threading.Thread(
+                target=self._guard, args=(self._run_source,), name=f"{prefix}-{self._source_name}", daemon=True
+            )
+        ]
+        for i, (name, fn) in enumerate(self._stages):
+            q_out = self._queues[i + 1] if i + 1 < len(self._queues) else None
+            workers.append(
+                threading.Thread(
+                    target=self._guard,
+                    args=(self._run_stage, name, fn, self._queues[i], q_out),
+                    name=f"{prefix}-{name}",
+                    daemon=True,
+                )
+            )
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        if self._error is not None:
+            raise self._error
+        return not self._cancel.is_set()
+
+    def _guard(self, target: Callable[..., None], *args: Any) -> None:
+        try:
+            target(*args)
+        except Cancelled:
+            pass
+        except BaseException as e:
+            if self._cancel.is_set():
+                # Fallout of cancelling, e.g. a stream closed by a cancel hook
+                return
+            if self._error is None:
+                self._error = e
+            self.cancel()
+
+    def _put(self, q: queue.Queue, item: Any, stats: StageStats) -> None:
+        t0 = time.perf_counter()
+        while True:
+            if self._cancel.is_set():
+                raise Cancelled
+            try:
+                q.put(item, timeout=_POLL_S)
+                break
+            except queue.Full:
+                continue
+        stats.wait_s += time.perf_counter() - t0
+
+    def _get(self, q: queue.Queue, stats: StageStats) -> Any:
+        t0 = time.perf_counter()
+        while True:
+            if self._cancel.is_set():
+                raise Cancelled
+            try:
+                item = q.get(timeout=_POLL_S)
+                break
+            except queue.Empty:
+                continue
+        stats.wait_s += time.perf_counter() - t0
+        return item
+
+    def _drive(self, it: Iterator[Any], q_out: queue.Queue | None, stats: StageStats) -> None:
+        """Pull outputs from `it`, timing pulls as compute and forwarding them downstream."""
+        while True:
+            if self._cancel.is_set():
+                raise Cancelled
+            t0 = time.perf_counter()
+            try:
+                out = next(it)
+            except StopIteration:
+                stats.compute_s += time.perf_counter() - t0
+                return
+            stats.compute_s += time.perf_counter() - t0
+            if q_out is not None:
+                self._put(q_out, out, stats)
+
+    def _run_source(self) -> None:
+        stats = self.trace.stage(self._source_name)
+        q_out = self._queues[0] if self._queues else None
+        it = iter(self._source)
+        try:
+            self._drive(_counting(it, stats), q_out, stats)
+            if q_out is not None:
+                self._put(q_out, _END, stats)
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+
+    def _run_stage(
+        self,
+        name: str,
+        fn: Callable[[Any], Iterable[Any] | None],
+        q_in: queue.Queue,
+        q_out: queue.Queue | None,
+    ) -> None:
+        stats = self.trace.stage(name)
+        while True:
+            item = self._get(q_in, stats)
+            if item is _END:
+                if q_out is not None:
+                    self._put(q_out, _END, stats)
+                return
+            t0 = time.perf_counter()
+            result = fn(item)
+            stats.compute_s += time.perf_counter() - t0
+            stats.items += 1
+            if result is not None:
+                self._drive(iter(result), q_out, stats)
+
+
+def _counting(it: Iterator[Any], stats: StageStats) -> Iterator[Any]:
+    for item in it:
+        stats.items += 1
+        yield item
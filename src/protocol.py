@@ -0,0 +1,75 @@
+"""
+Framing for the voice server (`src.server`) and its clients.
+
+Each frame is a 1-byte type, a 4-byte big-endian payload length, and the payload.
+
+Client -> server:
+    HELLO  JSON {"sample_rate": 16000} (optional, first frame)
+    AUDIO  mono int16 little-endian PCM at 16 kHz
+    END    end of utterance (optional when the server does VAD endpointing)
+    RESET  forget the conversation
+
+Server -> client:
+    READY      JSON {"session": id}
+    TRANSCRIPT JSON {"text": ...}
+    TEXT       UTF-8 response chunk, as it is spoken
+    SPEECH     4-byte big-endian sample rate + mono int16 PCM
+    DONE       JSON turn timings
+    ERROR      JSON {"error": ...}
+"""
+
+import asyncio
+import json
+import struct
+from typing import Any
+
+HELLO = b"H"
+AUDIO = b"A"
+END = b"E"
+RESET = b"R"
+READY = b"K"
+TRANSCRIPT = b"T"
+TEXT = b"X"
+SPEECH = b"S"
+DONE = b"D"
+ERROR = b"!"
+
+_HEADER = struct.Struct(">cI")
+MAX_PAYLOAD = 4 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """Malformed frame from the peer."""
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[bytes, bytes] | None:
+    """Next (type, payload), or None when the peer closed the connection."""
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    kind, length = _HEADER.unpack(header)
+    if length > MAX_PAYLOAD:
+        raise ProtocolError(f"frame of {length} bytes exceeds {MAX_PAYLOAD}")
+    try:
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+    return kind, payload
+
+
+def frame(kind: bytes, payload: bytes = b"") -> bytes:
+    return _HEADER.pack(kind, len(payload)) + payload
+
+
+def json_frame(kind: bytes, obj: dict[str, Any]) -> bytes:
+    return frame(kind, json.dumps(obj).encode("utf-8"))
+
+
+def speech_payload(pcm: bytes, sample_rate: int) -> bytes:
+    return struct.pack(">I", sample_rate) + pcm
+
+
+def parse_speech(payload: bytes) -> tuple[int, bytes]:
+    (sample_rate,) = struct.unpack_from(">I", payload)
+    return sample_rate, payload[4:]
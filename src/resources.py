@@ -0,0 +1,27 @@
+"""Process resource measurements (resident memory)."""
+
+import os
+import sys
+
+
+def resident_memory_bytes() -> int:
+    """Return current resident set size of this process in bytes (0 if unknown)."""
+    try:
+        # Linux: current RSS in pages
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    # ru_maxrss is the peak, not current; kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_mb(n_bytes: int) -> str:
+    """Format a byte count as megabytes for log output."""
+    return f"{n_bytes / (1024 * 1024):.0f} MB"
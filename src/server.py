@@ -0,0 +1,365 @@
+"""
+Voice server: many satellite microphones over TCP, sharing one set of models.
+
+Each connection is a session with its own conversation. Utterances from all sessions
+are coalesced into batched Whisper decodes; Whisper, Piper, and the Ollama connection
+pool are shared. See src/protocol.py for the wire format and src/client.py for a test
+client.
+
+Run:
+    python -m src.server [--host 0.0.0.0] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+
+# Ensure repo root is on path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import protocol
+from src.audio import Endpointer, EnergyVad
+from src.config import load_config
+from src.llm import Conversation, StreamHandle, StreamMetrics, client_from_config
+from src.pipeline import Pipeline, TurnTrace
+from src.stt import BatchTranscriber, configure_registry
+from src.stt import warm_up as warm_up_stt
+from src.tts import SpeechCache, configure_voice_cache, synthesize_stream
+from src.tts import warm_up as warm_up_tts
+
+SAMPLE_RATE = 16000
+
+
+class VoiceServer:
+    """Accepts sessions and owns the resources they share."""
+
+    def __init__(self, config: dict[str, Any]):
+        self.config = config
+        self.server_cfg = config.get("server", {})
+        self.stt_cfg = config.get("stt", {})
+        self.ollama_cfg = config.get("ollama", {})
+        self.tts_cfg = config.get("tts", {})
+        self.vad_cfg = config.get("vad", {})
+        self.max_sessions = self.server_cfg.get("max_sessions", 8)
+
+        configure_registry(max_models=self.stt_cfg.get("max_resident_models", 2))
+        configure_voice_cache(
+            max_voices=self.tts_cfg.get("max_cached_voices", 2),
+            intra_op_threads=self.tts_cfg.get("intra_op_threads", 0),
+            inter_op_threads=self.tts_cfg.get("inter_op_threads", 0),
+        )
+        self.stt = BatchTranscriber(
+            model_size=self.stt_cfg.get("model_size", "base"),
+            language=self.stt_cfg.get("language", "en"),
+            device=self.stt_cfg.get("device", "cpu"),
+            compute_type=self.stt_cfg.get("compute_type", "int8"),
+            beam_size=self.server_cfg.get("beam_size", 1),
+            window_ms=self.server_cfg.get("batch_window_ms", 30),
+            max_batch=self.server_cfg.get("max_batch", 8),
+        )
+        self.llm = client_from_config(self.ollama_cfg, pool_size=self.max_sessions)
+        cache_cfg = self.tts_cfg.get("cache", {})
+        self.speech_cache: SpeechCache | None = None
+        if cache_cfg.get("enabled", True):
+            self.speech_cache = SpeechCache(
+                Path(cache_cfg.get("dir") or Path.home() / ".cache" / "dann-of-thursday" / "tts").expanduser(),
+                max_mb=cache_cfg.get("max_mb", 256),
+            )
+        # Piper sessions are shared; cap concurrent synthesis so sessions don't oversubscribe the CPU
+        self.tts_slots = threading.BoundedSemaphore(self.server_cfg.get("tts_concurrency", 2))
+        self.sessions: dict[int, "Session"] = {}
+        self._ids = itertools.count(1)
+
+    def voice_kwargs(self) -> dict:
+        return {
+            "voice_model": self.tts_cfg.get("voice_model", "models/piper/en_US-lessac-medium"),
+            "speed": self.tts_cfg.get("speed", 1.0),
+            "use_cuda": self.tts_cfg.get("use_cuda", False),
+        }
+
+    def synthesize(self, text: str) -> Iterator[tuple[np.ndarray, int]]:
+        if self.speech_cache is not None:
+            return self.speech_cache.synthesize(text, **self.voice_kwargs())
+        return synthesize_stream(text, **self.voice_kwargs())
+
+    def warm_up(self) -> None:
+        warm_up_stt(
+            model_size=self.stt_cfg.get("model_size", "base"),
+            language=self.stt_cfg.get("language", "en"),
+            device=self.stt_cfg.get("device", "cpu"),
+            compute_type=self.stt_cfg.get("compute_type", "int8"),
+        )
+        warm_up_tts(self.voice_kwargs()["voice_model"], use_cuda=self.tts_cfg.get("use_cuda", False))
+        try:
+            self.llm.preload()
+        except Exception as e:
+            print(f"[llm] Preload failed: {e}", flush=True)
+
+    def make_endpointer(self) -> Endpointer | None:
+        """Server-side endpointing per session; None means clients send END themselves."""
+        if not self.server_cfg.get("vad_endpointing", True):
+            return None
+        vad = EnergyVad(
+            sample_rate=SAMPLE_RATE,
+            frame_ms=self.vad_cfg.get("frame_ms", 20),
+            margin_db=self.vad_cfg.get("margin_db", 9.0),
+            min_level_db=self.vad_cfg.get("min_level_db", -55.0),
+        )
+        return Endpointer(
+            vad,
+            hangover_ms=self.vad_cfg.get("hangover_ms", 300),
+            onset_ms=self.vad_cfg.get("onset_ms", 60),
+        )
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if len(self.sessions) >= self.max_sessions:
+            writer.write(protocol.json_frame(protocol.ERROR, {"error": "server full"}))
+            await writer.drain()
+            writer.close()
+            return
+        session = Session(self, next(self._ids), reader, writer)
+        self.sessions[session.id] = session
+        peer = writer.get_extra_info("peername")
+        print(f"[server] Session {session.id} connected from {peer} ({len(self.sessions)} active)", flush=True)
+        try:
+            await session.run()
+        finally:
+            del self.sessions[session.id]
+            print(f"[server] Session {session.id} closed ({len(self.sessions)} active)", flush=True)
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self._handle, host, port)
+        print(f"[server] Listening on {host}:{port} (max {self.max_sessions} sessions)", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self.stt.close()
+        self.llm.close()
+
+
+class Session:
+    """
+    One connected microphone. Incoming audio is collected into utterances (ended by the
+    client's END frame or server-side VAD) and queued; turns run one at a time.
+    Backpressure: when `queue_utterances` utterances are waiting, the session stops
+    reading its socket, so TCP flow control slows the client down; replies go through
+    `drain()`, so a slow reader holds back its own synthesis and generation only.
+    """
+
+    def __init__(
+        self,
+        server: VoiceServer,
+        session_id: int,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        self.server = server
+        self.id = session_id
+        self.reader = reader
+        self.writer = writer
+        cfg = server.server_cfg
+        self.utterances: asyncio.Queue[np.ndarray] = asyncio.Queue(maxsize=cfg.get("queue_utterances", 2))
+        self.conversation = Conversation(
+            server.llm,
+            system_prompt=server.ollama_cfg.get("system_prompt", ""),
+            token_budget=server.ollama_cfg.get("conversation", {}).get("token_budget", 1536),
+            idle_reset_s=server.ollama_cfg.get("conversation", {}).get("idle_reset_s", 300),
+        )
+        self.endpointer = server.make_endpointer()
+        self._audio = np.zeros(int(SAMPLE_RATE * cfg.get("max_utterance_s", 15)), dtype=np.float32)
+        self._filled = 0
+        self._vad_pos = 0
+        self._turns = 0
+        self._pipeline: Pipeline | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        await self._send(protocol.json_frame(protocol.READY, {"session": self.id}))
+        turns = asyncio.create_task(self._run_turns())
+        try:
+            await self._read()
+            # Client finished sending: answer what is still queued, then hang up
+            # (unless the turns task stopped, e.g. the connection broke)
+            drained = asyncio.create_task(self.utterances.join())
+            await asyncio.wait([drained, turns], return_when=asyncio.FIRST_COMPLETED)
+            drained.cancel()
+        except (ConnectionError, protocol.ProtocolError) as e:
+            print(f"[server] Session {self.id}: {e}", flush=True)
+        finally:
+            pipeline = self._pipeline
+            if pipeline is not None:
+                pipeline.cancel()
+            turns.cancel()
+            self.writer.close()
+
+    async def _read(self) -> None:
+        while True:
+            frame = await protocol.read_frame(self.reader)
+            if frame is None:
+                return
+            kind, payload = frame
+            if kind == protocol.AUDIO:
+                for utterance in self._add_audio(payload):
+                    await self.utterances.put(utterance)
+            elif kind == protocol.END:
+                utterance = self._take_utterance()
+                if utterance is not None:
+                    await self.utterances.put(utterance)
+            elif kind == protocol.RESET:
+                self.conversation.reset()
+            elif kind == protocol.HELLO:
+                hello = json.loads(payload or b"{}")
+                if hello.get("sample_rate", SAMPLE_RATE) != SAMPLE_RATE:
+                    raise protocol.ProtocolError(f"only {SAMPLE_RATE} Hz audio is supported")
+            else:
+                raise protocol.ProtocolError(f"unknown frame type {kind!r}")
+
+    def _add_audio(self, payload: bytes) -> list[np.ndarray]:
+        """Append int16 PCM; returns utterances completed by it (VAD endpoint or full buffer)."""
+        done = []
+        pcm = np.frombuffer(payload, dtype="<i2")
+        while pcm.size:
+            room = len(self._audio) - self._filled
+            n = min(room, pcm.size)
+            np.multiply(pcm[:n], 1 / 32768, out=self._audio[self._filled : self._filled + n], casting="unsafe")
+            self._filled += n
+            pcm = pcm[n:]
+            if self._endpoint() or self._filled == len(self._audio):
+                utterance = self._take_utterance()
+                if utterance is not None:
+                    done.append(utterance)
+        return done
+
+    def _endpoint(self) -> bool:
+        ep = self.endpointer
+        if ep is None:
+            return False
+        while self._vad_pos + ep.frame_samples <= self._filled:
+            frame = self._audio[self._vad_pos : self._vad_pos + ep.frame_samples]
+            self._vad_pos += ep.frame_samples
+            if ep.update(frame):
+                return True
+        if not ep.speech_started and self._filled > SAMPLE_RATE:
+            # Keep only the last 0.5 s of leading silence
+            keep = SAMPLE_RATE // 2
+            self._audio[:keep] = self._audio[self._filled - keep : self._filled]
+            self._filled = self._vad_pos = keep
+        return False
+
+    def _take_utterance(self) -> np.ndarray | None:
+        utterance = self._audio[: self._filled].copy() if self._filled else None
+        self._filled = self._vad_pos = 0
+        if self.endpointer is not None:
+            if utterance is not None and not self.endpointer.speech_started and self.endpointer.frames:
+                utterance = None  # nothing but background noise
+            self.endpointer.reset()
+        return utterance
+
+    async def _send(self, data: bytes) -> None:
+        self.writer.write(data)
+        await self.writer.drain()
+
+    def _send_threadsafe(self, data: bytes) -> None:
+        """Send from a pipeline thread, blocking it while the client is slow to read."""
+        asyncio.run_coroutine_threadsafe(self._send(data), self._loop).result()
+
+    async def _run_turns(self) -> None:
+        while True:
+            audio = await self.utterances.get()
+            try:
+                await self._turn(audio)
+            except ConnectionError:
+                return
+            except Exception as e:
+                print(f"[server] Session {self.id} turn failed: {e}", flush=True)
+                await self._send(protocol.json_frame(protocol.ERROR, {"error": str(e)}))
+            finally:
+                self.utterances.task_done()
+
+    async def _turn(self, audio: np.ndarray) -> None:
+        self._turns += 1
+        trace = TurnTrace(turn_id=self._turns)
+        t0 = time.perf_counter()
+        with trace.timed("stt"):
+            text = await asyncio.wrap_future(self.server.stt.submit(audio))
+        stt_s = time.perf_counter() - t0
+        await self._send(protocol.json_frame(protocol.TRANSCRIPT, {"text": text}))
+        if text:
+            await asyncio.to_thread(self._respond, text, trace)
+        done = {
+            "turn": self._turns,
+            "audio_s": len(audio) / SAMPLE_RATE,
+            "stt_ms": round(stt_s * 1000),
+            "total_ms": round((time.perf_counter() - t0) * 1000),
+        }
+        await self._send(protocol.json_frame(protocol.DONE, done))
+        print(f"[server] Session {self.id} {trace.summary()} | stt batches: {self.server.stt.stats.summary()}", flush=True)
+
+    def _respond(self, text: str, trace: TurnTrace) -> None:
+        """LLM -> TTS -> send, overlapping (runs on a worker thread)."""
+        metrics = StreamMetrics()
+        handle = StreamHandle()
+        options = {
+            "temperature": self.server.ollama_cfg.get("temperature", 0.7),
+            "max_tokens": self.server.ollama_cfg.get("max_tokens", 150),
+        }
+
+        def synthesize(chunk: str) -> list[bytes]:
+            with self.server.tts_slots:
+                audio = [
+                    protocol.frame(protocol.SPEECH, protocol.speech_payload(pcm.tobytes(), sr))
+                    for pcm, sr in self.server.synthesize(chunk)
+                ]
+            return [protocol.frame(protocol.TEXT, chunk.encode("utf-8"))] + audio
+
+        pipeline = Pipeline(
+            self.conversation.stream(text, metrics=metrics, handle=handle, **options),
+            [("tts", synthesize), ("send", self._send_threadsafe)],
+            source_name="llm",
+            queue_size=self.server.config.get("pipeline", {}).get("queue_size", 4),
+            trace=trace,
+        )
+        pipeline.add_cancel_hook(handle.close)
+        self._pipeline = pipeline
+        try:
+            pipeline.run()
+        finally:
+            self._pipeline = None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve voice sessions from remote microphones over TCP.")
+    parser.add_argument("--config", type=Path, default=None, help="Config file (default: config.yaml).")
+    parser.add_argument("--host", default=None, help="Bind address (default: server.host).")
+    parser.add_argument("--port", type=int, default=None, help="Port (default: server.port).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config(args.config)
+    server_cfg = config.get("server", {})
+    server = VoiceServer(config)
+    server.warm_up()
+    try:
+        host = args.host or server_cfg.get("host", "127.0.0.1")
+        port = args.port or server_cfg.get("port", 8765)
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        print("\n[server] Stopping...", flush=True)
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
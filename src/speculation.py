@@ -0,0 +1,212 @@
+"""Speculative responses: start the LLM on a likely endpoint, before the user is done."""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import numpy as np
+
+from src.audio import Endpointer
+from src.intents import normalize
+from src.pipeline import Pipeline, TurnTrace
+
+# Stages whose time is real work (playback only waits on the gate while speculating)
+_WORK_STAGES = ("stt", "llm", "tts")
+
+
+def same_request(a: str, b: str) -> bool:
+    """
+    Transcripts match only when their normalized forms are equal: one changed word
+    ("fifteen"/"fifty", an inserted "not") makes it a different question.
+    """
+    return normalize(a) == normalize(b)
+
+
+@dataclass
+class SpeculationStats:
+    """Speculation outcomes across turns and the compute spent on discarded work."""
+
+    attempts: int = 0
+    hits: int = 0
+    misses: int = 0
+    resumed: int = 0
+    head_start_s: float = 0.0
+    wasted_s: float = 0.0
+
+    def summary(self) -> str:
+        rate = self.hits / self.attempts if self.attempts else 0.0
+        return (
+            f"speculation {self.hits}/{self.attempts} hits ({rate:.0%}), {self.misses} mismatched, "
+            f"{self.resumed} speech resumed; {self.head_start_s:.2f}s head start gained, "
+            f"{self.wasted_s:.2f}s compute wasted"
+        )
+
+
+class Speculation:
+    """
+    One speculative response on its own thread: `transcribe(audio)` gives `text`, then
+    `respond(spec)` starts the response pipeline with `gate` holding back playback and
+    registers the pipeline via `attach`, so `cancel` can stop it. `state` is whatever
+    `respond` needs to keep until the speculation is confirmed (e.g. a forked
+    conversation history).
+    """
+
+    def __init__(
+        self,
+        audio: np.ndarray,
+        transcribe: Callable[[np.ndarray], str],
+        respond: Callable[["Speculation"], None],
+    ):
+        self.text = ""
+        self.dispatched = False
+        self.state: Any = None
+        self.gate = threading.Event()
+        self.trace = TurnTrace(turn_id=0)
+        self.started = time.perf_counter()
+        # Set once the response is dispatched (attached) or will not be
+        self.settled = threading.Event()
+        self._lock = threading.Lock()
+        self._pipeline: Pipeline | None = None
+        self._cancelled = False
+        self._thread = threading.Thread(
+            target=self._main, args=(audio, transcribe, respond), name="speculation", daemon=True
+        )
+        self._thread.start()
+
+    def _main(
+        self,
+        audio: np.ndarray,
+        transcribe: Callable[[np.ndarray], str],
+        respond: Callable[["Speculation"], None],
+    ) -> None:
+        try:
+            with self.trace.timed("stt"):
+                self.text = transcribe(audio)
+            if self.text and not self._cancelled:
+                respond(self)
+        except Exception as e:
+            print(f"[spec] Error: {e}", flush=True)
+        finally:
+            self.settled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def attach(self, pipeline: Pipeline) -> None:
+        with self._lock:
+            self._pipeline = pipeline
+            self.dispatched = True
+            if self._cancelled:
+                pipeline.cancel()
+        self.settled.set()
+
+    def confirm(self) -> None:
+        """Release playback and wait for the response to finish."""
+        self.gate.set()
+        self._thread.join()
+
+    def cancel(self) -> None:
+        """Stop the response (closing the LLM stream); its synthesized audio is dropped. Does not wait."""
+        with self._lock:
+            self._cancelled = True
+            if self._pipeline is not None:
+                self._pipeline.cancel()
+
+    def join(self) -> float:
+        """Wait for the thread to stop. Returns the compute it spent."""
+        self._thread.join()
+        return sum(self.trace.stage(name).compute_s for name in _WORK_STAGES)
+
+
+class Speculator:
+    """
+    Per-turn policy, driven from the recorder: once the endpointer has seen `after_ms` of
+    silence after speech (a likely endpoint, before its hangover expires), start a
+    Speculation on the audio so far. If speech resumes, cancel it; a later pause may
+    speculate again. `resolve` compares the final transcript with the speculative one;
+    on a hit, `commit` is called once the speculative response has finished.
+    """
+
+    def __init__(
+        self,
+        endpointer: Endpointer,
+        transcribe: Callable[[np.ndarray], str],
+        respond: Callable[[Speculation], None],
+        stats: SpeculationStats,
+        *,
+        commit: Callable[[Speculation], None] | None = None,
+        after_ms: float = 150.0,
+    ):
+        self.endpointer = endpointer
+        self.transcribe = transcribe
+        self.respond = respond
+        self.stats = stats
+        self.commit = commit
+        self.after_ms = after_ms
+        self._active: Speculation | None = None
+        # Cancelled but not yet joined, with why: "resumed", "mismatch", or "cancelled"
+        self._dropped: list[tuple[Speculation, str]] = []
+
+    def update(self, audio: np.ndarray) -> None:
+        """Recording so far (called per frame, before the endpointer sees the frame)."""
+        ep = self.endpointer
+        if not ep.speech_started:
+            return
+        silence_ms = ep.trailing_silence_ms
+        if self._active is None:
+            if silence_ms >= self.after_ms:
+                self._active = Speculation(audio, self.transcribe, self.respond)
+        elif silence_ms == 0:
+            # User kept talking: the speculative transcript is stale. Don't block the
+            # recorder; the thread is joined (and its cost counted) at the end of the turn.
+            self._drop("resumed")
+
+    def resolve(self, final_text: str) -> bool:
+        """True if the speculative response matches `final_text` and has been played."""
+        spec = self._active
+        hit = False
+        if spec is not None:
+            # Not just transcribed: `respond` must have dispatched it (or given up)
+            spec.settled.wait()
+            if spec.dispatched and not spec.cancelled and same_request(spec.text, final_text):
+                self._active = None
+                self.stats.attempts += 1
+                self.stats.hits += 1
+                self.stats.head_start_s += time.perf_counter() - spec.started
+                print(f"[spec] Speculative answer confirmed for: {spec.text}", flush=True)
+                spec.confirm()
+                if self.commit is not None:
+                    self.commit(spec)
+                hit = True
+            else:
+                self._drop("mismatch")
+        self._settle()
+        return hit
+
+    def cancel(self) -> None:
+        """Drop any speculation in flight (e.g. the turn failed)."""
+        self._drop("cancelled")
+        self._settle()
+
+    def _drop(self, reason: str) -> None:
+        if self._active is not None:
+            self._active.cancel()
+            self._dropped.append((self._active, reason))
+            self._active = None
+
+    def _settle(self) -> None:
+        """Join dropped speculations and account for the work they threw away."""
+        for spec, reason in self._dropped:
+            wasted = spec.join()
+            if not spec.dispatched:
+                continue
+            self.stats.attempts += 1
+            self.stats.wasted_s += wasted
+            if reason == "resumed":
+                self.stats.resumed += 1
+            elif reason == "mismatch":
+                self.stats.misses += 1
+                print(f"[spec] Discarded speculative answer for: {spec.text}", flush=True)
+        self._dropped.clear()
@@ -0,0 +1,126 @@
+"""Boot: warm-up stages run concurrently on background threads, with readiness tracking."""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass
+class StageState:
+    """Readiness of one startup stage."""
+
+    name: str
+    status: str = PENDING
+    started: float | None = None
+    elapsed_s: float = 0.0
+    error: BaseException | None = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+class Startup:
+    """
+    Runs named warm-up stages (model loads, connections) at the same time, each on its
+    own thread, while the caller brings up the rest (e.g. the microphone). Callers that
+    need a stage `wait` for it; `status` and `summary` report what is hot and how long
+    each part of the boot took. Stages timed by the caller (imports, construction) can
+    be added with `record`; `started` (perf_counter) lets the total include them.
+    """
+
+    def __init__(self, started: float | None = None):
+        self.started = time.perf_counter() if started is None else started
+        self._stages: dict[str, StageState] = {}
+        self._tasks: dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+        self._finished: float | None = None
+
+    def add(self, name: str, task: Callable[[], None]) -> None:
+        """Register a stage; it runs when `start` is called."""
+        self._stages[name] = StageState(name)
+        self._tasks[name] = task
+
+    def record(self, name: str, elapsed_s: float) -> None:
+        """Add a stage that already ran (timed elsewhere) to the breakdown."""
+        state = StageState(name, status=READY, elapsed_s=elapsed_s)
+        state.done.set()
+        self._stages[name] = state
+
+    def start(self) -> None:
+        for name, task in self._tasks.items():
+            threading.Thread(target=self._run, args=(name, task), name=f"startup-{name}", daemon=True).start()
+        self._tasks = {}
+
+    def _run(self, name: str, task: Callable[[], None]) -> None:
+        state = self._stages[name]
+        state.status = LOADING
+        state.started = time.perf_counter()
+        try:
+            task()
+            state.status = READY
+        except BaseException as e:
+            state.error = e
+            state.status = FAILED
+            print(f"[startup] {name} failed: {e}", flush=True)
+        finally:
+            state.elapsed_s = time.perf_counter() - state.started
+            state.done.set()
+        if state.status == READY:
+            print(f"[startup] {name} ready in {state.elapsed_s:.2f}s", flush=True)
+        with self._lock:
+            if self._finished is None and all(s.done.is_set() for s in self._stages.values()):
+                self._finished = time.perf_counter()
+                print(f"[startup] {self.summary()}", flush=True)
+
+    def wait(self, name: str, timeout: float | None = None, *, check: bool = True) -> bool:
+        """
+        Block until stage `name` is done (unknown stages count as ready). Returns False
+        on timeout. If the stage failed, re-raises its error; with `check=False` a failed
+        stage just counts as done (for callers that load on first use instead).
+        """
+        state = self._stages.get(name)
+        if state is None:
+            return True
+        if not state.done.wait(timeout):
+            return False
+        if check and state.error is not None:
+            raise state.error
+        return True
+
+    def wait_all(self, timeout: float | None = None) -> bool:
+        """Block until every stage is done; False on timeout. Failures are not raised."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for state in list(self._stages.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not state.done.wait(remaining):
+                return False
+        return True
+
+    def ready(self, name: str) -> bool:
+        state = self._stages.get(name)
+        return state is None or state.status == READY
+
+    def failed(self, name: str) -> bool:
+        state = self._stages.get(name)
+        return state is not None and state.status == FAILED
+
+    def status(self) -> dict[str, str]:
+        """Stage name -> pending / loading / ready / failed."""
+        return {name: state.status for name, state in self._stages.items()}
+
+    def summary(self) -> str:
+        total = (self._finished or time.perf_counter()) - self.started
+        parts = []
+        for state in self._stages.values():
+            if state.status == LOADING and state.started is not None:
+                parts.append(f"{state.name} loading {time.perf_counter() - state.started:.2f}s")
+            else:
+                parts.append(f"{state.name} {state.elapsed_s:.2f}s" + ("" if state.status == READY else f" ({state.status})"))
+        # Stages overlap, so the boot takes as long as the slowest, not the sum
+        slowest = max(self._stages.values(), key=lambda s: s.elapsed_s, default=None)
+        tail = f" (slowest: {slowest.name})" if slowest is not None else ""
+        return f"ready in {total:.2f}s: " + " | ".join(parts) + tail
@@ -1,5 +1,26 @@
-"""Speech-to-text."""
+"""Speech-to-text. Submodules load on first use of a name (see src/lazy.py)."""
 
-from .whisper import transcribe_audio
+from typing import TYPE_CHECKING
 
-__all__ = ["transcribe_audio"]
+from src.lazy import lazy_exports
+
+_EXPORTS = {
+    "transcribe_audio": ".whisper",
+    "transcribe_words": ".whisper",
+    "warm_up": ".whisper",
+    "configure_registry": ".whisper",
+    "registry": ".whisper",
+    "StreamingTranscriber": ".streaming",
+    "StreamingStats": ".streaming",
+    "transcribe_batch": ".batch",
+    "BatchTranscriber": ".batch",
+    "BatchStats": ".batch",
+}
+
+if TYPE_CHECKING:
+    from .batch import BatchStats, BatchTranscriber, transcribe_batch
+    from .streaming import StreamingStats, StreamingTranscriber
+    from .whisper import configure_registry, registry, transcribe_audio, transcribe_words, warm_up
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,174 @@
+"""Batched transcription of many short utterances in one Whisper decode."""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+import numpy as np
+
+from .whisper import _as_mono_float32, registry
+
+# Whisper's input window; longer utterances are decoded one by one
+_MAX_BATCH_SAMPLES = 30 * 16000
+# Cleared (once, process-wide) when this faster-whisper can't do the batched decode
+_batching = True
+
+
+def transcribe_batch(
+    audios: list[np.ndarray],
+    *,
+    model_size: str = "base",
+    language: str = "en",
+    device: str = "cpu",
+    compute_type: str = "int8",
+    beam_size: int = 1,
+) -> list[str]:
+    """
+    Transcribe utterances (16 kHz float32, each up to 30 s) with one batched encoder and
+    decoder call: features are stacked and run through CTranslate2's Whisper `generate`
+    together. This relies on faster-whisper internals; if they are missing or have
+    changed, it says so once and falls back to one `transcribe` call per utterance.
+    """
+    global _batching
+    model = registry.get(model_size, device, compute_type)
+    audios = [_as_mono_float32(a) for a in audios]
+    if _batching and len(audios) > 1 and all(len(a) <= _MAX_BATCH_SAMPLES for a in audios):
+        try:
+            return _transcribe_batched(model, audios, language, beam_size)
+        except (ImportError, AttributeError, TypeError) as e:
+            _batching = False
+            print(f"[stt] Batched decoding unavailable ({e!r}); transcribing one by one", flush=True)
+    return [_transcribe_one(model, a, language, beam_size) for a in audios]
+
+
+def _transcribe_batched(model, audios: list[np.ndarray], language: str, beam_size: int) -> list[str]:
+    from faster_whisper.audio import pad_or_trim
+    from faster_whisper.tokenizer import Tokenizer
+
+    tokenizer = Tokenizer(model.hf_tokenizer, model.model.is_multilingual, task="transcribe", language=language)
+    features = np.stack([pad_or_trim(model.feature_extractor(a)) for a in audios])
+    encoded = model.encode(features)
+    prompt = model.get_prompt(tokenizer, [], without_timestamps=True)
+    results = model.model.generate(
+        encoded,
+        [prompt] * len(audios),
+        beam_size=beam_size,
+        max_length=model.max_length,
+        suppress_blank=True,
+        return_no_speech_prob=True,
+    )
+    texts = []
+    for result in results:
+        if result.no_speech_prob > 0.6:
+            texts.append("")
+            continue
+        texts.append(tokenizer.decode(result.sequences_ids[0]).strip())
+    return texts
+
+
+def _transcribe_one(model, audio: np.ndarray, language: str, beam_size: int) -> str:
+    segments, _ = model.transcribe(audio, language=language, beam_size=beam_size)
+    return " ".join(seg.text.strip() for seg in segments if seg.text.strip()).strip()
+
+
+@dataclass
+class BatchStats:
+    """How well concurrent utterances were coalesced, and what it cost them in waiting."""
+
+    batches: int = 0
+    items: int = 0
+    decode_s: float = 0.0
+    queued_s: float = 0.0
+
+    def summary(self) -> str:
+        n = max(1, self.batches)
+        return (
+            f"{self.items} utterances in {self.batches} batches (avg {self.items / n:.1f}), "
+            f"decode {self.decode_s / n * 1000:.0f}ms/batch, "
+            f"queued {self.queued_s / max(1, self.items) * 1000:.0f}ms avg"
+        )
+
+
+class BatchTranscriber:
+    """
+    Coalesces utterances submitted from many threads (or sessions) into batched decodes.
+    A single worker takes the first waiting utterance, collects whatever else arrives
+    within `window_ms` (up to `max_batch`), and transcribes them together.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_size: str = "base",
+        language: str = "en",
+        device: str = "cpu",
+        compute_type: str = "int8",
+        beam_size: int = 1,
+        window_ms: int = 30,
+        max_batch: int = 8,
+    ):
+        self._kwargs = {
+            "model_size": model_size,
+            "language": language,
+            "device": device,
+            "compute_type": compute_type,
+            "beam_size": beam_size,
+        }
+        self.window_s = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.stats = BatchStats()
+        self._queue: queue.Queue[tuple[np.ndarray, Future, float] | None] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="stt-batch", daemon=True)
+        self._thread.start()
+
+    def submit(self, audio: np.ndarray) -> "Future[str]":
+        """Queue an utterance; the future resolves to its transcript."""
+        future: Future[str] = Future()
+        self._queue.put((audio, future, time.perf_counter()))
+        return future
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.window_s
+            stop = False
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._decode(batch)
+            if stop:
+                return
+
+    def _decode(self, batch: list[tuple[np.ndarray, Future, float]]) -> None:
+        t0 = time.perf_counter()
+        try:
+            texts = transcribe_batch([audio for audio, _, _ in batch], **self._kwargs)
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        s = self.stats
+        s.batches += 1
+        s.items += len(batch)
+        s.decode_s += time.perf_counter() - t0
+        s.queued_s += sum(t0 - queued for _, _, queued in batch)
+        for (_, future, _), text in zip(batch, texts):
+            future.set_result(text)
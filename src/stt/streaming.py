@@ -0,0 +1,207 @@
+"""Incremental transcription of a growing recording (local agreement over a sliding window)."""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from .whisper import _as_mono_float32, transcribe_words
+
+# (audio, initial_prompt) -> [(start s, end s, word)], e.g. `transcribe_words` in a worker
+WordDecoder = Callable[[np.ndarray, str | None], list[tuple[float, float, str]]]
+
+
+@dataclass
+class Word:
+    start: float  # seconds from the start of the recording
+    end: float
+    text: str
+
+    @property
+    def key(self) -> str:
+        return re.sub(r"[^\w']", "", self.text.lower())
+
+
+@dataclass
+class StreamingStats:
+    """Decode work for one utterance: during speech vs. after the endpoint."""
+
+    passes: int = 0
+    decode_s: float = 0.0
+    final_s: float = 0.0
+    tail_s: float = 0.0
+    audio_s: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.passes} passes ({self.decode_s:.2f}s) while speaking; final decode "
+            f"{self.final_s * 1000:.0f}ms over the last {self.tail_s:.1f}s of {self.audio_s:.1f}s"
+        )
+
+
+class StreamingTranscriber:
+    """
+    Transcribes a recording while it is still growing. A worker thread re-decodes the
+    window after the last committed word every `step_ms` of new audio; words on which two
+    consecutive passes agree are committed (and passed as prompt to later passes), the rest
+    is reported as a partial hypothesis. After every commit the window start moves up to
+    the end of the committed text (minus `overlap_ms`, so the next word is not clipped);
+    if nothing commits, it still moves once the window exceeds `max_window_s`.
+    `finish` then only has to decode the still unstable tail.
+
+    Feed it with `update(audio)`, where `audio` is the recording so far (the recorder
+    passes views of its preallocated buffer, so nothing is copied per frame). Decodes
+    run through `decode` if given (e.g. in worker processes), else in this process.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_size: str = "base",
+        language: str = "en",
+        device: str = "cpu",
+        compute_type: str = "int8",
+        sample_rate: int = 16000,
+        step_ms: int = 500,
+        max_window_s: float = 8.0,
+        overlap_ms: int = 300,
+        on_partial: Callable[[str, str], None] | None = None,
+        decode: WordDecoder | None = None,
+    ):
+        if decode is None:
+
+            def decode(audio: np.ndarray, initial_prompt: str | None) -> list[tuple[float, float, str]]:
+                return transcribe_words(
+                    audio,
+                    initial_prompt=initial_prompt,
+                    model_size=model_size,
+                    language=language,
+                    device=device,
+                    compute_type=compute_type,
+                )
+
+        self._decode_words = decode
+        self.language = language
+        self.sample_rate = sample_rate
+        self.step_samples = int(sample_rate * step_ms / 1000)
+        self.max_window_samples = int(sample_rate * max_window_s)
+        self.overlap_samples = int(sample_rate * overlap_ms / 1000)
+        self.on_partial = on_partial
+        self.stats = StreamingStats()
+
+        self.committed: list[Word] = []
+        self._previous: list[Word] = []
+        self._window_start = 0  # samples
+        self._decoded_to = 0
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stt-stream", daemon=True)
+        self._thread.start()
+
+    @property
+    def committed_text(self) -> str:
+        return "".join(w.text for w in self.committed).strip()
+
+    @property
+    def partial_text(self) -> str:
+        return "".join(w.text for w in self.committed + self._previous).strip()
+
+    def update(self, audio: np.ndarray) -> None:
+        """Recording so far. Cheap: only wakes the worker once a step of new audio is in."""
+        self._audio = audio
+        if len(audio) - self._decoded_to >= self.step_samples:
+            self._wake.set()
+
+    def peek(self, audio: np.ndarray) -> str:
+        """Best transcript of `audio` right now, without committing anything."""
+        audio = _as_mono_float32(audio, self.sample_rate)
+        with self._lock:
+            window_start, committed = self._window_start, list(self.committed)
+        words = self._decode(audio, window_start, committed)
+        return "".join(w.text for w in committed + words).strip()
+
+    def close(self) -> None:
+        """Stop the worker. Does not wait: a pass still in progress is discarded when it ends."""
+        self._stop.set()
+        self._wake.set()
+
+    def finish(self, audio: np.ndarray) -> str:
+        """Stop incremental passes and decode the unstable tail. Returns the full transcript."""
+        self.close()
+        audio = _as_mono_float32(audio, self.sample_rate)
+        t0 = time.perf_counter()
+        with self._lock:
+            window_start, committed = self._window_start, list(self.committed)
+        words = self._decode(audio, window_start, committed)
+        with self._lock:
+            self.committed = committed + words
+        s = self.stats
+        s.final_s = time.perf_counter() - t0
+        s.tail_s = max(0, len(audio) - window_start) / self.sample_rate
+        s.audio_s = len(audio) / self.sample_rate
+        return self.committed_text
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            audio = self._audio
+            if len(audio) - self._decoded_to < self.step_samples:
+                continue
+            t0 = time.perf_counter()
+            try:
+                if not self._step(_as_mono_float32(audio, self.sample_rate)):
+                    return
+            except Exception as e:
+                print(f"[stt] Streaming pass failed: {e}", flush=True)
+                return
+            self.stats.passes += 1
+            self.stats.decode_s += time.perf_counter() - t0
+            if self.on_partial is not None:
+                self.on_partial(self.committed_text, self.partial_text)
+
+    def _step(self, audio: np.ndarray) -> bool:
+        """One pass over the window; False if `finish` took over meanwhile (result dropped)."""
+        self._decoded_to = len(audio)
+        with self._lock:
+            window_start, committed = self._window_start, list(self.committed)
+        current = self._decode(audio, window_start, committed)
+        with self._lock:
+            if self._stop.is_set():
+                return False
+            # Local agreement: commit the longest prefix both passes produced
+            n = 0
+            while n < min(len(current), len(self._previous)) and current[n].key == self._previous[n].key:
+                n += 1
+            self.committed += current[:n]
+            self._previous = current[n:]
+            if self.committed and (n or len(audio) - self._window_start > self.max_window_samples):
+                end = int(self.committed[-1].end * self.sample_rate)
+                self._window_start = max(self._window_start, end - self.overlap_samples)
+        return True
+
+    def _decode(self, audio: np.ndarray, window_start: int, committed: list[Word]) -> list[Word]:
+        """Words in the window that come after the committed text, in recording time."""
+        offset = window_start / self.sample_rate
+        prompt = "".join(w.text for w in committed).strip() or None
+        words = [
+            Word(offset + start, offset + end, text)
+            for start, end, text in self._decode_words(audio[window_start:], prompt)
+        ]
+        if not committed:
+            return words
+        # Drop words re-recognized from audio that was already committed...
+        committed_end = committed[-1].end
+        words = [w for w in words if w.start > committed_end - 0.1]
+        # ...and a repeated tail of the committed text at the window start
+        for k in range(min(5, len(words), len(committed)), 0, -1):
+            if [w.key for w in committed[-k:]] == [w.key for w in words[:k]]:
+                return words[k:]
+        return words
@@ -1,20 +1,214 @@
 """Speech-to-text using faster-whisper."""
 
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from faster_whisper import WhisperModel
+import numpy as np
+
+from src.resources import format_mb, resident_memory_bytes
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+ModelKey = tuple[str, str, str]
+
+# Whisper's input rate
+SAMPLE_RATE = 16000
+# memoryview formats accepted as PCM
+_PCM_FORMATS = {"f": np.float32, "h": np.int16}
+
+
+@dataclass
+class LoadedModel:
+    """A resident Whisper model and its load statistics."""
+
+    model: "WhisperModel"
+    load_s: float
+    rss_bytes: int
+    last_used: float
+    uses: int = 0
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of Whisper models keyed by (model_size, device, compute_type).
+    Keeps at most `max_models` resident (least recently used evicted first) and drops
+    models idle for longer than `idle_ttl_s` (0 disables the TTL).
+    """
+
+    def __init__(self, *, max_models: int = 2, idle_ttl_s: float = 0.0):
+        self.max_models = max(1, max_models)
+        self.idle_ttl_s = idle_ttl_s
+        self._models: dict[ModelKey, LoadedModel] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_size: str, device: str, compute_type: str) -> "WhisperModel":
+        """Return resident model for key, loading it on first use."""
+        key = (model_size, device, compute_type)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                entry = self._load(key)
+                self._models[key] = entry
+                self._evict_lru(keep=key)
+            entry.last_used = time.monotonic()
+            entry.uses += 1
+            return entry.model
+
+    def _load(self, key: ModelKey) -> LoadedModel:
+        # Imported on first load: faster_whisper pulls in ctranslate2 and tokenizers (slow)
+        from faster_whisper import WhisperModel
+
+        model_size, device, compute_type = key
+        rss_before = resident_memory_bytes()
+        t0 = time.perf_counter()
+        model = WhisperModel(model_size, device=device, compute_type=compute_type)
+        load_s = time.perf_counter() - t0
+        rss_delta = max(0, resident_memory_bytes() - rss_before)
+        print(
+            f"[stt] Loaded whisper {model_size} ({device}/{compute_type}) "
+            f"in {load_s:.2f}s, +{format_mb(rss_delta)} resident",
+            flush=True,
+        )
+        return LoadedModel(model=model, load_s=load_s, rss_bytes=rss_delta, last_used=time.monotonic())
+
+    def _evict_lru(self, keep: ModelKey) -> None:
+        while len(self._models) > self.max_models:
+            victim = min(
+                (k for k in self._models if k != keep),
+                key=lambda k: self._models[k].last_used,
+            )
+            self._drop(victim, reason="lru")
+
+    def _drop(self, key: ModelKey, reason: str) -> None:
+        entry = self._models.pop(key)
+        print(
+            f"[stt] Evicted whisper {key[0]} ({key[1]}/{key[2]}, {reason}), "
+            f"freed ~{format_mb(entry.rss_bytes)}",
+            flush=True,
+        )
+
+    def evict_idle(self) -> None:
+        """Drop models that have not been used within `idle_ttl_s`."""
+        if self.idle_ttl_s <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, e in self._models.items() if now - e.last_used > self.idle_ttl_s]:
+                self._drop(key, reason="idle")
+
+    def clear(self) -> None:
+        """Unload all models."""
+        with self._lock:
+            self._models.clear()
+
+    def stats(self) -> dict[ModelKey, dict[str, float]]:
+        """Load time, resident bytes, idle time, and use count per resident model."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: {
+                    "load_s": e.load_s,
+                    "rss_bytes": e.rss_bytes,
+                    "idle_s": now - e.last_used,
+                    "uses": e.uses,
+                }
+                for key, e in self._models.items()
+            }
+
+
+registry = ModelRegistry()
+
+
+def configure_registry(*, max_models: int = 2, idle_ttl_s: float = 0.0) -> None:
+    """Set eviction policy of the process-wide registry."""
+    registry.max_models = max(1, max_models)
+    registry.idle_ttl_s = idle_ttl_s
+
+
+def warm_up(
+    *,
+    model_size: str = "base",
+    language: str = "en",
+    device: str = "cpu",
+    compute_type: str = "int8",
+) -> None:
+    """Load model into the registry and run one short decode so first turn is hot."""
+    model = registry.get(model_size, device, compute_type)
+    t0 = time.perf_counter()
+    segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), language=language)
+    list(segments)
+    print(f"[stt] Warm-up decode {time.perf_counter() - t0:.2f}s", flush=True)
+
+
+def _as_mono_float32(audio: np.ndarray | memoryview, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    View PCM buffer as mono float32 in [-1, 1], copying only when unavoidable. A
+    memoryview must be float32 ("f") or int16 ("h") samples, e.g. `memoryview(data).cast("h")`
+    for raw PCM bytes. Whisper only takes 16 kHz audio; other rates are rejected.
+    """
+    if sample_rate != SAMPLE_RATE:
+        raise ValueError(f"Whisper needs {SAMPLE_RATE} Hz audio, got {sample_rate} Hz")
+    if isinstance(audio, memoryview):
+        fmt = audio.format.lstrip("@=<")
+        if fmt not in _PCM_FORMATS:
+            raise ValueError(f"Unsupported PCM memoryview format {audio.format!r} (use 'f' float32 or 'h' int16)")
+        arr = np.frombuffer(audio, dtype=_PCM_FORMATS[fmt])
+    else:
+        arr = audio
+    if arr.ndim == 2:
+        arr = arr[:, 0] if arr.shape[1] == 1 else arr.mean(axis=1)
+    if arr.dtype == np.int16:
+        arr = arr.astype(np.float32) / 32768.0
+    elif arr.dtype.kind != "f":
+        raise ValueError(f"Unsupported PCM dtype {arr.dtype} (use float32 or int16)")
+    return np.ascontiguousarray(arr, dtype=np.float32)
 
 
 def transcribe_audio(
-    audio_path: Path | str,
+    audio: np.ndarray | memoryview | Path | str,
     *,
     model_size: str = "base",
     language: str = "en",
     device: str = "cpu",
     compute_type: str = "int8",
+    sample_rate: int = SAMPLE_RATE,
 ) -> str:
-    """Transcribe WAV file to text. Returns empty string if nothing detected."""
-    model = WhisperModel(model_size, device=device, compute_type=compute_type)
-    segments, info = model.transcribe(str(audio_path), language=language)
+    """
+    Transcribe audio to text. Returns empty string if nothing detected.
+    `audio` is 16 kHz float32 or int16 PCM (ndarray or memoryview) or a path to an
+    audio file; `sample_rate` is checked for PCM.
+    """
+    model = registry.get(model_size, device, compute_type)
+    source = str(audio) if isinstance(audio, (str, Path)) else _as_mono_float32(audio, sample_rate)
+    segments, info = model.transcribe(source, language=language)
     text = " ".join(seg.text.strip() for seg in segments if seg.text.strip())
     return text.strip()
+
+
+def transcribe_words(
+    audio: np.ndarray | memoryview,
+    *,
+    initial_prompt: str | None = None,
+    model_size: str = "base",
+    language: str = "en",
+    device: str = "cpu",
+    compute_type: str = "int8",
+    sample_rate: int = SAMPLE_RATE,
+) -> list[tuple[float, float, str]]:
+    """
+    Word-level transcript of 16 kHz float32 PCM: (start s, end s, text) per word, text
+    with its leading space as Whisper produced it. `initial_prompt` is earlier context.
+    """
+    model = registry.get(model_size, device, compute_type)
+    segments, _ = model.transcribe(
+        _as_mono_float32(audio, sample_rate),
+        language=language,
+        initial_prompt=initial_prompt,
+        word_timestamps=True,
+        condition_on_previous_text=False,
+    )
+    return [(w.start, w.end, w.word) for seg in segments for w in (seg.words or [])]
@@ -0,0 +1,249 @@
+"""
+Per-turn timing spans, exported as JSONL and Prometheus text format.
+
+A `Tracer` hands out one `TurnSpans` per turn. Stages are wrapped in `span(name)`;
+moments (first LLM token, first TTS audio, playback start/end) are `mark(name)`s,
+reported as seconds after the end of capture. When tracing is disabled the tracer
+hands out a shared no-op `TurnSpans`, so instrumented code costs one method call.
+
+Every N-th turn can be run under cProfile (the turn thread; pipeline stage threads are
+named `turn<id>-<stage>` so py-spy dumps show which turn and stage they belong to).
+"""
+
+import cProfile
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, ContextManager, Iterator
+
+# Histogram buckets (seconds), from audio-frame scale up to slow LLM answers
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_NO_SPAN = nullcontext()  # reusable
+
+
+@dataclass
+class Histogram:
+    """Cumulative Prometheus histogram."""
+
+    counts: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+    total: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class TurnSpans:
+    """Spans and marks of one turn; `end()` exports them."""
+
+    def __init__(self, tracer: "Tracer", turn_id: int):
+        self.tracer = tracer
+        self.turn_id = turn_id
+        self.started = time.perf_counter()
+        self.wall_started = time.time()
+        self.spans: list[dict[str, Any]] = []
+        self.marks: dict[str, float] = {}
+        self._profile: cProfile.Profile | None = None
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[None]:
+        """Time the enclosed block as stage `name`."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, t0, time.perf_counter(), **attrs)
+
+    def add_span(self, name: str, start: float, end: float, **attrs: Any) -> None:
+        """Record a stage timed elsewhere (`perf_counter` values)."""
+        self.spans.append({"name": name, "start_s": start - self.started, "duration_s": end - start, **attrs})
+
+    def mark(self, name: str, at: float | None = None) -> None:
+        """Note a moment (`perf_counter`, default now); only the first mark of a name counts."""
+        self.marks.setdefault(name, (time.perf_counter() if at is None else at) - self.started)
+
+    def profile(self) -> None:
+        """Start profiling this (the calling) thread until `end()`; the tracer decides if sampled."""
+        if self.tracer.sample_profile(self.turn_id):
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def end(self, **attrs: Any) -> None:
+        """Finish the turn and export it. `attrs` (e.g. outcome) go into its JSONL record."""
+        if self._profile is not None:
+            self._profile.disable()
+            self.tracer.save_profile(self.turn_id, self._profile)
+            self._profile = None
+        self.tracer.export(self, time.perf_counter() - self.started, attrs)
+
+
+class _NullTurnSpans(TurnSpans):
+    """What a disabled tracer hands out: every call is a no-op."""
+
+    def __init__(self) -> None:
+        self.turn_id = 0
+        self.marks = {}
+
+    def span(self, name: str, **attrs: Any) -> ContextManager[None]:
+        return _NO_SPAN
+
+    def add_span(self, name: str, start: float, end: float, **attrs: Any) -> None:
+        pass
+
+    def mark(self, name: str, at: float | None = None) -> None:
+        pass
+
+    def profile(self) -> None:
+        pass
+
+    def end(self, **attrs: Any) -> None:
+        pass
+
+
+NULL_TURN = _NullTurnSpans()
+
+
+class Tracer:
+    """
+    Collects turn spans. Outputs, each optional: `jsonl` (one record per turn: spans,
+    marks, attrs), `prometheus_file` (text-format metrics rewritten after each turn,
+    e.g. for node_exporter's textfile collector), `prometheus_port` (serves /metrics).
+    `profile_every` > 0 profiles every N-th turn into `profile_dir` as .prof files
+    (open with `python -m pstats` or snakeviz).
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        jsonl: Path | str | None = None,
+        prometheus_file: Path | str | None = None,
+        prometheus_port: int | None = None,
+        profile_every: int = 0,
+        profile_dir: Path | str = "logs/profiles",
+    ):
+        self.enabled = enabled
+        self.jsonl = Path(jsonl) if jsonl else None
+        self.prometheus_file = Path(prometheus_file) if prometheus_file else None
+        self.profile_every = profile_every
+        self.profile_dir = Path(profile_dir)
+        self._lock = threading.Lock()
+        self._stages: dict[str, Histogram] = {}
+        self._latencies: dict[str, Histogram] = {}
+        self._turns: dict[str, int] = {}
+        self._server: ThreadingHTTPServer | None = None
+        if enabled and prometheus_port:
+            self._serve(prometheus_port)
+
+    def turn(self, turn_id: int) -> TurnSpans:
+        return TurnSpans(self, turn_id) if self.enabled else NULL_TURN
+
+    def sample_profile(self, turn_id: int) -> bool:
+        return self.profile_every > 0 and turn_id % self.profile_every == 0
+
+    def save_profile(self, turn_id: int, profile: cProfile.Profile) -> None:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / f"turn-{int(time.time())}-{turn_id}.prof"
+        profile.dump_stats(str(path))
+        print(f"[trace] Profile of turn {turn_id} saved to {path}", flush=True)
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration outside any turn (e.g. the wake word callback)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._stages.setdefault(name, Histogram()).observe(seconds)
+
+    def export(self, turn: TurnSpans, duration_s: float, attrs: dict[str, Any]) -> None:
+        # Marks are reported relative to the end of capture, i.e. latency the user hears
+        origin = turn.marks.get("endpoint", 0.0)
+        latencies = {name: t - origin for name, t in turn.marks.items() if name != "endpoint"}
+        with self._lock:
+            for span in turn.spans:
+                self._stages.setdefault(span["name"], Histogram()).observe(span["duration_s"])
+            for name, seconds in latencies.items():
+                self._latencies.setdefault(name, Histogram()).observe(seconds)
+            outcome = str(attrs.get("outcome", "ok"))
+            self._turns[outcome] = self._turns.get(outcome, 0) + 1
+        if self.jsonl is not None:
+            record = {
+                "turn": turn.turn_id,
+                "time": turn.wall_started,
+                "duration_s": duration_s,
+                **attrs,
+                "spans": turn.spans,
+                "marks": turn.marks,
+                "latency_s": latencies,
+            }
+            self.jsonl.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.jsonl, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        if self.prometheus_file is not None:
+            self.prometheus_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.prometheus_file.with_suffix(".tmp")
+            tmp.write_text(self.prometheus_text(), encoding="utf-8")
+            tmp.replace(self.prometheus_file)  # atomic, so scrapers never see half a file
+
+    def prometheus_text(self) -> str:
+        lines = [
+            "# HELP dann_turns_total Completed turns by outcome.",
+            "# TYPE dann_turns_total counter",
+        ]
+        with self._lock:
+            for outcome, n in sorted(self._turns.items()):
+                lines.append(f'dann_turns_total{{outcome="{outcome}"}} {n}')
+            lines += _histogram_lines(
+                "dann_stage_seconds", "Time spent in each stage.", "stage", self._stages
+            )
+            lines += _histogram_lines(
+                "dann_latency_seconds", "Time from end of capture to each turn milestone.", "mark", self._latencies
+            )
+        return "\n".join(lines) + "\n"
+
+    def _serve(self, port: int) -> None:
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        print(f"[trace] Metrics at http://0.0.0.0:{port}/metrics", flush=True)
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _histogram_lines(metric: str, help_text: str, label: str, histograms: dict[str, Histogram]) -> list[str]:
+    lines = [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+    for name, h in sorted(histograms.items()):
+        for bound, n in zip(BUCKETS, h.counts):
+            lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound:g}"}} {n}')
+        lines.append(f'{metric}_bucket{{{label}="{name}",le="+Inf"}} {h.count}')
+        lines.append(f'{metric}_sum{{{label}="{name}"}} {h.total:.6f}')
+        lines.append(f'{metric}_count{{{label}="{name}"}} {h.count}')
+    return lines
@@ -1,5 +1,21 @@
-"""Text-to-speech (Piper)."""
+"""Text-to-speech (Piper). Submodules load on first use of a name (see src/lazy.py)."""
 
-from .piper import synthesize_speech
+from typing import TYPE_CHECKING
 
-__all__ = ["synthesize_speech"]
+from src.lazy import lazy_exports
+
+_EXPORTS = {
+    "synthesize_speech": ".piper",
+    "synthesize_stream": ".piper",
+    "warm_up": ".piper",
+    "configure_voice_cache": ".piper",
+    "voice_cache": ".piper",
+    "SpeechCache": ".cache",
+}
+
+if TYPE_CHECKING:
+    from .cache import SpeechCache
+    from .piper import configure_voice_cache, synthesize_speech, synthesize_stream, voice_cache, warm_up
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
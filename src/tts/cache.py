@@ -0,0 +1,166 @@
+"""Content-addressed on-disk cache of synthesized speech."""
+
+import hashlib
+import json
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+
+from .piper import _resolve_onnx_path, synthesize_stream
+
+_MAGIC = b"DANNPCM1"
+_HEADER = struct.Struct("<8sI4x")  # magic, sample rate, pad to 16 bytes
+
+
+def _piper_version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("piper-tts")
+    except Exception:
+        return "unknown"
+
+
+class SpeechCache:
+    """
+    Synthesized speech stored as raw mono int16 PCM files named by
+    hash(text, voice model, speed, Piper version). Hits are memory-mapped, so playback
+    reads pages straight from the file. Total size is capped; least recently used
+    entries (by file mtime, touched on every hit) are evicted first; an entry that
+    can't be deleted yet (still mapped by a playing answer, on Windows) is retried on
+    the next eviction. Misses are synthesized by `synthesizer` (same signature as `synthesize_stream`).
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        max_mb: float = 256.0,
+        synthesizer: Callable[..., Iterator[tuple[np.ndarray, int]]] = synthesize_stream,
+    ):
+        self.directory = Path(directory)
+        self.synthesizer = synthesizer
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._piper_version = _piper_version()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # key -> (size, last used); rebuilt from disk so LRU survives restarts
+        self._index: dict[str, tuple[int, float]] = {}
+        # Evicted keys whose files could not be deleted yet
+        self._undeleted: set[str] = set()
+        for path in self.directory.glob("*.pcm"):
+            st = path.stat()
+            self._index[path.stem] = (st.st_size, st.st_mtime)
+
+    def key(self, text: str, *, voice_model: str | Path, speed: float) -> str:
+        ident = [text.strip(), str(_resolve_onnx_path(voice_model)), round(speed, 3), self._piper_version]
+        return hashlib.sha256(json.dumps(ident).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pcm"
+
+    def get(self, key: str) -> tuple[np.ndarray, int] | None:
+        """Memory-mapped samples and sample rate, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                magic, sample_rate = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError("bad header")
+            pcm = np.memmap(path, dtype=np.int16, mode="r", offset=_HEADER.size)
+            os.utime(path)
+            st = path.stat()
+        except (OSError, ValueError, struct.error):
+            with self._lock:
+                self._index.pop(key, None)
+            return None
+        with self._lock:
+            self._index[key] = (st.st_size, st.st_mtime)
+            self._undeleted.discard(key)
+        return pcm, sample_rate
+
+    def put(self, key: str, pcm: np.ndarray, sample_rate: int) -> None:
+        """Store samples atomically, then evict LRU entries beyond the size cap."""
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, sample_rate))
+            f.write(np.ascontiguousarray(pcm, dtype=np.int16).tobytes())
+        os.replace(tmp, path)
+        st = path.stat()
+        with self._lock:
+            self._index[key] = (st.st_size, st.st_mtime)
+            self._evict()
+
+    def _evict(self) -> None:
+        for key in list(self._undeleted):
+            self._delete(key)
+        total = sum(size for size, _ in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k][1]):
+            if total <= self.max_bytes:
+                break
+            size, _ = self._index.pop(key)
+            self._delete(key)
+            total -= size
+
+    def _delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink(missing_ok=True)
+        except OSError:
+            # Windows won't delete a file that is memory-mapped (e.g. being played)
+            self._undeleted.add(key)
+        else:
+            self._undeleted.discard(key)
+
+    def synthesize(
+        self,
+        text: str,
+        *,
+        voice_model: str | Path,
+        speed: float = 1.0,
+        use_cuda: bool = False,
+    ) -> Iterator[tuple[np.ndarray, int]]:
+        """
+        Like `synthesize_stream`, but served from the cache when possible. On a miss,
+        chunks are yielded as Piper produces them and stored once synthesis completes.
+        """
+        key = self.key(text, voice_model=voice_model, speed=speed)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            yield cached
+            return
+
+        self.misses += 1
+        chunks: list[np.ndarray] = []
+        sample_rate = 0
+        for pcm, sample_rate in self.synthesizer(text, voice_model=voice_model, speed=speed, use_cuda=use_cuda):
+            chunks.append(pcm)
+            yield pcm, sample_rate
+        if chunks:
+            self.put(key, np.concatenate(chunks), sample_rate)
+
+    def precompute(
+        self,
+        phrases: list[str],
+        *,
+        voice_model: str | Path,
+        speed: float = 1.0,
+        use_cuda: bool = False,
+    ) -> int:
+        """Synthesize phrases not cached yet. Returns how many were synthesized."""
+        done = 0
+        for text in phrases:
+            key = self.key(text, voice_model=voice_model, speed=speed)
+            if key in self._index and self._path(key).exists():
+                continue
+            for _ in self.synthesize(text, voice_model=voice_model, speed=speed, use_cuda=use_cuda):
+                pass
+            done += 1
+        return done
@@ -1,18 +1,28 @@
 """Text-to-speech using Piper (piper-tts Python API)."""
 
+import functools
+import json
+import os
 import tempfile
+import threading
+import time
 import wave
+from dataclasses import dataclass
 from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Iterator
 
-try:
+import numpy as np
+
+from src.resources import format_mb
+
+if TYPE_CHECKING:
     from piper import PiperVoice, SynthesisConfig
-    _HAS_PIPER_API = True
-except ImportError:
-    _HAS_PIPER_API = False
 
 
+@functools.lru_cache(maxsize=32)
 def _resolve_onnx_path(voice_model: str | Path) -> Path:
-    """Resolve voice model path to .onnx file."""
+    """Resolve voice model path to .onnx file. Cached: globbing runs once per path."""
     voice = Path(voice_model)
     if voice.is_dir():
         candidates = [voice / "model.onnx", voice.with_suffix(".onnx")]
@@ -29,6 +39,181 @@ def _resolve_onnx_path(voice_model: str | Path) -> Path:
     return voice
 
 
+def _syn_config(speed: float) -> "SynthesisConfig":
+    return _piper().SynthesisConfig(
+        length_scale=1.0 / speed if speed != 1.0 else None,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _piper() -> ModuleType:
+    """The piper module, imported on first use (it loads onnxruntime, which is slow)."""
+    try:
+        import piper
+    except ImportError as e:
+        raise ImportError(
+            "piper-tts is required. Install with: pip install piper-tts"
+        ) from e
+    return piper
+
+
+VoiceKey = tuple[Path, bool]
+
+# Resident size of a loaded voice relative to its .onnx file: the weights, plus about as
+# much again for ONNX Runtime's pre-packed copies and CPU arena
+_MEMORY_PER_MODEL_BYTE = 2.0
+
+
+@dataclass
+class LoadedVoice:
+    """A resident Piper voice and its load statistics."""
+
+    voice: "PiperVoice"
+    load_s: float
+    rss_bytes: int  # estimated from the model size, see _MEMORY_PER_MODEL_BYTE
+    last_used: float
+
+
+class VoiceCache:
+    """
+    Process-wide cache of Piper voices keyed by (resolved .onnx path, use_cuda).
+    Several voices can be resident; least recently used ones are evicted once more
+    than `max_voices` are loaded or their total memory exceeds `max_memory_mb`. Memory
+    per voice is estimated from its model file, not measured: other models load at the
+    same time (boot warm-up), so a process RSS delta would charge the voice for them.
+    `intra_op_threads` / `inter_op_threads` tune new ONNX Runtime sessions (0 = default).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_voices: int = 2,
+        max_memory_mb: float = 0.0,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+    ):
+        self.max_voices = max(1, max_voices)
+        self.max_memory_mb = max_memory_mb
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self._voices: dict[VoiceKey, LoadedVoice] = {}
+        self._lock = threading.Lock()
+
+    def get(self, voice_model: str | Path, *, use_cuda: bool = False) -> "PiperVoice":
+        """Return resident voice, loading it on first use."""
+        _piper()
+        key = (_resolve_onnx_path(voice_model), use_cuda)
+        with self._lock:
+            entry = self._voices.get(key)
+            if entry is None:
+                entry = self._load(key)
+                self._voices[key] = entry
+                self._evict(keep=key)
+            entry.last_used = time.monotonic()
+            return entry.voice
+
+    def _load(self, key: VoiceKey) -> LoadedVoice:
+        onnx_path, use_cuda = key
+        t0 = time.perf_counter()
+        if self.intra_op_threads or self.inter_op_threads:
+            voice = self._load_tuned(onnx_path, use_cuda)
+        else:
+            voice = _piper().PiperVoice.load(onnx_path, use_cuda=use_cuda)
+        load_s = time.perf_counter() - t0
+        size = int(onnx_path.stat().st_size * _MEMORY_PER_MODEL_BYTE)
+        print(
+            f"[tts] Loaded voice {onnx_path.name} in {load_s:.2f}s, ~{format_mb(size)} resident",
+            flush=True,
+        )
+        return LoadedVoice(voice=voice, load_s=load_s, rss_bytes=size, last_used=time.monotonic())
+
+    def _load_tuned(self, onnx_path: Path, use_cuda: bool) -> "PiperVoice":
+        """Same as PiperVoice.load, with ONNX Runtime thread counts applied."""
+        import onnxruntime
+        from piper.config import PiperConfig
+
+        options = onnxruntime.SessionOptions()
+        if self.intra_op_threads:
+            options.intra_op_num_threads = self.intra_op_threads
+        if self.inter_op_threads:
+            options.inter_op_num_threads = self.inter_op_threads
+        providers = ["CUDAExecutionProvider", "CPUExecutionProvider"] if use_cuda else ["CPUExecutionProvider"]
+
+        with open(f"{onnx_path}.json", encoding="utf-8") as f:
+            config = PiperConfig.from_dict(json.load(f))
+        session = onnxruntime.InferenceSession(str(onnx_path), sess_options=options, providers=providers)
+        return _piper().PiperVoice(config=config, session=session)
+
+    def _evict(self, keep: VoiceKey) -> None:
+        budget = self.max_memory_mb * 1024 * 1024
+        while len(self._voices) > 1 and (
+            len(self._voices) > self.max_voices
+            or (budget > 0 and sum(e.rss_bytes for e in self._voices.values()) > budget)
+        ):
+            victim = min(
+                (k for k in self._voices if k != keep),
+                key=lambda k: self._voices[k].last_used,
+            )
+            entry = self._voices.pop(victim)
+            print(f"[tts] Evicted voice {victim[0].name}, freed ~{format_mb(entry.rss_bytes)}", flush=True)
+
+    def clear(self) -> None:
+        """Unload all voices."""
+        with self._lock:
+            self._voices.clear()
+
+    def stats(self) -> dict[VoiceKey, dict[str, float]]:
+        """Load time, estimated resident bytes, and idle time per resident voice."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: {"load_s": e.load_s, "rss_bytes": e.rss_bytes, "idle_s": now - e.last_used}
+                for key, e in self._voices.items()
+            }
+
+
+voice_cache = VoiceCache()
+
+
+def configure_voice_cache(
+    *,
+    max_voices: int = 2,
+    max_memory_mb: float = 0.0,
+    intra_op_threads: int = 0,
+    inter_op_threads: int = 0,
+) -> None:
+    """Set eviction policy and session options of the process-wide voice cache."""
+    voice_cache.max_voices = max(1, max_voices)
+    voice_cache.max_memory_mb = max_memory_mb
+    voice_cache.intra_op_threads = intra_op_threads
+    voice_cache.inter_op_threads = inter_op_threads
+
+
+def warm_up(voice_model: str | Path, *, use_cuda: bool = False) -> None:
+    """Load voice into the cache and run one dummy synthesis so first answer is hot."""
+    voice = voice_cache.get(voice_model, use_cuda=use_cuda)
+    t0 = time.perf_counter()
+    for _ in voice.synthesize("Ready.", _syn_config(1.0)):
+        pass
+    print(f"[tts] Warm-up synthesis {time.perf_counter() - t0:.2f}s", flush=True)
+
+
+def synthesize_stream(
+    text: str,
+    *,
+    voice_model: str | Path = "models/piper/en_US-lessac-medium",
+    speed: float = 1.0,
+    use_cuda: bool = False,
+) -> Iterator[tuple[np.ndarray, int]]:
+    """
+    Synthesize text with Piper, yielding (mono int16 samples, sample_rate) per chunk
+    as soon as each one is ready. Nothing is written to disk.
+    """
+    voice = voice_cache.get(voice_model, use_cuda=use_cuda)
+    for chunk in voice.synthesize(text.strip(), _syn_config(speed)):
+        yield np.frombuffer(chunk.audio_int16_bytes, dtype=np.int16), chunk.sample_rate
+
+
 def synthesize_speech(
     text: str,
     *,
@@ -36,23 +221,22 @@ def synthesize_speech(
     voice_model: str | Path = "models/piper/en_US-lessac-medium",
     speed: float = 1.0,
     output_path: Path | None = None,
+    use_cuda: bool = False,
 ) -> Path:
     """
     Synthesize text to WAV using Piper. Returns path to WAV file.
+    Without `output_path` a unique temp file is created; the caller deletes it.
     Uses piper-tts Python API (works on M1 Mac). Install: pip install piper-tts
     """
-    if not _HAS_PIPER_API:
-        raise ImportError(
-            "piper-tts is required. Install with: pip install piper-tts"
-        )
+    voice = voice_cache.get(voice_model, use_cuda=use_cuda)
+    if output_path is None:
+        fd, name = tempfile.mkstemp(prefix="dann_tts_", suffix=".wav")
+        os.close(fd)
+        out = Path(name)
+    else:
+        out = output_path
 
-    onnx_path = _resolve_onnx_path(voice_model)
-    out = output_path or Path(tempfile.gettempdir()) / "dann_tts_output.wav"
-
-    voice = PiperVoice.load(onnx_path, use_cuda=False)
-    syn_config = SynthesisConfig(
-        length_scale=1.0 / speed if speed != 1.0 else None,
-    )
+    syn_config = _syn_config(speed)
 
     with wave.open(str(out), "wb") as wav_file:
         wav_params_set = False
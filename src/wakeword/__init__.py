@@ -1,5 +1,18 @@
-"""Wake word detection."""
+"""Wake word detection. Submodules load on first use of a name (see src/lazy.py)."""
 
-from .detector import WakeWordDetector
+from typing import TYPE_CHECKING
 
-__all__ = ["WakeWordDetector"]
+from src.lazy import lazy_exports
+
+_EXPORTS = {
+    "WakeWordDetector": ".detector",
+    "WakeWordEngine": ".engine",
+    "create_porcupine": ".engine",
+}
+
+if TYPE_CHECKING:
+    from .detector import WakeWordDetector
+    from .engine import WakeWordEngine, create_porcupine
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,22 +1,32 @@
 """Wake word detector using Picovoice Porcupine."""
 
 import threading
-import time
 from pathlib import Path
 from typing import Callable
 
 import numpy as np
-import pvporcupine
-import sounddevice as sd
+
+from src.audio.bus import CaptureBus, to_pcm16
+
+from .engine import WakeWordEngine, create_porcupine
 
 
 class WakeWordDetector:
-    """Listens for wake word and invokes callback on detection."""
+    """
+    Listens for wake word and invokes callback on detection. Reads frames from a shared
+    `CaptureBus` (its own if none is given) on a consumer thread, so Porcupine never
+    runs inside the audio callback. `on_wake` receives the absolute bus position where
+    the wake word ended, so a recorder can start from that exact frame. Frames go
+    through preallocated buffers; when the bus captures int16 they are read as-is.
+    With an `echo_gate` (frame -> True if it is only our own playback) detection can
+    stay on while speaking: gated frames reach Porcupine as silence. The decision
+    logic is a `WakeWordEngine`, shared with the offline benchmark (bench/wakeword.py).
+    """
 
     def __init__(
         self,
         model_path: Path | str | None,
-        on_wake: Callable[[], None],
+        on_wake: Callable[[int], None],
         *,
         access_key: str,
         builtin_keyword: str | None = None,
@@ -26,6 +36,8 @@ class WakeWordDetector:
         sample_rate: int = 16000,
         block_size: int = 512,
         device: int | None = None,
+        bus: CaptureBus | None = None,
+        echo_gate: Callable[[np.ndarray], bool] | None = None,
     ):
         self.model_path = Path(model_path) if model_path else None
         self.on_wake = on_wake
@@ -37,33 +49,24 @@ class WakeWordDetector:
         self.sample_rate = sample_rate
         self.block_size = block_size
         self.device = device
+        self._owns_bus = bus is None
+        self.bus = bus or CaptureBus(sample_rate=sample_rate, block_size=block_size, device=device)
+        self.echo_gate = echo_gate
 
         # Porcupine requires 16-bit PCM audio (int16), not float32
         # Porcupine expects exactly 512 samples per frame for 16kHz
         if self.block_size != 512:
             raise ValueError("Porcupine requires block_size=512 for 16kHz audio")
 
-        # Initialize Porcupine: use built-in keyword or custom .ppn
-        if builtin_keyword:
-            self._porcupine = pvporcupine.create(
-                access_key=self.access_key,
-                keywords=[builtin_keyword],
-                sensitivities=[self.sensitivity],
-            )
-        elif self.model_path and self.model_path.exists():
-            self._porcupine = pvporcupine.create(
-                access_key=self.access_key,
-                keyword_paths=[str(self.model_path)],
-                sensitivities=[self.sensitivity],
-            )
-        else:
-            raise FileNotFoundError(
-                f"Wake word model not found: {self.model_path}. "
-                "Use builtin_keyword (e.g. 'porcupine') to test, or download correct .ppn from Picovoice Console."
-            )
-
-        self._last_trigger = 0.0
-        self._consecutive = 0
+        self._porcupine = create_porcupine(
+            access_key=self.access_key,
+            model_path=self.model_path,
+            builtin_keyword=builtin_keyword,
+            sensitivity=self.sensitivity,
+        )
+        self._engine = WakeWordEngine(
+            self._porcupine, debounce=debounce, cooldown_samples=int(cooldown_s * sample_rate)
+        )
         self._running = False
         self._paused = False
         self._thread: threading.Thread | None = None
@@ -73,6 +76,7 @@ class WakeWordDetector:
         if self._running:
             return
         self._running = True
+        self.bus.start()
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
 
@@ -82,6 +86,8 @@ class WakeWordDetector:
         if self._thread:
             self._thread.join(timeout=2.0)
             self._thread = None
+        if self._owns_bus:
+            self.bus.stop()
         if self._porcupine:
             self._porcupine.delete()
             self._porcupine = None
@@ -95,45 +101,27 @@ class WakeWordDetector:
         self._paused = False
 
     def _run(self) -> None:
-        def callback(indata: np.ndarray, frames: int, time_info: object, status: object) -> None:
-            nonlocal self
-            if status:
-                print(f"[wakeword] {status}", flush=True)
+        cursor = self.bus.cursor()
+        # Porcupine requires 16-bit PCM; read it directly when the bus has it
+        audio_int16 = np.empty(self.block_size, dtype=np.int16)
+        frame = audio_int16 if self.bus.pcm16 else np.empty(self.block_size, dtype=np.float32)
+        scratch = np.empty(self.block_size, dtype=np.float32)
+        silence = np.zeros(self.block_size, dtype=np.int16)
+        while self._running:
+            if not cursor.read(frame, timeout=0.1):
+                continue
             if self._paused:
-                return
-
-            # Convert float32 audio to int16 PCM for Porcupine
-            audio_float = np.frombuffer(indata, dtype=np.float32)
-            # Clip to [-1.0, 1.0] range before conversion
-            audio_float = np.clip(audio_float, -1.0, 1.0)
-            # Convert to int16 PCM
-            audio_int16 = (audio_float * 32767).astype(np.int16)
-
-            # Porcupine.process() returns keyword index (0 for first keyword, -1 if no match)
-            keyword_index = self._porcupine.process(audio_int16)
-            hit = keyword_index >= 0
-
-            self._consecutive = self._consecutive + 1 if hit else 0
-
-            now = time.monotonic()
-            if (
-                self._consecutive >= self.debounce
-                and (now - self._last_trigger) >= self.cooldown_s
-            ):
-                self._last_trigger = now
-                self._consecutive = 0
+                continue
+
+            pcm = audio_int16
+            if self.echo_gate is not None and self.echo_gate(frame):
+                pcm = silence  # keep Porcupine's stream continuous, minus the echo
+            elif frame is not audio_int16:
+                to_pcm16(frame, audio_int16, scratch)
+
+            wake_end = self._engine.process(pcm, cursor.position)
+            if wake_end is not None:
                 try:
-                    self.on_wake()
+                    self.on_wake(wake_end)
                 except Exception as e:
                     print(f"[wakeword] callback error: {e}", flush=True)
-
-        with sd.InputStream(
-            channels=1,
-            samplerate=self.sample_rate,
-            blocksize=self.block_size,
-            dtype="float32",
-            device=self.device,
-            callback=callback,
-        ):
-            while self._running:
-                time.sleep(0.1)
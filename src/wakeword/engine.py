@@ -0,0 +1,82 @@
+"""Wake word decision logic (Porcupine + debounce + cooldown), independent of where audio comes from."""
+
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+
+FRAME_LENGTH = 512  # samples per Porcupine frame at 16 kHz
+
+
+class KeywordSpotter(Protocol):
+    """What the engine needs from Porcupine: keyword index for one frame, -1 for none."""
+
+    def process(self, pcm: Any) -> int: ...
+
+
+def create_porcupine(
+    *,
+    access_key: str,
+    model_path: Path | str | None = None,
+    builtin_keyword: str | None = None,
+    sensitivity: float = 0.5,
+) -> Any:
+    """Porcupine for a built-in keyword or a custom .ppn; `delete()` it when done."""
+    import pvporcupine
+
+    model_path = Path(model_path) if model_path else None
+    if builtin_keyword:
+        return pvporcupine.create(
+            access_key=access_key,
+            keywords=[builtin_keyword],
+            sensitivities=[sensitivity],
+        )
+    if model_path and model_path.exists():
+        return pvporcupine.create(
+            access_key=access_key,
+            keyword_paths=[str(model_path)],
+            sensitivities=[sensitivity],
+        )
+    raise FileNotFoundError(
+        f"Wake word model not found: {model_path}. "
+        "Use builtin_keyword (e.g. 'porcupine') to test, or download correct .ppn from Picovoice Console."
+    )
+
+
+class WakeWordEngine:
+    """
+    Turns per-frame keyword hits into wake events: `debounce` consecutive hits trigger,
+    then triggers are ignored for `cooldown_samples`. Time is the sample clock of the
+    stream (frame end positions), not the wall clock, so a recording replayed faster
+    than real time decides exactly as the live microphone would.
+    """
+
+    def __init__(self, spotter: KeywordSpotter, *, debounce: int = 2, cooldown_samples: int = 32000):
+        self.spotter = spotter
+        self.debounce = debounce
+        self.cooldown_samples = cooldown_samples
+        self._consecutive = 0
+        self._wake_end = 0
+        self._last_trigger: int | None = None
+
+    def reset(self) -> None:
+        self._consecutive = 0
+        self._last_trigger = None
+
+    def process(self, pcm: np.ndarray, end: int) -> int | None:
+        """
+        Feed one int16 frame ending at stream position `end`. Returns the position where
+        the wake word ended (end of the first hit frame) when this frame triggers.
+        """
+        hit = self.spotter.process(pcm) >= 0
+        self._consecutive = self._consecutive + 1 if hit else 0
+        if hit and self._consecutive == 1:
+            # Porcupine fires on the frame where the keyword ends
+            self._wake_end = end
+        if self._consecutive >= self.debounce and (
+            self._last_trigger is None or end - self._last_trigger >= self.cooldown_samples
+        ):
+            self._last_trigger = end
+            self._consecutive = 0
+            return self._wake_end
+        return None
@@ -0,0 +1,180 @@
+"""
+STT and TTS in worker processes, so decoding never holds the GIL of the process that
+runs the audio callbacks. Models are loaded once per worker; PCM crosses the process
+boundary through `multiprocessing.shared_memory` instead of being pickled.
+"""
+
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+# Set in each worker by _init_worker
+_stt_kwargs: dict[str, Any] = {}
+_started: Any = None  # Barrier shared by all workers, for WorkerPool.start
+
+
+def _init_worker(stt_kwargs: dict[str, Any] | None, voice_kwargs: dict[str, Any] | None, started: Any) -> None:
+    global _stt_kwargs, _started
+    _started = started
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is handled by the parent
+    if stt_kwargs is not None:
+        from src.stt import warm_up
+
+        _stt_kwargs = stt_kwargs
+        warm_up(**stt_kwargs)
+    if voice_kwargs is not None:
+        from src.tts import warm_up
+
+        warm_up(voice_kwargs["voice_model"], use_cuda=voice_kwargs.get("use_cuda", False))
+
+
+def _ready() -> int:
+    # Hold this worker until every worker has loaded its models, so each call runs on a different one
+    _started.wait()
+    return os.getpid()
+
+
+def _shared_audio(name: str, samples: int) -> np.ndarray:
+    """
+    Copy the parent's audio out of its shared segment. A view would still be referenced
+    from the traceback if decoding raised, and closing the segment would then fail with
+    BufferError instead.
+    """
+    shm = SharedMemory(name=name)
+    try:
+        view = np.ndarray((samples,), dtype=np.float32, buffer=shm.buf)
+        try:
+            return view.copy()
+        finally:
+            del view
+    finally:
+        shm.close()
+
+
+def _transcribe(name: str, samples: int) -> str:
+    from src.stt import transcribe_audio
+
+    return transcribe_audio(_shared_audio(name, samples), **_stt_kwargs)
+
+
+def _transcribe_words(name: str, samples: int, initial_prompt: str | None) -> list[tuple[float, float, str]]:
+    from src.stt import transcribe_words
+
+    return transcribe_words(_shared_audio(name, samples), initial_prompt=initial_prompt, **_stt_kwargs)
+
+
+def _synthesize(text: str, voice_kwargs: dict[str, Any]) -> tuple[str, int, int] | None:
+    """Synthesize into a new shared segment; the parent copies it out and unlinks it."""
+    from src.tts import synthesize_stream
+
+    chunks: list[np.ndarray] = []
+    sample_rate = 0
+    for pcm, sample_rate in synthesize_stream(text, **voice_kwargs):
+        chunks.append(pcm)
+    if not chunks:
+        return None
+    samples = sum(len(c) for c in chunks)
+    shm = SharedMemory(create=True, size=samples * 2)
+    try:
+        out = np.ndarray((samples,), dtype=np.int16, buffer=shm.buf)
+        try:
+            np.concatenate(chunks, out=out)
+        finally:
+            del out  # release the view before closing the segment
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    return shm.name, samples, sample_rate
+
+
+class WorkerPool:
+    """
+    `processes` worker processes (spawned, not forked, so no audio threads or model
+    state are inherited). `stt_kwargs` / `voice_kwargs` select the models each worker
+    loads at startup; pass None to skip one.
+    """
+
+    def __init__(
+        self,
+        *,
+        processes: int = 2,
+        stt_kwargs: dict[str, Any] | None = None,
+        voice_kwargs: dict[str, Any] | None = None,
+    ):
+        self.processes = max(1, processes)
+        ctx = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(stt_kwargs, voice_kwargs, ctx.Barrier(self.processes)),
+        )
+
+    def start(self) -> None:
+        """Start every worker and wait until its models are loaded."""
+        t0 = time.perf_counter()
+        futures = [self._executor.submit(_ready) for _ in range(self.processes)]
+        wait(futures)
+        pids = {f.result() for f in futures}
+        print(f"[workers] {len(pids)} worker processes ready in {time.perf_counter() - t0:.2f}s", flush=True)
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        """Like `transcribe_audio`, in a worker. `audio` is 16 kHz mono float32."""
+        return self._submit_audio(_transcribe, audio)
+
+    def transcribe_words(self, audio: np.ndarray, initial_prompt: str | None = None) -> list[tuple[float, float, str]]:
+        """Like `transcribe_words`, in a worker (for `StreamingTranscriber(decode=...)`)."""
+        return self._submit_audio(_transcribe_words, audio, initial_prompt)
+
+    def _submit_audio(self, fn: Callable[..., Any], audio: np.ndarray, *args: Any) -> Any:
+        """Run fn(segment name, samples, *args) in a worker with `audio` in shared memory."""
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = SharedMemory(create=True, size=max(1, audio.nbytes))
+        try:
+            view = np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)
+            try:
+                view[:] = audio
+            finally:
+                del view
+            return self._executor.submit(fn, shm.name, len(audio), *args).result()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def synthesize(
+        self,
+        text: str,
+        *,
+        voice_model: str | Path = "models/piper/en_US-lessac-medium",
+        speed: float = 1.0,
+        use_cuda: bool = False,
+    ) -> Iterator[tuple[np.ndarray, int]]:
+        """Like `synthesize_stream`, in a worker; yields the whole text as one chunk."""
+        voice_kwargs = {"voice_model": str(voice_model), "speed": speed, "use_cuda": use_cuda}
+        result = self._executor.submit(_synthesize, text, voice_kwargs).result()
+        if result is None:
+            return
+        name, samples, sample_rate = result
+        shm = SharedMemory(name=name)
+        try:
+            view = np.ndarray((samples,), dtype=np.int16, buffer=shm.buf)
+            try:
+                pcm = view.copy()
+            finally:
+                del view
+        finally:
+            shm.close()
+            shm.unlink()
+        yield pcm, sample_rate
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)